@@ -1,19 +1,40 @@
-from typing import Dict, List, Callable
+from typing import Dict, List, Callable, Optional
 import tkinter as tk
 import os
 import sys
 import json
 import threading
 import importlib
-from datetime import datetime, date
-from constants import SCHEDULE_FILE, WEEKDAYS
+import time
+import copy
+from datetime import datetime, date, timedelta
+from constants import CONFIG_FILE
 from config_handler import ConfigHandler
 from logger import logger
 from main_menu import MainMenu
 from dpi_manager import dpi_manager
+from font_manager import font_manager
+from persistence_service import persistence_service
+from file_watcher import file_watcher
+from display_scheduler import DisplayScheduler
+from tick_engine import TickEngine, TimerRegistry
+from visibility_monitor import VisibilityMonitor
+from schedule_renderer import WidgetScheduleRenderer
+from canvas_renderer import CanvasMainView
+from schedule_index import ScheduleIndex, DayIndex
+from schedule_store import LazyScheduleMap, create_schedule_store, materialize_document, store_for_backend
+from schedule_view_model import ScheduleViewModel
+from rotation_calendar import RotationCalendar
+from holiday_calendar import HolidayCalendar, DayResolver, ResolvedDay
+from schedule_query import ScheduleQuery, resolve_schedule_name
+from schedule_search import ScheduleSearchIndex, rename_course_at
+from schedule_occupancy import OccupancyIndex
+from time_event_bus import TimeEventBus, EVENT_DAY_CHANGE, EVENT_COURSES_FINISHED
 
 class CourseScheduler:
     """课程表主应用类"""
+    SCHEDULE_RELEASE_DELAY_MS = 30000  # 保存后多久释放近期未使用的课表
+    SCHEDULE_SYNC_DELAY_MS = 30000     # 最后一次保存后多久将修改日志合并回课表主文件
     def __init__(self, config_handler, startup_action=None):
         """初始化课程表应用
         Args:
@@ -23,44 +44,79 @@ class CourseScheduler:
         self.config_handler = config_handler
         self.startup_action = startup_action
         self.updater = None # 初始化为None
-        self.last_second = -1  # 记录上次更新的秒数
+        self.last_second = -1  # 记录上次更新的时间戳（整秒）
         # 预计算并缓存icon路径
         base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
         self.icon_path = os.path.join(base_path, 'res', 'icon.ico')
-        # 初始化课程时间缓存
-        self._course_time_cache = {}
+        # 课表区间索引，只在课表加载或保存时重建
+        self.schedule_index = ScheduleIndex()
+        # 课表轮换日历：预先计算整个学期每天使用的课表
+        self.rotation_calendar = RotationCalendar(self.config_handler)
+        # 节假日与调休日历：按日期覆盖轮换结果，每天的解析结果会被缓存
+        self.holiday_calendar = HolidayCalendar()
+        self.day_resolver = DayResolver(self.holiday_calendar, self.schedule_name_for)
+        # 课程查询：某一时刻的课程、下一节课、某一天的安排，主界面、预览和导出共用
+        self.schedule_query = ScheduleQuery(self.schedule_index, self.day_resolver)
+        # 所有课表的课程名称与时间段搜索索引，保存后增量更新
+        self.search_index = ScheduleSearchIndex()
+        # 教室和教师的占用时间线，用于检查跨课表的重复占用
+        self.occupancy_index = OccupancyIndex()
+        # 视图模型：计算界面应显示的内容，窗口只负责渲染
+        self.view_model = ScheduleViewModel(self.config_handler, self.schedule_index, self.day_resolver)
+        # 时间事件总线：上课、下课、第N节课结束和跨天事件在到期时各触发一次
+        self.time_events = TimeEventBus(self.schedule_index, self._day_index_for)
+        self.time_events.subscribe(EVENT_DAY_CHANGE, self._on_day_change)
+        self.time_events.subscribe(EVENT_COURSES_FINISHED, self._on_courses_finished)
+        # 课表视图刷新调度器，只在课程状态变化时刷新课表
+        self.display_scheduler = DisplayScheduler()
         try:
             logger.log_debug("Initializing CourseScheduler application")
             
             # 现在使用加载的配置来初始化日志记录器
             logger.setup(self.config_handler)
             logger.log_debug("Configuration and logger initialized")
+
+            # 课表存储后端（JSON文件或SQLite数据库）
+            self.schedule_store = create_schedule_store(self.config_handler.schedule_storage_backend)
             
             # 创建主窗口
             self.root = self._create_root_window()
+            # 所有主窗口定时器统一登记，只保留仍然有效的句柄
+            self.timers = TimerRegistry(self.root)
             logger.log_debug("Main window created")
+            # 后台写入失败时在界面上提示（任务保留在队列中自动重试）
+            persistence_service.set_error_handler(self._on_save_failed)
 
             # 初始化DPI管理器
             dpi_manager.initialize(self.root)
             self.dpi_manager = dpi_manager
             logger.log_info(f"DPI scaling factor detected: {self.dpi_manager.scaling_factor}")
 
+            # 初始化共享的命名字体
+            font_manager.initialize(self.root, self.config_handler, self.dpi_manager)
+            self.font_manager = font_manager
+
             # 应用动态计算的窗口尺寸和位置
             self.root.geometry(self._get_initial_geometry())
             self.root.update_idletasks()  # 立即应用窗口布局
             
             # 初始化其他成员变量
             self.schedule: Dict[str, List[Dict[str, str]]] = {}
-            self.course_labels: List[tk.Label] = []
+            self.schedule_renderer = None  # 课程列表渲染器，在创建课表区域时初始化
+            self.canvas_view = None  # 单画布渲染模式下的主界面画布
             self.course_duration = self.config_handler.course_duration
             self.editor_window = None
             self.settings_window = None
             self.about_window = None
             self.main_menu = None
-            self.was_iconic = False  # 初始化窗口状态跟踪属性
             self.is_dialog_open = False # 防止对话框多开
             self.week_preview_window = None # 周课表预览窗口实例
             self.tomorrow_preview_shown_for_today = False # 今天是否已显示过明日预览
+            self._applied_day_context = None # 已应用到界面的当天日历上下文
+            self._deferred_reloads = {} # 因编辑窗口打开而推迟的热重载 {名称: 定时器句柄}
+            self._watched_schedule_path = None # 正在监视的课表文件
+            self._schedule_release_timer = None # 释放未使用课表的定时器
+            self._schedule_sync_timer = None # 合并课表修改日志的定时器
             
             # --- 课表视图状态管理 ---
             self.displayed_weekday = datetime.now().weekday()  # 当前显示的星期，0-6
@@ -86,7 +142,7 @@ class CourseScheduler:
             raise
 
         # 在app完全初始化后，通过after调用启动后台更新检查，确保不阻塞UI
-        self.root.after(200, self.start_background_update_check)
+        self.timers.after(200, self.start_background_update_check)
 
 
     def _create_root_window(self) -> tk.Tk:
@@ -153,60 +209,33 @@ class CourseScheduler:
                          window.destroy()
             
             # 取消所有定时器
-            for timer_id in getattr(self, 'timer_ids', []):
-                self.root.after_cancel(timer_id)
+            if hasattr(self, 'timers'):
+                self.timers.cancel_all()
             
             # 销毁主窗口
             self.root.destroy()
         except Exception as e:
             logger.log_error(f"清理资源时出错: {str(e)}")
         finally:
+            self.flush_on_exit()
             os._exit(0)  # 确保完全退出进程
 
+    def flush_on_exit(self) -> None:
+        """退出或重启前调用：停止文件监视，写完所有尚未落盘的课表和配置，并将修改日志合并回课表主文件"""
+        file_watcher.stop()
+        persistence_service.shutdown()
+        self._sync_schedule_file_now()
+
     def _initialize_schedule(self) -> None:
         """加载或初始化课程表数据"""
-        if os.path.exists(SCHEDULE_FILE):
-            with open(SCHEDULE_FILE, 'r', encoding='utf-8') as f:
-                schedule_data = json.load(f)
-                # 兼容旧版单套课表
-                if "schedules" not in schedule_data:
-                    self.schedule = {
-                        "current_schedule": "default",
-                        "schedules": {
-                            "default": schedule_data
-                        }
-                    }
-                else:
-                    self.schedule = schedule_data
+        self.holiday_calendar.load()
+        # 支持的后端（SQLite）只读取课表名称，课表内容在首次使用时加载
+        schedule_data = self.schedule_store.open_document()
+        if schedule_data is not None:
+            self.schedule = self._normalize_schedule_data(schedule_data)
 
             # 自动应用课表轮换逻辑
-            if self.config_handler.schedule_rotation_enabled:
-                try:
-                    # 计算当前周数
-                    start_date = self.config_handler.rotation_start_date.date()
-                    current_date = datetime.now().date()
-                    delta_weeks = (current_date - start_date).days // 7
-                    
-                    # 获取配置的课表
-                    schedule1 = self.config_handler.rotation_schedule1
-                    schedule2 = self.config_handler.rotation_schedule2
-                    
-                    # 确保课表存在
-                    valid_schedules = list(self.schedule["schedules"].keys())
-                    if schedule1 not in valid_schedules:
-                        schedule1 = valid_schedules[0] if valid_schedules else "default"
-                    if schedule2 not in valid_schedules:
-                        schedule2 = valid_schedules[-1] if valid_schedules else "default"
-                    
-                    # 根据周数切换课表
-                    if delta_weeks % 2 == 0:
-                        self.schedule["current_schedule"] = schedule1
-                    else:
-                        self.schedule["current_schedule"] = schedule2
-                        
-                except Exception as e:
-                    logger.log_error(f"课表轮换错误: {str(e)}")
-                    self.schedule["current_schedule"] = self.config_handler.rotation_schedule1
+            self._apply_schedule_rotation(datetime.now())
         else:
             # 初始化默认课表
             self.schedule = {
@@ -218,12 +247,229 @@ class CourseScheduler:
                     }
                 }
             }
-            self._save_schedule()
+            self.schedule_store.save_all(self.schedule)
+        self.notify_schedule_changed()
+
+    @staticmethod
+    def _normalize_schedule_data(schedule_data: Dict) -> Dict:
+        """兼容旧版单套课表：没有schedules字段时将整个文件视为默认课表"""
+        if "schedules" not in schedule_data:
+            return {
+                "current_schedule": "default",
+                "schedules": {
+                    "default": schedule_data
+                }
+            }
+        return schedule_data
+
+    def _start_file_watcher(self) -> None:
+        """监视配置文件和JSON课表文件，被外部脚本修改后自动重新加载"""
+        file_watcher.watch(CONFIG_FILE, lambda path: self.root.after(0, self._reload_config))
+        self._watch_schedule_store()
+
+    def _watch_schedule_store(self) -> None:
+        """监视当前的JSON课表文件（SQLite数据库只由本程序写入，不监视）"""
+        if self._watched_schedule_path:
+            file_watcher.unwatch(self._watched_schedule_path)
+        self._watched_schedule_path = None
+        if self.schedule_store.backend == "json":
+            self._watched_schedule_path = self.schedule_store.path
+            file_watcher.watch(self._watched_schedule_path, lambda path: self.root.after(0, self._reload_schedule))
+
+    def _defer_reload_while_open(self, name: str, window, reload: Callable[[], None]) -> bool:
+        """
+        对应的编辑窗口打开时推迟热重载，避免覆盖窗口中尚未保存的修改。
+        返回是否已推迟；窗口关闭后由定时器重新尝试。
+        """
+        if window is None or not window.window.winfo_exists():
+            return False
+        if name not in self._deferred_reloads:
+            logger.log_info(f"{name}已被外部修改，将在编辑窗口关闭后重新加载")
+
+            def retry():
+                self._deferred_reloads.pop(name, None)
+                reload()
+
+            self._deferred_reloads[name] = self.timers.after(2000, retry)
+        return True
+
+    def _reload_config(self) -> None:
+        """配置文件被外部修改后重新加载，并通过正常的刷新路径应用到界面"""
+        if self._defer_reload_while_open("配置", self.settings_window, self._reload_config):
+            return
+        # 先写完自己尚未落盘的修改，保证重新加载后内存与文件一致
+        persistence_service.flush()
+        previous_backend = self.config_handler.schedule_storage_backend
+        if not self.config_handler.reload_config():
+            return
+        if self.config_handler.schedule_storage_backend != previous_backend:
+            logger.log_warning("课表存储后端的修改将在重启后生效")
+            self.config_handler.schedule_storage_backend = previous_backend
+        self.course_duration = self.config_handler.course_duration
+        self.root.geometry(
+            f"{self.dpi_manager.scale(self.config_handler.window_width_du)}x"
+            f"{self.dpi_manager.scale(self.config_handler.window_height_du)}"
+        )
+        self._apply_schedule_rotation(datetime.now())
+        self.notify_schedule_changed()
+        self._update_font_settings()
+        logger.log_info("已重新加载外部修改的配置")
+
+    def _reload_schedule(self) -> None:
+        """课表文件被外部修改后重新加载，并通过正常的刷新路径应用到界面"""
+        if self._defer_reload_while_open("课表", self.editor_window, self._reload_schedule):
+            return
+        persistence_service.flush()
+        try:
+            schedule_data = self.schedule_store.open_document()
+        except Exception as e:
+            logger.log_error(f"重新加载课表失败，继续使用当前课表: {e}")
+            return
+        if schedule_data is None:
+            return
+        self.schedule = self._normalize_schedule_data(schedule_data)
+        self._apply_schedule_rotation(datetime.now())
+        self.notify_schedule_changed()
+        logger.log_info("已重新加载外部修改的课表")
+
+    def _apply_schedule_rotation(self, now: datetime) -> bool:
+        """根据当前周数应用课表轮换，返回当前课表是否发生变化"""
+        if not self.config_handler.schedule_rotation_enabled:
+            return False
+        previous_schedule = self.schedule.get("current_schedule")
+        try:
+            # 以今天为起点重新计算本学期的轮换对照表（课表可能已增删）
+            self.rotation_calendar.rebuild(list(self.schedule["schedules"].keys()), now.date())
+            self.schedule["current_schedule"] = self.rotation_calendar.schedule_for(now.date()) or "default"
+        except Exception as e:
+            logger.log_error(f"课表轮换错误: {str(e)}")
+            self.schedule["current_schedule"] = self.config_handler.rotation_schedule1
+        return self.schedule["current_schedule"] != previous_schedule
     
+    def schedule_name_for(self, day: date) -> str:
+        """返回某一天应使用的课表名称，启用轮换时按轮换日历查询"""
+        return resolve_schedule_name(self.schedule, self.rotation_calendar, day)
+
+    def resolve_day(self, day: date) -> ResolvedDay:
+        """返回某一天实际生效的课表安排（已考虑节假日、调休和课表轮换）"""
+        return self.day_resolver.resolve(day)
+
+    def _day_index_for(self, day: date) -> Optional[DayIndex]:
+        """返回某一天实际使用的课程索引，停课时返回None"""
+        return self.schedule_query.day_plan(day).index
+
+    def switch_schedule_store(self, backend: str) -> None:
+        """切换课表存储后端，并把当前课表完整写入新的后端"""
+        # 先写完提交给旧后端的修改
+        persistence_service.flush()
+        # 新后端需要完整的课表，先读入所有按需加载的课表
+        self.schedule = materialize_document(self.schedule)
+        store = store_for_backend(backend)
+        store.save_all(self.schedule)
+        self.schedule_store = store
+        self._watch_schedule_store()
+        logger.log_info(f"课表存储后端已切换为 {backend}")
+
+    def _schedule_snapshot(self) -> Dict:
+        """生成提交给后台线程写入的课表快照（按需加载的课表只复制已加载的部分）"""
+        snapshot = copy.deepcopy(self.schedule)
+        self.timers.cancel(self._schedule_sync_timer)
+        self._schedule_sync_timer = self.timers.after(self.SCHEDULE_SYNC_DELAY_MS, self._sync_schedule_file)
+        schedules = self.schedule.get("schedules")
+        if isinstance(schedules, LazyScheduleMap):
+            schedules.mark_saved()
+            # 写入完成后释放近期不用的课表
+            self.timers.cancel(self._schedule_release_timer)
+            self._schedule_release_timer = self.timers.after(self.SCHEDULE_RELEASE_DELAY_MS, self._release_unused_schedules)
+        return snapshot
+
+    def _sync_schedule_file(self) -> None:
+        """保存停止一段时间后，在后台将修改日志合并回课表主文件"""
+        self._schedule_sync_timer = None
+        store = self.schedule_store
+        persistence_service.submit("schedule_sync", store.sync_main_file)
+
+    def _on_save_failed(self, key, error: Exception) -> None:
+        """后台保存失败（在后台线程中调用），转到界面线程提示用户"""
+        def show_error():
+            from tkinter import messagebox
+            messagebox.showerror(
+                "保存失败",
+                f"修改没有写入磁盘: {error}\n程序会自动重试，请检查磁盘空间和文件权限。",
+                parent=self.root
+            )
+        self.root.after(0, show_error)
+
+    def _sync_schedule_file_now(self) -> None:
+        """退出前将修改日志合并回课表主文件（后台线程已停止，直接写入）"""
+        try:
+            self.schedule_store.sync_main_file()
+        except Exception as e:
+            logger.log_error(f"合并课表修改日志失败: {e}")
+
+    def _release_unused_schedules(self) -> None:
+        """释放近期不会显示或编辑的课表，只保留今天、明天使用的课表和编辑器中的课表"""
+        self._schedule_release_timer = None
+        schedules = self.schedule.get("schedules")
+        if not isinstance(schedules, LazyScheduleMap):
+            return
+        if persistence_service.has_pending:
+            # 还有课表没有写入存储，释放后重新读取会得到旧数据
+            self._schedule_release_timer = self.timers.after(self.SCHEDULE_RELEASE_DELAY_MS, self._release_unused_schedules)
+            return
+        today = date.today()
+        keep = {self.schedule.get("current_schedule")}
+        keep.update(self.resolve_day(day).schedule_name for day in (today, today + timedelta(days=1)))
+        if self.editor_window is not None and self.editor_window.window.winfo_exists():
+            keep.add(self.editor_window.current_schedule)
+        released = schedules.evict(keep)
+        if released:
+            # 已编译的课表模型同样释放，需要时重新编译；索引不再引用已释放课表的课程列表
+            self.schedule_index.rebuild(self.schedule)
+            self.search_index.release_unloaded()
+            self.occupancy_index.release_unloaded()
+            logger.log_debug(f"已释放 {released} 套近期未使用的课表")
+
     def save_schedule(self):
-        """保存课表"""
-        with open(SCHEDULE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.schedule, f, ensure_ascii=False, indent=2)
+        """保存整个课表（由后台线程写入）"""
+        store, snapshot = self.schedule_store, self._schedule_snapshot()
+        persistence_service.submit("schedule", lambda: store.save_all(snapshot))
+        self.notify_schedule_changed()
+
+    def save_schedule_day(self, schedule_name: str, weekday: int, backup: bool = False):
+        """
+        只保存某套课表某一天的课程（SQLite后端按行更新，由后台线程写入）
+        Args:
+            backup: 写入前是否先备份当前的课表数据
+        """
+        store, snapshot = self.schedule_store, self._schedule_snapshot()
+
+        def write_day():
+            if backup:
+                try:
+                    store.backup()
+                except Exception as e:
+                    logger.log_error(f"创建课表备份失败: {e}")
+            store.save_day(snapshot, schedule_name, weekday)
+
+        persistence_service.submit(("schedule_day", schedule_name, weekday), write_day)
+        self.notify_schedule_changed()
+
+    def save_schedules(self, schedule_names: List[str]):
+        """只保存指定的若干套课表（由后台线程写入）"""
+        store, snapshot = self.schedule_store, self._schedule_snapshot()
+        names = list(schedule_names)
+        persistence_service.submit(("schedules", tuple(names)), lambda: store.save_schedules(snapshot, names))
+        self.notify_schedule_changed()
+
+    def notify_schedule_changed(self):
+        """课表数据变化后调用：重建区间索引，并在下一次更新时重新渲染课表视图"""
+        self.schedule_index.rebuild(self.schedule)
+        self.search_index.update(self.schedule)
+        self.occupancy_index.update(self.schedule, alternatives=self._rotation_alternatives())
+        self.day_resolver.invalidate()
+        self.time_events.rebuild(datetime.now(), self.schedule.get("current_schedule"))
+        self.display_scheduler.invalidate()
 
     def import_schedule_data(self, new_data: Dict[str, List[Dict[str, str]]]):
         """
@@ -245,10 +491,9 @@ class CourseScheduler:
             self.schedule["schedules"][current_schedule_name] = new_data
             
             # 保存到文件
-            self.save_schedule()
+            self.save_schedules([current_schedule_name])
             
-            # 重新加载并更新UI
-            self._initialize_schedule()
+            # 更新UI（内存中的课表已是最新，后台写入完成前无需从磁盘重新加载）
             self._update_schedule_display(self.displayed_weekday)
             
             logger.log_info(f"成功从AI助手导入并更新了课表 '{current_schedule_name}'。")
@@ -258,7 +503,44 @@ class CourseScheduler:
             # 可以选择在这里弹出一个错误提示框
             from tkinter import messagebox
             messagebox.showerror("导入失败", f"保存课表时发生错误: {e}")
-    
+
+    def import_schedules(self, schedules: Dict[str, Dict[str, List[Dict[str, str]]]]) -> None:
+        """
+        批量导入多套课表（同名课表被覆盖），作为一次保存提交给课表存储。
+        Args:
+            schedules: 课表名称到课表数据（键为 "0"-"6"）的字典
+        """
+        self.schedule.setdefault("schedules", {}).update(schedules)
+        self._apply_schedule_rotation(datetime.now())
+        self.save_schedules(list(schedules))
+        self._update_schedule_display(self.displayed_weekday)
+        logger.log_info(f"已批量导入 {len(schedules)} 套课表")
+
+    def _rotation_alternatives(self) -> List[str]:
+        """互为轮换的课表（不会在同一天使用，它们之间教室和教师的占用不算冲突）"""
+        if not self.rotation_calendar.enabled:
+            return []
+        return self.rotation_calendar.configured_cycle()
+
+    def rename_course(self, old_name: Optional[str], new_name: str, locations=None) -> List[str]:
+        """
+        在所有课表中将课程old_name改名为new_name，所有修改作为一次保存提交。
+        Args:
+            old_name: 原名称；为None时修改locations上的所有课程
+            locations: 只修改这些位置（搜索结果），默认修改old_name出现的所有位置
+        Returns:
+            发生变化的课表名称
+        """
+        if locations is None:
+            locations = self.search_index.find(old_name)
+        changed = rename_course_at(self.schedule, locations, old_name, new_name)
+        if changed:
+            self.schedule["last_modified"] = datetime.now().timestamp()
+            self.save_schedules(changed)
+            self._update_schedule_display(self.displayed_weekday)
+            logger.log_info(f"已将 {len(changed)} 套课表中的课程 '{old_name or '选中课程'}' 改名为 '{new_name}'")
+        return changed
+
     def _initialize_ui(self) -> None:
         """初始化主界面"""
         # 应用配置中的间距设置
@@ -266,10 +548,14 @@ class CourseScheduler:
         scaled_pady = self.dpi_manager.scale(self.config_handler.vertical_padding)
         self.root.configure(padx=scaled_padx, pady=scaled_pady)
         
-        self._create_time_display()
-        self._create_countdown_display()
-        self._create_schedule_display()
-        self._create_preview_icons() # 创建预览状态图标
+        ui_start = time.perf_counter()
+        if self.config_handler.schedule_renderer_mode == "canvas":
+            self._create_canvas_display()
+        else:
+            self._create_time_display()
+            self._create_countdown_display()
+            self._create_schedule_display()
+            self._create_preview_icons() # 创建预览状态图标
         
         # 创建主菜单按钮容器
         self.button_frame = tk.Frame(self.root)
@@ -300,11 +586,48 @@ class CourseScheduler:
             self.root.attributes("-transparentcolor", "white")
             self.root.configure(bg="white")
         self._start_update_loop()
+        self._start_file_watcher()
+        logger.log_debug(
+            f"主界面初始化耗时 {(time.perf_counter() - ui_start) * 1000:.1f}ms "
+            f"(渲染模式: {self.config_handler.schedule_renderer_mode})"
+        )
+
+    def _create_canvas_display(self) -> None:
+        """创建单画布主界面（时间、倒计时和课程列表绘制在同一个Canvas上）"""
+        self.canvas_view = CanvasMainView(
+            self.root,
+            self.config_handler,
+            self.dpi_manager,
+            {
+                "header_click": self._on_time_label_click,
+                "press": self._on_schedule_press,
+                "drag": self._on_schedule_drag,
+                "double_click": self._on_schedule_double_click,
+                "triple_click": self._on_schedule_triple_click,
+            }
+        )
+        self.canvas_view.pack(fill=tk.BOTH, expand=True)
+
+        # 画布文本项提供与Label相同的config接口，其余更新逻辑与控件模式共用
+        self.time_date_label = self.canvas_view.time_date_item
+        self.weekday_label = self.canvas_view.weekday_item
+        self.countdown_label1 = self.canvas_view.countdown_name_item
+        self.countdown_label2 = self.canvas_view.countdown_days_item
+        self.countdown_label3 = self.canvas_view.countdown_unit_item
+        self.time_date_label.config(font=self.font_manager.font("time"))
+        self.weekday_label.config(font=self.font_manager.font("time"))
+        self.countdown_label1.config(
+            text=f"距离{self.config_handler.countdown_name}",
+            font=self.font_manager.font("countdown_small")
+        )
+        self.countdown_label2.config(font=self.font_manager.font("countdown_large"))
+        self.countdown_label3.config(text="天", font=self.font_manager.font("countdown_small"))
+        self.schedule_frame = self.canvas_view.canvas
+        self.schedule_renderer = self.canvas_view
 
     def _create_time_display(self) -> None:
         """创建时间显示区域"""
-        scaled_font_size = self.dpi_manager.scale(self.config_handler.time_display_size)
-        font_config = ("微软雅黑", scaled_font_size, "bold")
+        font_config = self.font_manager.font("time")
 
         self.time_date_label = tk.Label(
             self.root,
@@ -359,15 +682,12 @@ class CourseScheduler:
         scaled_pady = self.dpi_manager.scale(self.config_handler.vertical_padding)
         self.countdown_frame = tk.Frame(self.root)
         self.countdown_frame.pack(pady=scaled_pady)
-        
-        scaled_size_large = self.dpi_manager.scale(self.config_handler.countdown_size)
-        scaled_size_small = self.dpi_manager.scale(max(1, self.config_handler.countdown_size - 4))
 
         # 第一行：显示自定义倒计时名称
         self.countdown_label1 = tk.Label(
             self.countdown_frame,
             text=f"距离{self.config_handler.countdown_name}",
-            font=("微软雅黑", scaled_size_small),
+            font=self.font_manager.font("countdown_small"),
             fg=self.config_handler.font_color,
             bg="#ecf0f1"
         )
@@ -379,7 +699,7 @@ class CourseScheduler:
         
         self.countdown_label2 = tk.Label(
             self.countdown_line2_frame,
-            font=("微软雅黑", scaled_size_large, "bold"),
+            font=self.font_manager.font("countdown_large"),
             fg=self.config_handler.font_color,
             bg="#ecf0f1"
         )
@@ -388,7 +708,7 @@ class CourseScheduler:
         self.countdown_label3 = tk.Label(
             self.countdown_line2_frame,
             text="天",
-            font=("微软雅黑", scaled_size_small),
+            font=self.font_manager.font("countdown_small"),
             fg=self.config_handler.font_color,
             bg="#ecf0f1"
         )
@@ -403,12 +723,17 @@ class CourseScheduler:
                                pady=scaled_pady,
                                fill=tk.BOTH, expand=True)
         self._bind_schedule_events()
+        self.schedule_renderer = WidgetScheduleRenderer(
+            self.schedule_frame,
+            self.config_handler,
+            self.dpi_manager,
+            self._bind_events_to_widget
+        )
 
     def _create_preview_icons(self) -> None:
         """创建预览状态图标"""
         # 使用一种通用字体来显示表情符号
-        scaled_emoji_size = self.dpi_manager.scale(12)
-        emoji_font = ("Segoe UI Emoji", scaled_emoji_size)
+        emoji_font = self.font_manager.font("emoji")
         # 获取schedule_frame的背景色，以便图标融合
         bg_color = self.schedule_frame.cget('bg')
         
@@ -418,6 +743,15 @@ class CourseScheduler:
     def _update_preview_icons(self) -> None:
         """更新右下角预览状态图标的可见性"""
         is_previewing = self.displayed_weekday != datetime.now().weekday()
+        icon_state = (is_previewing, is_previewing and self.is_view_locked)
+        # 图标状态未变化时不重复调用place
+        if icon_state == getattr(self, '_preview_icon_state', None):
+            return
+        self._preview_icon_state = icon_state
+
+        if self.canvas_view:
+            self.canvas_view.set_preview_icons(is_previewing, is_previewing and self.is_view_locked)
+            return
         
         # 调整图标位置和间距
         scaled_offset_x = self.dpi_manager.scale(10)
@@ -438,267 +772,148 @@ class CourseScheduler:
 
     def _start_update_loop(self) -> None:
         """启动界面更新循环"""
-        self.timer_ids = []  # 存储定时器ID
-        self.update_display()
-        self.timer_ids.append(self.root.after(1000, self.update_display))
+        self.tick_engine = TickEngine(self.timers, self.update_display)
+        self.tick_engine.start()
+        # 启动时当天的课程可能已经结束，先检查一次明日预览，之后由时间事件触发
+        self._check_and_show_tomorrow_preview(datetime.now())
+        # 通过窗口事件跟踪可见性，代替每秒轮询窗口状态
+        self.visibility_monitor = VisibilityMonitor(self.root, self._on_visibility_changed)
+
+    def _on_visibility_changed(self, visible: bool, restored: bool) -> None:
+        """主窗口可见性变化时调用：不可见时节拍降频，恢复可见时立即追赶一次"""
+        if restored:
+            # 窗口从最小化恢复时重新置顶
+            self.root.attributes('-topmost', True)
+            self.timers.after(100, lambda: self.root.attributes("-topmost", False))
+
+        idle = not visible and self.config_handler.power_saving_enabled
+        if idle != self.tick_engine.idle:
+            logger.log_debug("主窗口不可见，进入省电模式" if idle else "主窗口恢复可见，恢复逐秒更新")
+            self.tick_engine.set_idle(idle)
     
-    def update_display(self) -> None:
-        """更新主界面显示内容"""
+    def update_display(self, now: datetime = None, jumped: bool = False) -> None:
+        """更新主界面显示内容
+        Args:
+            now: 本次节拍的时间，默认为当前时间
+            jumped: 是否检测到时钟跳变（休眠恢复等），此时需要一次性追赶所有状态
+        """
         try:
-            now = datetime.now()
-            current_second = now.second
-            
-            # 缓存当前时间对象避免重复计算
-            current_time = now.time()
+            if now is None:
+                now = datetime.now()
+            current_second = int(now.timestamp())
+
+            if jumped:
+                # 休眠恢复或时钟调整后，强制重新渲染课表
+                self.display_scheduler.invalidate()
             
             # 只有秒数变化时才更新UI
             if current_second != self.last_second:
-                self._update_countdown_display(now)
+                self._update_day_context(now)
 
                 # 根据当前是显示当天还是预览来更新时间/星期显示
                 if self.displayed_weekday == now.weekday():
                     # 正常更新时间、秒数和星期
                     self._update_time_display(now)
-                    # 课表内容也只在显示当天时才随时间更新状态
-                    self._update_schedule_display(now.weekday())
+                    # 课表内容只在显示当天且课程状态发生变化时才重新渲染
+                    if self.display_scheduler.needs_refresh(now, self._get_schedule_view_key(now)):
+                        self._update_schedule_display(now.weekday())
                 else:
                     # 保持预览状态的显示（日期不变，星期为斜体）
-                    scaled_font_size = self.dpi_manager.scale(self.config_handler.time_display_size)
-                    self.time_date_label.config(text=now.strftime("%Y-%m-%d"))
-                    self.weekday_label.config(
-                        text=f"星期{WEEKDAYS[self.displayed_weekday]}",
-                        font=("微软雅黑", scaled_font_size, "bold italic")
-                    )
+                    self._render_header(self.view_model.header(now, self.displayed_weekday))
 
                 self.last_second = current_second
 
-            self._check_and_show_tomorrow_preview(now)
-                
-            self._schedule_next_update()
-            
-            # 检测窗口状态变化
-            is_iconic = self.root.state() == 'iconic'
-            if self.was_iconic and not is_iconic:
-                # 窗口从最小化恢复时重新置顶
-                self.root.attributes('-topmost', True)
-                self.root.after(100, lambda: self.root.attributes('-topmost', False))
-            self.was_iconic = is_iconic
+            # 触发到期的时间事件（包括休眠恢复后错过的事件）
+            self.time_events.dispatch(now)
         except Exception as e:
             logger.log_error(e)
 
     def _update_time_display(self, now: datetime) -> None:
         """更新时间显示"""
-        scaled_font_size = self.dpi_manager.scale(self.config_handler.time_display_size)
-        font_config = ("微软雅黑", scaled_font_size, "bold")
-        self.time_date_label.config(text=now.strftime("%Y-%m-%d\n%H:%M:%S"), font=font_config)
-        self.weekday_label.config(
-            text=f"星期{WEEKDAYS[now.weekday()]}",
-            font=font_config
-        )
-        # 如果是新的一天，重置预览标志
-        if now.hour == 0 and now.minute == 0 and now.second == 0:
-            self.tomorrow_preview_shown_for_today = False
+        self._render_header(self.view_model.header(now, now.weekday()))
 
-    def _update_countdown_display(self, now: datetime) -> None:
+    def _update_day_context(self, now: datetime) -> None:
+        """跨天（或日历相关配置变化）时更新依赖当天日历的显示，其余时间直接复用"""
+        context = self.view_model.day_context(now)
+        if context is self._applied_day_context:
+            return
+        self._applied_day_context = context
+        self._render_countdown(context)
+
+    def _render_countdown(self, context) -> None:
         """更新倒计时显示"""
-        delta = (self.config_handler.countdown_date.date() - now.date()).days
         # 高考彩蛋：当倒计时名称是高考且天数<=100时显示红色
-        if self.config_handler.countdown_name == "高考" and delta <= 100:
-            self.countdown_label2.config(text=str(delta), fg="red")
-        else:
-            self.countdown_label2.config(text=str(delta), fg=self.config_handler.font_color)
+        fg = "red" if context.countdown_alert else self.config_handler.font_color
+        self.countdown_label2.config(text=str(context.countdown_days), fg=fg)
+
+    def _render_header(self, header) -> None:
+        """将时间/星期区域的渲染描述应用到标签上"""
+        self.time_date_label.config(text=header.date_text)
+        # 星期只在跨天或切换预览时变化
+        header_state = (header.weekday_text, header.is_preview)
+        if header_state == getattr(self, '_header_state', None):
+            return
+        self._header_state = header_state
+        self.weekday_label.config(
+            text=header.weekday_text,
+            font=self.font_manager.font("time_italic" if header.is_preview else "time")
+        )
 
     def _update_schedule_display(self, weekday_to_show: int) -> None:
         """更新课程表显示
         Args:
             weekday_to_show (int): 要显示的星期 (0-6).
         """
-        if not hasattr(self, 'course_labels'):
-            self.course_labels = []
-        
         now = datetime.now()
-        weekday_str = str(weekday_to_show)
-        
-        # 更新时间标签以反映当前显示的星期
-        displayed_day_str = f"星期{WEEKDAYS[weekday_to_show]}"
-        if weekday_to_show != now.weekday():
-            scaled_font_size = self.dpi_manager.scale(self.config_handler.time_display_size)
-            self.time_date_label.config(text=now.strftime("%Y-%m-%d"))
-            self.weekday_label.config(
-                text=displayed_day_str,
-                font=("微软雅黑", scaled_font_size, "bold italic")
-            )
-        else:
-            # 仅在显示当天时才更新秒数
+
+        # 更新时间标签以反映当前显示的星期（仅在显示当天时才显示秒数）
+        if weekday_to_show == now.weekday():
             self._update_time_display(now)
+        else:
+            self._render_header(self.view_model.header(now, weekday_to_show))
 
-        schedule_for_day = self.schedule["schedules"][self.schedule["current_schedule"]].get(weekday_str, [])
-        
-        # 在更新前清除所有课程时间缓存
-        self._course_time_cache.clear()
-        
-        # 过滤掉已销毁的标签
-        self.course_labels = [label for label in self.course_labels if label.winfo_exists()]
-        
-        # 根据当前课表重新排列所有标签
-        for i, course in enumerate(schedule_for_day):
-            color = self._get_course_color(now, course)
-            if i < len(self.course_labels):
-                # 强制更新标签颜色状态
-                self._update_existing_label(i, course, color, now, force_update=True)
-                # 调整grid行号
-                self.course_labels[i].master.grid(row=i)
-            else:
-                # 创建新标签并指定grid行号
-                self._create_new_label(course, color, now, row=i)
-        
-        # 移除多余的标签
-        self._remove_extra_labels(schedule_for_day)
+        # 由视图模型计算期望的显示状态，渲染器只对发生变化的部分发出Tk调用
+        if weekday_to_show == now.weekday():
+            # 今天按节假日与调休解析后的课表显示
+            plan = self.schedule_query.day_plan(now.date())
+            view = self.view_model.schedule(now, plan.schedule_name, plan.weekday, is_today=True)
+        else:
+            view = self.view_model.schedule(now, self.schedule["current_schedule"], weekday_to_show)
+        self.schedule_renderer.render(view.rows)
 
         # 更新预览图标状态
         self._update_preview_icons()
 
-    def _update_course_labels(self, now: datetime, schedule: List[Dict[str, str]]) -> None:
-        """更新或创建课程标签"""
-        for i, course in enumerate(schedule):
-            color = self._get_course_color(now, course)
-            
-            if i < len(self.course_labels):
-                self._update_existing_label(i, course, color)
-            else:
-                self._create_new_label(course, color)
-
+        # 显示当天课表时，计算下一次课程状态变化的时间点
+        if view.is_today:
+            self.display_scheduler.plan(now, self._get_schedule_view_key(now), view.day_index, view.per_second)
+        else:
+            self.display_scheduler.invalidate()
 
-    def _get_course_color(self, now: datetime, course: Dict[str, str]) -> str:
-        """根据课程时间获取显示颜色"""
-        # 如果显示的不是当天的课表，则所有课程都显示为“未开始”状态
-        if self.displayed_weekday != now.weekday():
-            return "red"
-
-        # 使用课程名称+时间作为缓存键
-        cache_key = f"{course['name']}_{course['start_time']}_{course['end_time']}"
-        
-        # 从缓存获取或计算
-        if cache_key not in self._course_time_cache:
-            try:
-                self._course_time_cache[cache_key] = (
-                    datetime.strptime(course["start_time"], "%H:%M").time(),
-                    datetime.strptime(course["end_time"], "%H:%M").time()
-                )
-            except (KeyError, ValueError):
-                # 如果时间格式错误或键不存在，缓存一个无效标志并返回红色
-                self._course_time_cache[cache_key] = (None, None)
-                return "red"
-            
-        start_time, end_time = self._course_time_cache[cache_key]
-        if not start_time: # 检查无效标志
-            return "red"
-        current_time = now.time()
-        
-        if start_time <= current_time <= end_time:
-            return "yellow"  # 正在上的课程为黄色
-        elif current_time > end_time:
-            return "green"   # 已上完的课程为绿色
-        return "red"     # 未上过的课程为红色
-
-    def _get_course_display_text(self, course: Dict[str, str], color: str, now: datetime) -> str:
-        """根据课程状态和设置生成显示文本"""
-        mode = self.config_handler.current_course_time_display_mode
-        
-        # 仅当课程正在进行中 ("yellow") 且模式不是 "default" 时，才应用特殊显示
-        if color == "yellow" and mode != "default":
-            end_time_str = course.get("end_time", "00:00")
-
-            if mode == "end_time":
-                return f"{end_time_str} {course['name']}"
-            
-            if mode == "countdown":
-                try:
-                    end_time_obj = datetime.strptime(end_time_str, "%H:%M").time()
-                    end_datetime = now.replace(hour=end_time_obj.hour, minute=end_time_obj.minute, second=0, microsecond=0)
-                    
-                    # 如果结束时间在当前时间之前（例如，刚好过了一秒），则显示为0
-                    if end_datetime < now:
-                        remaining_seconds = 0
-                    else:
-                        remaining_seconds = (end_datetime - now).total_seconds()
-
-                    minutes = int(remaining_seconds // 60)
-                    seconds = int(remaining_seconds % 60)
-                    return f"{minutes:02d}:{seconds:02d} {course['name']}"
-                except (ValueError, KeyError):
-                    # 如果时间格式错误或键不存在，回退到默认显示
-                    return f"{course['start_time']} {course['name']}"
-
-        # 默认显示开始时间
-        return f"{course['start_time']} {course['name']}"
-
-    def _update_existing_label(self, index: int, course: Dict[str, str], color: str, now: datetime, force_update: bool = False) -> None:
-        """更新现有课程标签"""
-        label = self.course_labels[index]
-        new_text = self._get_course_display_text(course, color, now)
-        
-        # 始终更新文本和颜色状态
-        label.config(text=new_text)
-        label.last_color = color
-        
-        if hasattr(label, 'status_canvas'):
-            # 指示器大小应该是字体大小的1.8倍，以获得更好的视觉效果
-            circle_size = int(self.dpi_manager.scale(self.config_handler.schedule_size) * 1.8)
-            label.status_canvas.config(width=circle_size, height=circle_size)
-            
-            # 强制重绘Canvas
-            label.status_canvas.delete("all")
-            label.status_canvas.create_oval(0, 0, circle_size, circle_size, fill=color, outline=color)
-            label.status_canvas.current_color = color
-            label.status_canvas.config(bg=color)
-        
-        # 提升该课程标签的显示层级
-        label.master.lift()
+    def _get_schedule_view_key(self, now: datetime) -> tuple:
+        """返回描述当前课表视图内容的键，日期、星期或当前课表变化时视图需要刷新"""
+        return (now.date(), self.displayed_weekday, self.schedule.get("current_schedule"), self.day_resolver.version)
 
     def _update_font_settings(self) -> None:
         """更新所有UI组件的字体设置"""
-        # 更新时间显示
-        scaled_time_font_size = self.dpi_manager.scale(self.config_handler.time_display_size)
-        time_font_config = ("微软雅黑", scaled_time_font_size, "bold")
-        self.time_date_label.config(font=time_font_config, fg=self.config_handler.font_color)
-        self.weekday_label.config(font=time_font_config, fg=self.config_handler.font_color)
-        
-        # 更新课程标签色块尺寸
-        scaled_schedule_size = self.dpi_manager.scale(self.config_handler.schedule_size)
-        if hasattr(self, 'course_labels'):
-            for label in self.course_labels:
-                if hasattr(label, 'status_canvas'):
-                    # 指示器大小应该是字体大小的1.8倍，以获得更好的视觉效果
-                    circle_size = int(scaled_schedule_size * 1.8)
-                    label.status_canvas.config(width=circle_size, height=circle_size)
-                    label.status_canvas.coords(label.status_canvas.oval_id, 0, 0, circle_size, circle_size)
-        
-        # 更新倒计时显示
-        scaled_countdown_large = self.dpi_manager.scale(self.config_handler.countdown_size)
-        scaled_countdown_small = self.dpi_manager.scale(max(1, self.config_handler.countdown_size - 4))
-        self.countdown_label1.config(
-            font=("微软雅黑", scaled_countdown_small),
-            fg=self.config_handler.font_color
-        )
-        self.countdown_label2.config(
-            font=("微软雅黑", scaled_countdown_large, "bold"),
-            fg=self.config_handler.font_color
-        )
-        self.countdown_label3.config(
-            font=("微软雅黑", scaled_countdown_small),
-            fg=self.config_handler.font_color
-        )
+        # 字号只需重新配置命名字体，所有引用它的控件由Tk自动更新
+        self.font_manager.refresh()
+
+        # 更新字体颜色
+        for label in (self.time_date_label, self.weekday_label,
+                      self.countdown_label1, self.countdown_label3):
+            label.config(fg=self.config_handler.font_color)
+        if self._applied_day_context is not None:
+            self._render_countdown(self._applied_day_context)
+        else:
+            self.countdown_label2.config(fg=self.config_handler.font_color)
         
-        # 更新课程标签
-        schedule_font_config = ("微软雅黑", scaled_schedule_size, "bold")
-        self.course_labels = [label for label in self.course_labels if label.winfo_exists()]
-        for label in self.course_labels:
-            label.config(
-                font=schedule_font_config,
-                fg=self.config_handler.font_color
-            )
+        # 更新课程标签及其色块尺寸
+        self.schedule_renderer.update_fonts()
         
+        # 显示设置可能已变化，下一次更新时重新渲染课表
+        self.display_scheduler.invalidate()
+
         # 强制更新所有部件
         self.root.update_idletasks()
 
@@ -721,47 +936,6 @@ class CourseScheduler:
         # 强制更新所有部件
         self.root.update_idletasks()
 
-    def _create_new_label(self, course: Dict[str, str], color: str, now: datetime, row: int) -> None:
-        """创建新课程标签"""
-        scaled_pady = self.dpi_manager.scale(2)
-        course_frame = tk.Frame(self.schedule_frame)
-        course_frame.grid(row=row, column=0, sticky="ew", pady=scaled_pady)  # 使用指定的行号
-        
-        scaled_font_size = self.dpi_manager.scale(self.config_handler.schedule_size)
-        font_config = ("微软雅黑", scaled_font_size, "bold")
-
-        label = tk.Label(
-            course_frame,
-            text=self._get_course_display_text(course, color, now),
-            font=font_config,
-            fg=self.config_handler.font_color,
-            anchor='w'
-        )
-        
-        # --- 事件绑定 ---
-        self._bind_events_to_widget(label)
-        self._bind_events_to_widget(course_frame)
-        label.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        
-        # 根据字体大小计算色块尺寸，指示器大小应该是字体大小的1.8倍
-        circle_size = int(scaled_font_size * 1.8)
-        status_canvas = tk.Canvas(
-            course_frame,
-            width=circle_size,
-            height=circle_size,
-            bg=color,
-            highlightthickness=0
-        )
-        # 保存圆形图形的ID以便后续更新
-        oval_id = status_canvas.create_oval(0, 0, circle_size, circle_size, fill=color, outline=color)
-        status_canvas.oval_id = oval_id  # 存储图形ID
-        scaled_padx = self.dpi_manager.scale(5)
-        status_canvas.pack(side=tk.RIGHT, padx=scaled_padx)
-        label.status_canvas = status_canvas
-        self.course_labels.append(label)
-        
-        self.schedule_frame.grid_columnconfigure(0, weight=1)
-
     def _bind_schedule_events(self):
         """为课表框架及其所有子控件绑定事件"""
         self._bind_events_to_widget(self.schedule_frame)
@@ -783,7 +957,7 @@ class CourseScheduler:
         self.swipe_start_x = event.x
         # 如果有重置计时器在运行，则取消它
         if self.view_reset_timer:
-            self.root.after_cancel(self.view_reset_timer)
+            self.timers.cancel(self.view_reset_timer)
             self.view_reset_timer = None
 
     def _on_schedule_drag(self, event):
@@ -806,7 +980,7 @@ class CourseScheduler:
             if self.is_view_locked:
                 # 如果锁定，取消自动重置计时器
                 if self.view_reset_timer:
-                    self.root.after_cancel(self.view_reset_timer)
+                    self.timers.cancel(self.view_reset_timer)
                     self.view_reset_timer = None
             else:
                 # 如果解锁，启动自动重置计时器
@@ -845,19 +1019,19 @@ class CourseScheduler:
             
         # 如果已有计时器，先取消
         if self.view_reset_timer:
-            self.root.after_cancel(self.view_reset_timer)
+            self.timers.cancel(self.view_reset_timer)
         
         # 启动新的5秒计时器
-        self.view_reset_timer = self.root.after(5000, self._reset_schedule_view_to_today)
+        self.view_reset_timer = self.timers.after(5000, self._reset_schedule_view_to_today)
 
     def _start_view_reset_timer(self):
         """启动一个计时器，在5秒后将视图重置回当天"""
         # 如果已有计时器，先取消
         if self.view_reset_timer:
-            self.root.after_cancel(self.view_reset_timer)
+            self.timers.cancel(self.view_reset_timer)
         
         # 启动新的5秒计时器
-        self.view_reset_timer = self.root.after(5000, self._reset_schedule_view_to_today)
+        self.view_reset_timer = self.timers.after(5000, self._reset_schedule_view_to_today)
 
     def _reset_schedule_view_to_today(self):
         """将课表视图重置为显示当天的课程"""
@@ -872,29 +1046,12 @@ class CourseScheduler:
             self._update_preview_icons()
 
 
-    def _remove_extra_labels(self, schedule: List[Dict[str, str]]) -> None:
-        """移除多余的课程标签"""
-        # 移除所有超出当前课程数量的标签
-        for i in range(len(schedule), len(self.course_labels)):
-            if i < len(self.course_labels):
-                label = self.course_labels[i]
-                label.master.destroy()  # 销毁整个课程框架
-        # 更新标签列表
-        self.course_labels = self.course_labels[:len(schedule)]
-
-    def _schedule_next_update(self) -> None:
-        """安排下一次界面更新"""
-        timer_id = self.root.after(1000, self.update_display)
-        if hasattr(self, 'timer_ids'):
-            self.timer_ids.append(timer_id)
-    
     def restart_program(self) -> None:
         """彻底重启应用程序"""
         import sys, os
         
         # 1. 清理所有定时器
-        for timer_id in getattr(self, 'timer_ids', []):
-            self.root.after_cancel(timer_id)
+        self.timers.cancel_all()
             
         # 2. 销毁所有子窗口
         for window in [self.editor_window, self.settings_window, self.about_window]:
@@ -905,7 +1062,10 @@ class CourseScheduler:
         self.root.quit()
         self.root.destroy()
         
-        # 4. 彻底重启进程
+        # 4. 停止文件监视，写完所有尚未落盘的课表和配置
+        self.flush_on_exit()
+
+        # 5. 彻底重启进程
         python = sys.executable
         os.execl(python, python, *sys.argv)
     
@@ -980,6 +1140,20 @@ class CourseScheduler:
             self.updater = Updater(self.root)
             self.updater.start_background_check()
 
+    def _on_day_change(self, event, now: datetime) -> None:
+        """跨天事件：重置每日状态并重新应用课表轮换"""
+        logger.log_info(f"进入新的一天: {event.payload}")
+        # 新的一天，重置预览标志
+        self.tomorrow_preview_shown_for_today = False
+        if self._apply_schedule_rotation(now):
+            logger.log_info(f"课表轮换: 当前课表切换为 '{self.schedule['current_schedule']}'")
+            self.notify_schedule_changed()
+        self._release_unused_schedules()
+
+    def _on_courses_finished(self, event, now: datetime) -> None:
+        """第N节课结束事件：检查是否需要预览明日课表"""
+        self._check_and_show_tomorrow_preview(now)
+
     def _check_and_show_tomorrow_preview(self, now: datetime):
         """检查是否需要显示明日课表预览"""
         if not self.config_handler.auto_preview_tomorrow_enabled:
@@ -989,43 +1163,10 @@ class CourseScheduler:
         if self.week_preview_window and self.week_preview_window.winfo_exists():
             return
 
-        today_weekday_str = str(now.weekday())
-        current_schedule_name = self.schedule.get("current_schedule", "default")
-        schedule_data = self.schedule.get("schedules", {}).get(current_schedule_name, {})
-        courses_today = schedule_data.get(today_weekday_str, [])
-
-        if not courses_today:
-            return  # 今天没课，不触发
-
-        trigger_count = self.config_handler.preview_tomorrow_trigger_count
-        
-        finished_courses_count = 0
-        all_courses_finished = True
-        last_course_end_time = None
-
-        for course in courses_today:
-            try:
-                end_time = datetime.strptime(course['end_time'], "%H:%M").time()
-                if last_course_end_time is None or end_time > last_course_end_time:
-                    last_course_end_time = end_time
-                
-                if now.time() > end_time:
-                    finished_courses_count += 1
-                else:
-                    all_courses_finished = False
-            except (ValueError, KeyError):
-                continue # 忽略格式错误的课程
-
-        should_trigger = False
-        # 检查触发条件
-        if trigger_count > 0:
-            # 按第N节课触发
-            if finished_courses_count >= trigger_count:
-                should_trigger = True
-        else:
-            # 按全部课程结束后触发 (旧逻辑)
-            if all_courses_finished and last_course_end_time and now.time() > last_course_end_time:
-                should_trigger = True
+        plan = self.schedule_query.day_plan(now.date())
+        if plan.no_classes:
+            return
+        should_trigger = self.view_model.should_preview_tomorrow(now, plan.schedule_name, plan.weekday)
 
         if should_trigger:
             from tools.week_preview import WeekPreviewWindow
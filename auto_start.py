@@ -51,9 +51,13 @@ def check_and_generate_files():
             "schedule_rotation_enabled": False,
             "rotation_schedule1": "",
             "rotation_schedule2": "",
+            "rotation_extra_schedules": [],
             "rotation_start_date": datetime.now().strftime("%Y-%m-%d"),
             "last_weather_location": "",
             "current_course_time_display_mode": "default",
+            "schedule_renderer_mode": "widget",
+            "power_saving_enabled": True,
+            "schedule_storage_backend": "json",
             "weather_api_provider": "heweather",
             "ai_assistant_base_url": "",
             "ai_assistant_api_key": "",
@@ -3,6 +3,7 @@ import os
 from datetime import datetime
 from tkinter import filedialog, messagebox
 from logger import logger
+from persistence_service import persistence_service
 from constants import CONFIG_FILE, SCHEDULE_FILE, CONFIG_VERSION
 
 class BackupRestoreManager:
@@ -43,9 +44,9 @@ class BackupRestoreManager:
 
         # 2. 处理课表数据
         if include_schedule:
-            if os.path.exists(SCHEDULE_FILE):
-                with open(SCHEDULE_FILE, 'r', encoding='utf-8') as f:
-                    backup_data["schedule"] = json.load(f)
+            # 先写完后台尚未落盘的修改
+            persistence_service.flush()
+            backup_data["schedule"] = self.main_app.schedule_store.load()
 
         # 3. 检查是否有效数据被导出
         if not backup_data["configs"] and not backup_data["schedule"]:
@@ -153,14 +154,15 @@ class BackupRestoreManager:
         if backup_data.get("schedule"):
             schedule_to_write = backup_data["schedule"]
 
-        # 原子化写入
-        self._atomic_write(config_to_write, schedule_to_write)
+        # 原子化写入配置，课表交给课表存储后端整体写入
+        self._atomic_write(config_to_write, None)
 
         # 更新内存状态
         if config_to_write:
             self.config_handler.config = config_to_write
         if schedule_to_write:
             self.main_app.schedule = schedule_to_write
+            self.main_app.save_schedule()
 
     def _incremental_import(self, backup_data):
         """执行增量导入"""
@@ -176,25 +178,25 @@ class BackupRestoreManager:
             config_to_write = new_config_data
 
         # 准备要写入的课表数据
+        imported_schedules = []
         if backup_data.get("schedule"):
-            if os.path.exists(SCHEDULE_FILE):
-                with open(SCHEDULE_FILE, 'r', encoding='utf-8') as f:
-                    current_schedule = json.load(f)
-            else:
-                current_schedule = {"schedules": {}}
+            persistence_service.flush()
+            current_schedule = self.main_app.schedule_store.load() or {"schedules": {}}
             
             for name, schedule_data in backup_data["schedule"]["schedules"].items():
                 current_schedule["schedules"][name] = schedule_data
+                imported_schedules.append(name)
             schedule_to_write = current_schedule
 
-        # 原子化写入
-        self._atomic_write(config_to_write, schedule_to_write)
+        # 原子化写入配置
+        self._atomic_write(config_to_write, None)
 
-        # 更新内存状态
+        # 更新内存状态，课表只写入导入的课表（SQLite后端按行更新）
         if config_to_write:
             self.config_handler.config = config_to_write
         if schedule_to_write:
             self.main_app.schedule = schedule_to_write
+            self.main_app.save_schedules(imported_schedules)
 
     def _atomic_write(self, config_data, schedule_data):
         """
@@ -0,0 +1,275 @@
+import tkinter as tk
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from font_manager import font_manager
+
+# 画布模式下的点击区域
+REGION_HEADER = "header"      # 时间与星期
+REGION_COUNTDOWN = "countdown"
+REGION_SCHEDULE = "schedule"  # 课程列表
+
+
+class CanvasTextItem:
+    """
+    画布上的一个文本项。
+    提供与tk.Label相同的config接口（text、font、fg），主程序无需区分渲染模式；
+    只有属性真正变化时才调用itemconfigure，文字行数或字体变化时通知画布重新布局。
+    """
+
+    def __init__(self, view: "CanvasMainView", item_id: int):
+        self.view = view
+        self.item_id = item_id
+        self._options: Dict[str, object] = {}
+
+    def config(self, text: Optional[str] = None, font=None, fg: Optional[str] = None, **_ignored) -> None:
+        changes = {}
+        if text is not None and self._options.get("text") != text:
+            changes["text"] = text
+        if font is not None and self._options.get("font") != font:
+            changes["font"] = font
+        if fg is not None and self._options.get("fill") != fg:
+            changes["fill"] = fg
+        if not changes:
+            return
+
+        old_text = self._options.get("text", "")
+        self._options.update(changes)
+        self.view.canvas.itemconfigure(self.item_id, **changes)
+        # 时间每秒变化但行数不变，此时无需重新布局
+        if "font" in changes or str(old_text).count("\n") != str(self._options.get("text", "")).count("\n"):
+            self.view.layout()
+        elif "text" in changes and self.view.is_width_sensitive(self):
+            self.view.layout()
+
+    configure = config
+
+    def cget(self, option: str):
+        return self._options.get("fill" if option == "fg" else option, "")
+
+
+class CanvasCourseRow:
+    """一行已绘制的课程及其当前显示状态"""
+    __slots__ = ("text_id", "block_id", "text", "color", "row")
+
+    def __init__(self, text_id: int, block_id: int, text: str, color: str, row: int):
+        self.text_id = text_id
+        self.block_id = block_id
+        self.text = text
+        self.color = color
+        self.row = row
+
+
+class CanvasMainView:
+    """
+    单画布主界面渲染器。
+    时间、星期、倒计时和课程列表全部绘制为同一个Canvas上的图元，
+    状态变化时只通过itemconfigure/coords更新，不再为每门课程创建Frame、Label和Canvas。
+    滑动、双击、三击等事件绑定在画布上，由hit_test在Python中判断点击落在哪个区域。
+    课程列表部分与WidgetScheduleRenderer提供相同的render/update_fonts接口。
+    """
+
+    def __init__(self, parent: tk.Misc, config_handler, dpi_manager, handlers: Dict[str, Callable]):
+        """
+        Args:
+            parent: 画布所在的容器（主窗口）
+            config_handler: 配置处理器
+            dpi_manager: DPI管理器
+            handlers: 事件回调，键为 header_click / press / drag / double_click / triple_click
+        """
+        self.config_handler = config_handler
+        self.dpi_manager = dpi_manager
+        self.handlers = handlers
+        self.rows: Dict[Hashable, CanvasCourseRow] = {}
+        self._press_region: Optional[str] = None
+        self._header_bottom = 0
+        self._schedule_top = 0
+
+        self.canvas = tk.Canvas(parent, highlightthickness=0, bd=0)
+        canvas = self.canvas
+
+        self._header_bg = canvas.create_rectangle(0, 0, 0, 0, fill="#ecf0f1", outline="")
+        self.time_date_item = CanvasTextItem(self, canvas.create_text(0, 0, anchor="n", justify=tk.CENTER))
+        self.weekday_item = CanvasTextItem(self, canvas.create_text(0, 0, anchor="n", justify=tk.CENTER))
+        self.countdown_name_item = CanvasTextItem(self, canvas.create_text(0, 0, anchor="n"))
+        self.countdown_days_item = CanvasTextItem(self, canvas.create_text(0, 0, anchor="nw"))
+        self.countdown_unit_item = CanvasTextItem(self, canvas.create_text(0, 0, anchor="nw"))
+
+        emoji_font = font_manager.font("emoji")
+        self._eye_icon = canvas.create_text(0, 0, text="👁️", font=emoji_font, anchor="se", state=tk.HIDDEN)
+        self._lock_icon = canvas.create_text(0, 0, text="🔒", font=emoji_font, anchor="se", state=tk.HIDDEN)
+
+        canvas.bind("<Configure>", lambda event: self.layout())
+        canvas.bind("<Button-1>", self._on_press)
+        canvas.bind("<B1-Motion>", self._on_drag)
+        canvas.bind("<Double-Button-1>", lambda event: self._dispatch_click("double_click", event))
+        canvas.bind("<Triple-Button-1>", lambda event: self._dispatch_click("triple_click", event))
+
+    def pack(self, **kwargs) -> None:
+        self.canvas.pack(**kwargs)
+
+    # ---------- 课程列表 ----------
+
+    def render(self, desired: List[Tuple[Hashable, str, str]]) -> None:
+        """
+        将课程列表协调为期望状态。
+        Args:
+            desired: 按显示顺序排列的 (课程键, 显示文本, 状态颜色) 列表
+        """
+        needs_layout = False
+        wanted_keys = set()
+        for index, (key, text, color) in enumerate(desired):
+            wanted_keys.add(key)
+            row = self.rows.get(key)
+            if row is None:
+                self.rows[key] = self._create_row(text, color, index)
+                needs_layout = True
+                continue
+
+            if row.text != text:
+                self.canvas.itemconfigure(row.text_id, text=text)
+                row.text = text
+            if row.color != color:
+                self.canvas.itemconfigure(row.block_id, fill=color, outline=color)
+                row.color = color
+            if row.row != index:
+                row.row = index
+                needs_layout = True
+
+        # 删除不再需要的课程
+        for key in [key for key in self.rows if key not in wanted_keys]:
+            row = self.rows.pop(key)
+            self.canvas.delete(row.text_id, row.block_id)
+            needs_layout = True
+
+        if needs_layout:
+            self.layout()
+
+    def update_fonts(self) -> None:
+        """字体大小或颜色变化后更新所有课程行"""
+        for row in self.rows.values():
+            self.canvas.itemconfigure(row.text_id, fill=self.config_handler.font_color)
+        self.layout()
+
+    @property
+    def labels(self) -> List[int]:
+        """按显示顺序排列的课程文本图元"""
+        return [row.text_id for row in sorted(self.rows.values(), key=lambda r: r.row)]
+
+    def _create_row(self, text: str, color: str, index: int) -> CanvasCourseRow:
+        """创建新的课程图元，位置由layout统一计算"""
+        text_id = self.canvas.create_text(
+            0, 0,
+            text=text,
+            font=font_manager.font("schedule"),
+            fill=self.config_handler.font_color,
+            anchor="w"
+        )
+        block_id = self.canvas.create_rectangle(0, 0, 0, 0, fill=color, outline=color)
+        return CanvasCourseRow(text_id, block_id, text, color, index)
+
+    # ---------- 预览图标 ----------
+
+    def set_preview_icons(self, show_eye: bool, show_lock: bool) -> None:
+        """显示或隐藏右下角的预览/锁定图标"""
+        self.canvas.itemconfigure(self._eye_icon, state=tk.NORMAL if show_eye else tk.HIDDEN)
+        self.canvas.itemconfigure(self._lock_icon, state=tk.NORMAL if show_lock else tk.HIDDEN)
+
+    # ---------- 布局 ----------
+
+    def is_width_sensitive(self, item: CanvasTextItem) -> bool:
+        """倒计时天数的宽度决定了“天”字的位置，天数变化时需要重新布局"""
+        return item is self.countdown_days_item
+
+    def layout(self) -> None:
+        """根据当前字体和文字计算所有图元的位置"""
+        canvas = self.canvas
+        width = max(canvas.winfo_width(), 1)
+        height = max(canvas.winfo_height(), 1)
+        center_x = width / 2
+        scaled_pady = self.dpi_manager.scale(self.config_handler.vertical_padding)
+        scaled_padx = self.dpi_manager.scale(self.config_handler.horizontal_padding)
+
+        # 时间与星期
+        y = 0
+        for item in (self.time_date_item, self.weekday_item):
+            canvas.coords(item.item_id, center_x, y)
+            y += self._item_height(item)
+        canvas.coords(self._header_bg, 0, 0, width, y)
+        self._header_bottom = y
+
+        # 倒计时：第一行为名称，第二行为天数和“天”字
+        y += scaled_pady
+        canvas.coords(self.countdown_name_item.item_id, center_x, y)
+        y += self._item_height(self.countdown_name_item)
+        days_width = self._item_width(self.countdown_days_item)
+        unit_width = self._item_width(self.countdown_unit_item)
+        line_x = center_x - (days_width + unit_width) / 2
+        days_height = self._item_height(self.countdown_days_item)
+        unit_height = self._item_height(self.countdown_unit_item)
+        line_height = max(days_height, unit_height)
+        canvas.coords(self.countdown_days_item.item_id, line_x, y + (line_height - days_height) / 2)
+        canvas.coords(self.countdown_unit_item.item_id, line_x + days_width, y + (line_height - unit_height) / 2)
+        y += line_height + scaled_pady
+
+        # 课程列表
+        y += scaled_pady
+        self._schedule_top = y
+        linespace = font_manager.font("schedule").metrics("linespace")
+        circle_size = font_manager.metric("indicator_size")
+        row_pady = self.dpi_manager.scale(2)
+        row_height = max(linespace, circle_size) + row_pady * 2
+        block_right = width - scaled_padx - self.dpi_manager.scale(5)
+        for row in self.rows.values():
+            row_top = y + row.row * row_height
+            row_center = row_top + row_height / 2
+            canvas.coords(row.text_id, scaled_padx, row_center)
+            canvas.coords(
+                row.block_id,
+                block_right - circle_size, row_center - circle_size / 2,
+                block_right, row_center + circle_size / 2
+            )
+
+        # 预览图标位于画布右下角
+        scaled_offset_x = self.dpi_manager.scale(10)
+        scaled_offset_y = self.dpi_manager.scale(10)
+        lock_icon_x_offset = self.dpi_manager.scale(35)
+        canvas.coords(self._eye_icon, width - scaled_offset_x, height - scaled_offset_y)
+        canvas.coords(self._lock_icon, width - scaled_offset_x - lock_icon_x_offset, height - scaled_offset_y)
+
+    def _item_height(self, item: CanvasTextItem) -> int:
+        font = item.cget("font")
+        if not font:
+            return 0
+        lines = str(item.cget("text")).count("\n") + 1
+        return font.metrics("linespace") * lines
+
+    def _item_width(self, item: CanvasTextItem) -> int:
+        font = item.cget("font")
+        if not font:
+            return 0
+        return max(font.measure(line) for line in str(item.cget("text")).split("\n"))
+
+    # ---------- 事件 ----------
+
+    def hit_test(self, y: int) -> str:
+        """根据纵坐标判断点击落在哪个区域"""
+        if y < self._header_bottom:
+            return REGION_HEADER
+        if y < self._schedule_top:
+            return REGION_COUNTDOWN
+        return REGION_SCHEDULE
+
+    def _on_press(self, event) -> None:
+        self._press_region = self.hit_test(event.y)
+        if self._press_region == REGION_HEADER:
+            self.handlers["header_click"](event)
+        elif self._press_region == REGION_SCHEDULE:
+            self.handlers["press"](event)
+
+    def _on_drag(self, event) -> None:
+        # 只有从课表区域开始的拖动才视为滑动
+        if self._press_region == REGION_SCHEDULE:
+            self.handlers["drag"](event)
+
+    def _dispatch_click(self, name: str, event) -> None:
+        if self.hit_test(event.y) == REGION_SCHEDULE:
+            self.handlers[name](event)
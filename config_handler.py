@@ -4,6 +4,7 @@ import threading
 from datetime import datetime
 from constants import CONFIG_FILE, CONFIG_VERSION
 from tools.config_converter import convert_v1_to_v2
+from persistence_service import persistence_service, atomic_write_text
 
 class ConfigHandler:
     def __init__(self):
@@ -43,9 +44,13 @@ class ConfigHandler:
         self.schedule_rotation_enabled = False
         self.rotation_schedule1 = ""
         self.rotation_schedule2 = ""
+        self.rotation_extra_schedules = [] # 第三周及以后的轮换课表
         self.rotation_start_date = datetime.now()
         self.last_weather_location = ""
         self.current_course_time_display_mode = "default"
+        self.schedule_renderer_mode = "widget" # 主界面渲染模式: widget / canvas
+        self.power_saving_enabled = True # 窗口不可见时降低更新频率
+        self.schedule_storage_backend = "json" # 课表存储后端: json / sqlite
         self.weather_api_provider = "heweather" # 新增天气API提供商配置
         self.ai_assistant_base_url = ""
         self.ai_assistant_api_key = ""
@@ -97,6 +102,26 @@ class ConfigHandler:
         self.save_config() # 确保无论初始化路径如何，最终配置都保存一次
         self.config_loaded.set()
 
+    def reload_config(self) -> bool:
+        """
+        配置文件被外部修改后重新加载（不回写文件）。
+        文件无法解析时保留当前配置并返回False。
+        """
+        from logger import logger
+        try:
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                loaded_config = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.log_error(f"重新加载配置失败，继续使用当前配置: {e}")
+            return False
+
+        if loaded_config.get("config_version") != CONFIG_VERSION:
+            loaded_config = convert_v1_to_v2(loaded_config)
+        self.config = loaded_config
+        self._set_default_attributes()
+        self._load_attributes_from_config()
+        return True
+
     def _create_default_config_file(self):
         """创建一个全新的默认v2配置文件"""
         default_settings = {
@@ -128,9 +153,13 @@ class ConfigHandler:
             "schedule_rotation_enabled": False,
             "rotation_schedule1": "",
             "rotation_schedule2": "",
+            "rotation_extra_schedules": [],
             "rotation_start_date": datetime.now().strftime("%Y-%m-%d"),
             "last_weather_location": "",
             "current_course_time_display_mode": "default",
+            "schedule_renderer_mode": "widget",
+            "power_saving_enabled": True,
+            "schedule_storage_backend": "json",
             "weather_api_provider": "heweather",
             "ai_assistant_base_url": "",
             "ai_assistant_api_key": "",
@@ -209,9 +238,13 @@ class ConfigHandler:
         self.schedule_rotation_enabled = get_bool("schedule_rotation_enabled", False)
         self.rotation_schedule1 = get_str("rotation_schedule1", "")
         self.rotation_schedule2 = get_str("rotation_schedule2", "")
+        self.rotation_extra_schedules = [str(name) for name in active_config.get("rotation_extra_schedules", [])]
         self.rotation_start_date = get_date("rotation_start_date", datetime.now().strftime("%Y-%m-%d"))
         self.last_weather_location = get_str("last_weather_location", "")
         self.current_course_time_display_mode = get_str("current_course_time_display_mode", "default")
+        self.schedule_renderer_mode = get_str("schedule_renderer_mode", "widget")
+        self.power_saving_enabled = get_bool("power_saving_enabled", True)
+        self.schedule_storage_backend = get_str("schedule_storage_backend", "json")
         self.weather_api_provider = get_str("weather_api_provider", "heweather")
         self.ai_assistant_base_url = get_str("ai_assistant_base_url", "")
         self.ai_assistant_api_key = get_str("ai_assistant_api_key", "")
@@ -267,9 +300,13 @@ class ConfigHandler:
             "schedule_rotation_enabled": self.schedule_rotation_enabled,
             "rotation_schedule1": self.rotation_schedule1,
             "rotation_schedule2": self.rotation_schedule2,
+            "rotation_extra_schedules": self.rotation_extra_schedules,
             "rotation_start_date": self.rotation_start_date.strftime("%Y-%m-%d"),
             "last_weather_location": self.last_weather_location,
             "current_course_time_display_mode": self.current_course_time_display_mode,
+            "schedule_renderer_mode": self.schedule_renderer_mode,
+            "power_saving_enabled": self.power_saving_enabled,
+            "schedule_storage_backend": self.schedule_storage_backend,
             "weather_api_provider": self.weather_api_provider,
             "ai_assistant_base_url": self.ai_assistant_base_url,
             "ai_assistant_api_key": self.ai_assistant_api_key,
@@ -280,20 +317,18 @@ class ConfigHandler:
         self.config["configs"][current_config_name] = active_config_data
         
         try:
-            temp_file = CONFIG_FILE + ".tmp"
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
-            
-            if os.path.exists(CONFIG_FILE):
-                os.replace(temp_file, CONFIG_FILE)
-            else:
-                os.rename(temp_file, CONFIG_FILE)
-            
-            logger.log_debug(f"配置 '{current_config_name}' 保存成功。")
+            # 在界面线程生成快照，由后台线程原子化写入，连续多次保存只写一次
+            config_text = json.dumps(self.config, ensure_ascii=False, indent=2)
         except Exception as e:
             logger.log_error(f"保存配置失败: {str(e)}", exc_info=True)
             raise
 
+        def write_config():
+            atomic_write_text(CONFIG_FILE, config_text)
+            logger.log_debug(f"配置 '{current_config_name}' 保存成功。")
+
+        persistence_service.submit("config", write_config)
+
     def get_config_names(self):
         """获取所有配置方案的名称列表"""
         return list(self.config.get("configs", {}).keys())
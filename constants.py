@@ -1,6 +1,8 @@
 # 常量定义
 CONFIG_FILE = "config.json"
 SCHEDULE_FILE = "schedule.json"
+SCHEDULE_DB_FILE = "schedule.db"
+CALENDAR_FILE = "calendar.json"
 ASPECT_RATIO = 0.5
 WEEKDAYS = ["一", "二", "三", "四", "五", "六", "日"]
 
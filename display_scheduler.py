@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, time
+from typing import Optional, Hashable
+
+
+class DisplayScheduler:
+    """
+    课表视图刷新调度器。
+    课程状态一天只会变化几次（上课、下课、跨天），没有必要每秒重绘整个课表。
+    该类根据当天的课程计算下一个状态变化的时间点，只有到达该时间点、
+    视图内容（星期、课表、日期）发生变化或被显式标记为失效时，才需要刷新课表视图。
+    """
+
+    def __init__(self):
+        self._next_refresh: Optional[datetime] = None
+        self._view_key: Optional[Hashable] = None
+
+    @property
+    def next_refresh(self) -> Optional[datetime]:
+        """下一次需要刷新课表视图的时间点，None表示需要立即刷新"""
+        return self._next_refresh
+
+    def invalidate(self) -> None:
+        """标记课表视图失效（例如课表被保存或显示设置被修改），下一次检查时立即刷新"""
+        self._next_refresh = None
+
+    def needs_refresh(self, now: datetime, view_key: Hashable) -> bool:
+        """
+        判断当前是否需要刷新课表视图。
+        Args:
+            now: 当前时间
+            view_key: 描述当前视图内容的键（如日期、星期、课表名称），变化即需刷新
+        """
+        if view_key != self._view_key or self._next_refresh is None:
+            return True
+        return now >= self._next_refresh
+
+    def plan(self, now: datetime, view_key: Hashable, day_index, per_second: bool = False) -> None:
+        """
+        在刷新课表视图后调用，记录视图内容并计算下一次刷新时间。
+        Args:
+            now: 本次刷新使用的时间
+            view_key: 本次刷新对应的视图键
+            day_index: 当天课程的区间索引（schedule_index.DayIndex）
+            per_second: 是否需要逐秒刷新（如“倒计时”显示模式下有正在进行的课程）
+        """
+        self._view_key = view_key
+        if per_second:
+            midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+            self._next_refresh = min(now.replace(microsecond=0) + timedelta(seconds=1), midnight)
+        else:
+            self._next_refresh = day_index.next_change(now)
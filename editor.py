@@ -1,10 +1,14 @@
 from typing import List
 import tkinter as tk
 import uuid
+from collections import defaultdict
 from tkinter import ttk, messagebox, simpledialog
 from constants import WEEKDAYS
 from datetime import datetime, timedelta
+from font_manager import font_manager
 from logger import logger
+from schedule_conflicts import analyze_day, conflicting_indices
+from schedule_model import COURSE_FIELDS, COURSE_ROOM, COURSE_TEACHER
 
 class TimePicker:
     def __init__(self, parent, initial_time):
@@ -57,9 +61,8 @@ class EditorWindow:
                 self.main_app.schedule["last_modified"] = datetime.now().timestamp()
             self.current_schedule = self.main_app.schedule["current_schedule"]
             self.all_courses = self._get_all_courses()  # 初始化时加载所有课程
-            self.schedule_times = {}  # 按课表存储课程时间
-            for schedule_name in self.main_app.schedule["schedules"]:
-                self.schedule_times[schedule_name] = []
+            # 按课表存储课程时间，用到时才创建（不必为每套课表加载数据）
+            self.schedule_times = defaultdict(list)
             self.last_edited_day = None  # 存储最后编辑的日期
             self.current_schedule = self.main_app.schedule["current_schedule"]
             self.modified = False  # 跟踪课表是否被修改
@@ -115,6 +118,12 @@ class EditorWindow:
                       foreground="#333",
                       padding="3 3 3 3")
         
+        # 行内标签样式
+        style.configure("Editor.TLabel",
+                      background="white",
+                      foreground="#7f8c8d",
+                      font=font_manager.font("editor_label"))
+
         # 复选框样式
         style.configure("Editor.TCheckbutton",
                       background="white",
@@ -124,7 +133,7 @@ class EditorWindow:
         """创建并配置编辑窗口"""
         window = tk.Toplevel()
         window.title("课表编辑")
-        window.minsize(800, 600)
+        window.minsize(960, 600)
         window.configure(bg="white")
         return window
 
@@ -159,6 +168,14 @@ class EditorWindow:
         self.delete_button = ttk.Button(selector_frame, text="-", command=self._delete_schedule, width=3, style="Small.TButton")
         self.delete_button.pack(side=tk.LEFT, padx=5)
 
+        # 启用课表轮换时提示本周使用的课表
+        rotation_calendar = self.main_app.rotation_calendar
+        if rotation_calendar.enabled:
+            today = datetime.now().date()
+            rotation_text = (f"本周轮换: 第{rotation_calendar.week_number(today)}周 "
+                             f"{self.main_app.schedule_name_for(today)}")
+            tk.Label(selector_frame, text=rotation_text, bg="white", fg="gray").pack(side=tk.LEFT, padx=5)
+
         # 添加临时控制开关（复选框），放在右侧
         auto_calc_check = ttk.Checkbutton(
             selector_frame,
@@ -206,7 +223,7 @@ class EditorWindow:
                 self.current_schedule = new_name
                 self.main_app.schedule["current_schedule"] = new_name
                 # 更新时间记录
-                self.schedule_times[new_name] = self.schedule_times.pop(old_name)
+                self.schedule_times[new_name] = self.schedule_times.pop(old_name, [])
                 # 更新选择框
                 self.schedule_combobox['values'] = list(self.main_app.schedule["schedules"].keys())
                 self.schedule_combobox.set(new_name)
@@ -233,12 +250,10 @@ class EditorWindow:
         current_name = self.schedule_var.get()
         new_name = self._generate_copy_name(current_name)
         
-        # 深拷贝课表数据
+        # 与原课表共享每一天的课程列表：保存时总是整体替换某一天的列表（写时复制），
+        # 复制课表不会重复占用内存
         original_schedule = self.main_app.schedule["schedules"][current_name]
-        new_schedule = {
-            str(day): [course.copy() for course in courses] 
-            for day, courses in original_schedule.items()
-        }
+        new_schedule = dict(original_schedule)
         
         # 添加新课表
         self.main_app.schedule["last_modified"] = datetime.now().timestamp()
@@ -298,7 +313,7 @@ class EditorWindow:
             if messagebox.askyesno("删除课表", f"确定要删除课表'{current_schedule}'吗？"):
                 # 删除课表
                 del self.main_app.schedule["schedules"][current_schedule]
-                del self.schedule_times[current_schedule]
+                self.schedule_times.pop(current_schedule, None)
                 
                 # 切换到其他课表
                 new_schedule = next(iter(self.main_app.schedule["schedules"]))
@@ -483,11 +498,7 @@ class EditorWindow:
         for row_frame in visible_rows:
             entries = [w for w in row_frame.winfo_children() if isinstance(w, tk.Entry)]
             if len(entries) >= 3:
-                state.append({
-                    "start_time": entries[0].get(),
-                    "end_time": entries[1].get(),
-                    "name": entries[2].get()
-                })
+                state.append(self._row_course(row_frame))
         
         # 如果是初始状态，直接设置
         if initial:
@@ -516,6 +527,7 @@ class EditorWindow:
         # 根据状态重建UI
         for i, course in enumerate(state):
             self.add_course_row(day_frame, i, course, record_state=False)
+        self._highlight_conflicts(day_frame)
 
         # 重建“添加课程”按钮
         style = ttk.Style()
@@ -720,6 +732,7 @@ class EditorWindow:
         # 绘制课程行
         for i, course in enumerate(courses_to_display):
             self.add_course_row(frame, i, course, record_state=False)
+        self._highlight_conflicts(frame)
 
         # 更新课程名称建议
         self.all_courses = self._get_all_courses()
@@ -821,6 +834,23 @@ class EditorWindow:
                 self._capture_state()
         
         history_combobox.bind("<<ComboboxSelected>>", on_history_select)
+
+        # 教室和教师（可选），用于检查跨课表的重复占用
+        ttk.Label(row_frame, text="教室", style="Editor.TLabel").pack(side=tk.LEFT, padx=(4, 0))
+        room_entry = tk.Entry(row_frame, width=6, bd=1, relief=tk.SOLID)
+        room_entry.insert(0, (course or {}).get(COURSE_ROOM, ""))
+        room_entry.pack(side=tk.LEFT, padx=2)
+        room_entry.bind("<FocusOut>", lambda e: self._capture_state())
+        row_frame.room_entry = room_entry # type: ignore
+        ttk.Label(row_frame, text="教师", style="Editor.TLabel").pack(side=tk.LEFT, padx=(4, 0))
+        teacher_entry = tk.Entry(row_frame, width=6, bd=1, relief=tk.SOLID)
+        teacher_entry.insert(0, (course or {}).get(COURSE_TEACHER, ""))
+        teacher_entry.pack(side=tk.LEFT, padx=2)
+        teacher_entry.bind("<FocusOut>", lambda e: self._capture_state())
+        row_frame.teacher_entry = teacher_entry # type: ignore
+        # 编辑器不显示的其他字段原样保留
+        row_frame.extra_fields = {key: value for key, value in (course or {}).items() # type: ignore
+                                  if key not in COURSE_FIELDS + (COURSE_ROOM, COURSE_TEACHER)}
         
         # 自动计算结束时间
         def calculate_end_time():
@@ -945,13 +975,16 @@ class EditorWindow:
                     end_time_entry.config(fg="red")
                 return False
         
-        start_time_entry.bind("<FocusOut>", lambda e: [calculate_end_time(), validate_time(), self._capture_state()])
+        start_time_entry.bind("<FocusOut>", lambda e: [calculate_end_time(), validate_time(),
+                                                       self._highlight_conflicts(parent_frame), self._capture_state()])
         
         # 仅在用户添加新行时（即 course is None）自动计算下一个课程时间
         if course is None:
             calculate_next_course_time()
+            self._highlight_conflicts(parent_frame)
         
-        end_time_entry.bind("<FocusOut>", lambda e: [validate_time(), self._capture_state()])
+        end_time_entry.bind("<FocusOut>", lambda e: [validate_time(), self._highlight_conflicts(parent_frame),
+                                                     self._capture_state()])
         
         # 删除按钮
         ttk.Button(row_frame, text="×", command=lambda: self.delete_course_row(row_frame),
@@ -969,9 +1002,37 @@ class EditorWindow:
         ttk.Button(row_frame, text="↓", command=move_down,
                  style="Editor.TButton", width=2).pack(side=tk.RIGHT, padx=2)
     
+    def _row_course(self, row_frame) -> dict:
+        """读取一行中的课程，教室和教师未填写时不写入"""
+        entries = [w for w in row_frame.winfo_children() if isinstance(w, tk.Entry)]
+        course = {"start_time": entries[0].get(), "end_time": entries[1].get(), "name": entries[2].get()}
+        course.update(getattr(row_frame, "extra_fields", {}))
+        for key, entry in ((COURSE_ROOM, getattr(row_frame, "room_entry", None)),
+                           (COURSE_TEACHER, getattr(row_frame, "teacher_entry", None))):
+            value = entry.get().strip() if entry is not None else ""
+            if value:
+                course[key] = value
+        return course
+
+    def _highlight_conflicts(self, day_frame):
+        """检查一天中各行课程的时间冲突，错误（重叠、时间无效）标红，课间过短标橙"""
+        if not day_frame.winfo_exists():
+            return
+        # 打包顺序即显示顺序
+        rows = [row for row in day_frame.pack_slaves() if hasattr(row, 'row_id')]
+        courses = [{"start_time": row.start_time_entry.get(), "end_time": row.end_time_entry.get(), "name": ""}
+                   for row in rows]
+        errors, warnings = conflicting_indices(analyze_day(courses, self.main_app.config_handler.break_duration))
+        for index, row in enumerate(rows):
+            color = "red" if index in errors else "#e67e22" if index in warnings else "black"
+            row.start_time_entry.config(fg=color)
+            row.end_time_entry.config(fg=color)
+
     def delete_course_row(self, row_frame):
         self._capture_state()
+        day_frame = row_frame.master
         row_frame.destroy()
+        self._highlight_conflicts(day_frame)
         # 标记为已修改
         self.modified = True
         self._capture_state()
@@ -1107,6 +1168,7 @@ class EditorWindow:
                 )
             except Exception as e:
                 logger.log_error(f"日志记录错误: {str(e)}")
+            self._highlight_conflicts(parent)
             self.modified = True
             self._capture_state()
             
@@ -1205,11 +1267,7 @@ class EditorWindow:
                         if row_frame.row_id in self.selected_rows: # type: ignore
                             entries = [w for w in row_frame.winfo_children() if isinstance(w, tk.Entry)]
                             if len(entries) >= 3:
-                                courses_data.append({
-                                    "start_time": entries[0].get(),
-                                    "end_time": entries[1].get(),
-                                    "name": entries[2].get()
-                                })
+                                courses_data.append(self._row_course(row_frame))
             
             if courses_data:
                 try:
@@ -1317,8 +1375,6 @@ class EditorWindow:
     
     def _save_day(self, day_index):
         """保存指定索引日期的课程数据，不进行UI交互。"""
-        import os
-        import shutil
         day_str = str(day_index)
         day_frame = self.day_frames[day_index]
         current_schedule_data = self.main_app.schedule["schedules"][self.current_schedule]
@@ -1332,9 +1388,9 @@ class EditorWindow:
         for row in visible_rows:
             entries = [w for w in row.winfo_children() if isinstance(w, tk.Entry)]
             if len(entries) >= 3:
-                start_time, end_time, name = entries[0].get(), entries[1].get(), entries[2].get()
-                if start_time and end_time and name:
-                    day_schedule.append({"start_time": start_time, "end_time": end_time, "name": name})
+                course = self._row_course(row)
+                if course["start_time"] and course["end_time"] and course["name"]:
+                    day_schedule.append(course)
 
         current_schedule_data[day_str] = day_schedule
         self.last_edited_day = day_str
@@ -1346,16 +1402,8 @@ class EditorWindow:
 
         self.main_app.schedule["last_modified"] = datetime.now().timestamp()
         
-        # 创建备份
-        try:
-            schedule_path = "schedule.json"
-            backup_path = "schedule.json.bak"
-            if os.path.exists(schedule_path):
-                shutil.copy(schedule_path, backup_path)
-        except Exception as e:
-            logger.log_error(f"创建课表备份失败: {e}")
-            
-        self.main_app.save_schedule()
+        # 只写入这一天的课程（以及课表的增删改名），写入前在后台创建备份
+        self.main_app.save_schedule_day(self.current_schedule, day_index, backup=True)
 
     def save(self, show_message=True):
         """保存当前活动标签页的课程。"""
@@ -1367,8 +1415,16 @@ class EditorWindow:
             self._save_day(selected_tab_index)
             self._reset_modified_flag()
             self._clear_history()
-
-            if show_message:
+            clashes = self._occupancy_clashes(selected_tab_index)
+
+            if show_message and clashes:
+                summary = "\n".join(str(clash) for clash in clashes[:10])
+                if len(clashes) > 10:
+                    summary += f"\n……另有 {len(clashes) - 10} 处"
+                messagebox.showwarning("教室/教师冲突",
+                                       f"课表'{self.current_schedule}'已保存，但存在重复占用:\n{summary}",
+                                       parent=self.window)
+            elif show_message:
                 messagebox.showinfo("成功", f"课表'{self.current_schedule}'已保存")
 
             # 保存后立即刷新当前标签页，以确保显示与数据一致
@@ -1381,6 +1437,16 @@ class EditorWindow:
         finally:
             self.is_dialog_open = False
 
+    def _occupancy_clashes(self, day_index):
+        """检查刚保存的一天中的教室和教师是否与其他课程重复占用（当天没有填写时不检查）"""
+        courses = self.main_app.schedule["schedules"][self.current_schedule].get(str(day_index), [])
+        if not any(course.get(COURSE_ROOM) or course.get(COURSE_TEACHER) for course in courses):
+            return []
+        clashes = self.main_app.occupancy_index.clashes_for(self.current_schedule, day_index)
+        for clash in clashes:
+            logger.log_warning(f"重复占用: {clash}")
+        return clashes
+
     def _toggle_row_selection(self, row_id, row_frame):
         """切换行的选中状态"""
         if row_id in self.selected_rows:
@@ -0,0 +1,130 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from logger import logger
+
+# 文件签名：(修改时间ns, 大小)，文件不存在时为None
+Signature = Optional[Tuple[int, int]]
+
+
+def file_signature(path: str) -> Signature:
+    """返回文件当前的签名，文件不存在或无法访问时返回None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class _WatchedFile:
+    __slots__ = ("path", "callback", "signature", "candidate")
+
+    def __init__(self, path: str, callback: Callable[[str], None]):
+        self.path = path
+        self.callback = callback
+        self.signature = file_signature(path)  # 最近一次确认（已加载或程序自己写入）的签名
+        self.candidate: Signature = None        # 检测到但尚未稳定的新签名
+
+
+class FileWatcher:
+    """
+    一个单例类，在后台线程中轮询被监视文件的修改时间和大小，发现外部修改时调用回调。
+    - 新签名需要在连续两次轮询中保持不变才会触发，避免复制脚本写到一半时就去读取；
+    - 程序自己的写入通过 own_write 包裹，写入后直接更新签名，不会触发回调。
+    回调在后台线程中执行，需要操作界面时应通过 after 转交给Tk主线程。
+    每个文件每次轮询只是一次 os.stat，开销可以忽略。
+    """
+    _instance = None
+
+    POLL_INTERVAL = 1.0  # 轮询间隔（秒）
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(FileWatcher, cls).__new__(cls)
+            cls._instance._setup()
+        return cls._instance
+
+    def _setup(self) -> None:
+        self._lock = threading.RLock()
+        self._files: Dict[str, _WatchedFile] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, path: str, callback: Callable[[str], None]) -> None:
+        """
+        开始监视一个文件（重复调用会替换回调并以当前内容为基准）。
+        Args:
+            path: 文件路径
+            callback: 文件被外部修改并稳定后调用，参数为文件路径
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            self._files[key] = _WatchedFile(path, callback)
+        self._ensure_thread()
+
+    def unwatch(self, path: str) -> None:
+        """停止监视一个文件"""
+        with self._lock:
+            self._files.pop(os.path.abspath(path), None)
+
+    def stop(self) -> None:
+        """停止后台轮询线程"""
+        self._stop_event.set()
+
+    @contextmanager
+    def own_write(self, path: str) -> Iterator[None]:
+        """
+        包裹程序自己对文件的写入：写入期间暂停轮询，写入完成后以新内容为基准，
+        因此自己的保存不会被当作外部修改重新加载。
+        """
+        with self._lock:
+            try:
+                yield
+            finally:
+                self.acknowledge(path)
+
+    def acknowledge(self, path: str) -> None:
+        """以文件的当前内容为基准（已经加载过外部修改后调用）"""
+        with self._lock:
+            watched = self._files.get(os.path.abspath(path))
+            if watched is not None:
+                watched.signature = file_signature(watched.path)
+                watched.candidate = None
+
+    def poll(self) -> None:
+        """检查一次所有被监视的文件，对已稳定的外部修改调用回调"""
+        changed = []
+        with self._lock:
+            for watched in self._files.values():
+                signature = file_signature(watched.path)
+                if signature == watched.signature:
+                    watched.candidate = None
+                elif signature is not None and signature == watched.candidate:
+                    # 新内容已经稳定了一个轮询周期
+                    watched.signature = signature
+                    watched.candidate = None
+                    changed.append(watched)
+                else:
+                    # 文件刚被修改（或暂时被删除），等下一次轮询确认
+                    watched.candidate = signature
+        for watched in changed:
+            logger.log_info(f"检测到文件被外部修改: {watched.path}")
+            try:
+                watched.callback(watched.path)
+            except Exception as e:
+                logger.log_error(f"处理文件 {watched.path} 的外部修改失败: {e}")
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._worker, name="FileWatcher", daemon=True)
+            self._thread.start()
+
+    def _worker(self) -> None:
+        while not self._stop_event.wait(self.POLL_INTERVAL):
+            self.poll()
+
+
+# 创建一个全局实例供方便访问
+file_watcher = FileWatcher()
@@ -0,0 +1,134 @@
+import tkinter as tk
+import tkinter.font as tkfont
+from typing import Dict, Optional, Tuple
+
+FONT_FAMILY = "微软雅黑"
+
+
+class FontManager:
+    """
+    一个单例类，管理所有界面共用的命名字体（tkinter.font.Font）和缩放后的尺寸。
+    控件只引用命名字体，字体大小变化时只需重新配置对应的命名字体，
+    Tk会自动更新所有使用它的控件，不必逐个修改标签，也不必每次更新都构造字体元组。
+    尺寸只在DPI缩放因子或字体相关设置变化时（refresh）重新计算。
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(FontManager, cls).__new__(cls)
+        return cls._instance
+
+    def initialize(self, root: tk.Tk, config_handler, dpi_manager):
+        """
+        使用主Tkinter窗口初始化字体管理器。
+        此方法应在DPI管理器初始化之后调用。
+        """
+        if self._initialized and getattr(self, "root", None) is root:
+            return
+
+        self.root = root
+        self.config_handler = config_handler
+        self.dpi_manager = dpi_manager
+        self._fonts: Dict[str, tkfont.Font] = {}
+        self._specs: Dict[str, Tuple[int, str, str]] = {}
+        self._metrics: Dict[str, int] = {}
+        self._cache_key: Optional[tuple] = None
+        self._initialized = True
+        self.refresh()
+
+    def _build_specs(self) -> Dict[str, Tuple[int, str, str]]:
+        """根据当前设置计算每个命名字体的 (字号, 粗细, 倾斜)"""
+        scale = self.dpi_manager.scale
+        handler = self.config_handler
+        time_size = scale(handler.time_display_size)
+        countdown_large = scale(handler.countdown_size)
+        countdown_small = scale(max(1, handler.countdown_size - 4))
+        schedule_size = scale(handler.schedule_size)
+        # 周课表预览沿用未缩放的课表字号
+        preview_size = handler.schedule_size
+
+        return {
+            # 主界面
+            "time": (time_size, "bold", "roman"),
+            "time_italic": (time_size, "bold", "italic"),
+            "countdown_large": (countdown_large, "bold", "roman"),
+            "countdown_small": (countdown_small, "normal", "roman"),
+            "schedule": (schedule_size, "bold", "roman"),
+            "emoji": (scale(12), "normal", "roman"),
+            # 主菜单
+            "menu_button": (scale(12), "normal", "roman"),
+            "menu_text": (scale(14), "normal", "roman"),
+            "menu_title": (scale(24), "bold", "roman"),
+            # 周课表预览
+            "preview_day": (preview_size + 1, "bold", "roman"),
+            "preview_time": (preview_size, "bold", "roman"),
+            "preview_name": (preview_size, "normal", "roman"),
+            "preview_empty": (preview_size - 1, "normal", "italic"),
+            # 全屏时间
+            "fullscreen_time": (300, "bold", "roman"),
+            "fullscreen_subtitle": (40, "normal", "roman"),
+            "small_button": (8, "normal", "roman"),
+            # 课表编辑器
+            "editor_label": (9, "normal", "roman"),
+        }
+
+    def refresh(self) -> bool:
+        """
+        DPI或字体设置变化后调用，只重新配置尺寸发生变化的命名字体。
+        Returns:
+            是否有字体尺寸发生变化
+        """
+        handler = self.config_handler
+        cache_key = (
+            self.dpi_manager.scaling_factor,
+            handler.time_display_size,
+            handler.countdown_size,
+            handler.schedule_size,
+        )
+        if cache_key == self._cache_key:
+            return False
+        self._cache_key = cache_key
+
+        specs = self._build_specs()
+        for name, spec in specs.items():
+            if self._specs.get(name) == spec:
+                continue
+            self._specs[name] = spec
+            font = self._fonts.get(name)
+            if font is not None:
+                size, weight, slant = spec
+                font.configure(size=size, weight=weight, slant=slant)
+
+        schedule_size = specs["schedule"][0]
+        self._metrics = {
+            "schedule_size": schedule_size,
+            # 指示器大小应该是字体大小的1.8倍，以获得更好的视觉效果
+            "indicator_size": int(schedule_size * 1.8),
+        }
+        return True
+
+    def font(self, name: str) -> tkfont.Font:
+        """获取命名字体，首次使用时创建"""
+        font = self._fonts.get(name)
+        if font is None:
+            size, weight, slant = self._specs[name]
+            family = "Segoe UI Emoji" if name == "emoji" else FONT_FAMILY
+            font = tkfont.Font(
+                root=self.root,
+                name=f"CourseScheduler.{name}",
+                family=family,
+                size=size,
+                weight=weight,
+                slant=slant
+            )
+            self._fonts[name] = font
+        return font
+
+    def metric(self, name: str) -> int:
+        """获取预先计算好的缩放尺寸（如 indicator_size）"""
+        return self._metrics[name]
+
+# 创建一个全局实例供方便访问
+font_manager = FontManager()
@@ -0,0 +1,260 @@
+import json
+import os
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from constants import CALENDAR_FILE, WEEKDAYS
+from logger import logger
+from persistence_service import atomic_write_text
+
+# 文本格式中表示“放假”的关键字
+_NO_CLASS_WORDS = ("放假", "停课", "假期")
+
+
+class DayOverride:
+    """某一天的日期覆盖：放假，或按指定课表/星期上课（调休）"""
+    __slots__ = ("date", "no_classes", "weekday", "schedule", "name")
+
+    def __init__(self, day: date, no_classes: bool, weekday: Optional[int] = None,
+                 schedule: Optional[str] = None, name: str = ""):
+        self.date = day
+        self.no_classes = no_classes  # 当天是否停课
+        self.weekday = weekday        # 调休时按星期几上课 (0-6)，None表示不变
+        self.schedule = schedule      # 调休时使用的课表，None表示按轮换/当前课表
+        self.name = name              # 节假日或调休说明
+
+    def to_dict(self) -> Dict:
+        data = {"date": self.date.strftime("%Y-%m-%d")}
+        if self.no_classes:
+            data["no_classes"] = True
+        if self.weekday is not None:
+            data["weekday"] = self.weekday
+        if self.schedule:
+            data["schedule"] = self.schedule
+        if self.name:
+            data["name"] = self.name
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DayOverride":
+        weekday = data.get("weekday")
+        return cls(
+            datetime.strptime(data["date"], "%Y-%m-%d").date(),
+            bool(data.get("no_classes", False)),
+            int(weekday) if weekday is not None else None,
+            data.get("schedule") or None,
+            str(data.get("name", ""))
+        )
+
+    def to_line(self) -> str:
+        """转换为设置界面中的一行文本"""
+        parts = [self.date.strftime("%Y-%m-%d")]
+        if self.no_classes:
+            parts.append("放假")
+        else:
+            parts.append(f"星期{WEEKDAYS[self.weekday if self.weekday is not None else self.date.weekday()]}")
+            if self.schedule:
+                parts.append(self.schedule)
+        if self.name:
+            parts.append(f"#{self.name}")
+        return " ".join(parts)
+
+
+class ResolvedDay:
+    """某一天最终生效的课表安排"""
+    __slots__ = ("date", "schedule_name", "weekday", "no_classes", "override")
+
+    def __init__(self, day: date, schedule_name: Optional[str], weekday: int,
+                 no_classes: bool, override: Optional[DayOverride] = None):
+        self.date = day
+        self.schedule_name = schedule_name  # 使用的课表
+        self.weekday = weekday              # 使用课表中星期几的课程
+        self.no_classes = no_classes        # 是否停课
+        self.override = override            # 生效的日期覆盖，没有时为None
+
+
+def parse_override_lines(text: str) -> List[DayOverride]:
+    """
+    解析多行日期覆盖文本，每行一条，格式为：
+        2026-10-01~2026-10-07 放假 #国庆节
+        2026-10-11 星期五 [课表名] #调休
+    也接受以逗号分隔的CSV行。空行和以 // 开头的行被忽略，格式错误时抛出ValueError。
+    """
+    overrides = []
+    for line_no, raw_line in enumerate(text.splitlines(), start=1):
+        line = raw_line.strip()
+        if not line or line.startswith("//"):
+            continue
+        line, _, name = line.partition("#")
+        parts = line.replace(",", " ").replace("，", " ").split()
+        if len(parts) < 2:
+            raise ValueError(f"第{line_no}行格式错误: {raw_line}")
+        try:
+            days = _parse_date_range(parts[0])
+        except ValueError:
+            raise ValueError(f"第{line_no}行日期无效: {parts[0]}")
+
+        if parts[1] in _NO_CLASS_WORDS:
+            for day in days:
+                overrides.append(DayOverride(day, True, name=name.strip()))
+            continue
+
+        weekday = parse_weekday(parts[1])
+        if weekday is None:
+            raise ValueError(f"第{line_no}行星期无效: {parts[1]}")
+        schedule = parts[2] if len(parts) > 2 else None
+        for day in days:
+            overrides.append(DayOverride(day, False, weekday, schedule, name.strip()))
+    return overrides
+
+
+def read_override_file(path: str) -> List[DayOverride]:
+    """读取日期覆盖文件，支持本程序保存的JSON文件以及每行一条的文本/CSV文件"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        content = f.read()
+    if path.lower().endswith(".json"):
+        data = json.loads(content)
+        return [DayOverride.from_dict(item) for item in data.get("overrides", [])]
+    return parse_override_lines(content)
+
+
+def _parse_date_range(text: str) -> List[date]:
+    start_text, _, end_text = text.partition("~")
+    start = datetime.strptime(start_text, "%Y-%m-%d").date()
+    end = datetime.strptime(end_text, "%Y-%m-%d").date() if end_text else start
+    if end < start:
+        raise ValueError(text)
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def parse_weekday(text: str) -> Optional[int]:
+    """解析“星期五”、“周五”或1-7的数字"""
+    for prefix in ("星期", "周"):
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            break
+    if text in WEEKDAYS:
+        return WEEKDAYS.index(text)
+    if text == "天":
+        return 6
+    if text.isdigit() and 1 <= int(text) <= 7:
+        return int(text) - 1
+    return None
+
+
+class HolidayCalendar:
+    """
+    节假日与调休日历。
+    日期覆盖保存在 calendar.json 中，加载后编译为以日期序数（date.toordinal()）为键的字典，
+    每次查询都是O(1)。
+    """
+
+    def __init__(self, path: str = CALENDAR_FILE):
+        self.path = path
+        self._overrides: Dict[int, DayOverride] = {}
+        self.version = 0  # 每次内容变化时递增，供缓存判断是否失效
+
+    def load(self) -> None:
+        """从文件加载日期覆盖，文件不存在时为空日历"""
+        overrides = []
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for item in data.get("overrides", []):
+                    try:
+                        overrides.append(DayOverride.from_dict(item))
+                    except (KeyError, ValueError, TypeError) as e:
+                        logger.log_warning(f"忽略无效的日期覆盖 {item}: {e}")
+            except (OSError, json.JSONDecodeError) as e:
+                logger.log_error(f"加载节假日日历失败: {e}")
+        self._compile(overrides)
+
+    def save(self) -> None:
+        """保存日期覆盖到文件"""
+        data = {"overrides": [override.to_dict() for override in self.overrides]}
+        atomic_write_text(self.path, json.dumps(data, ensure_ascii=False, indent=2))
+
+    @property
+    def overrides(self) -> List[DayOverride]:
+        """按日期排序的所有日期覆盖"""
+        return [self._overrides[key] for key in sorted(self._overrides)]
+
+    def lookup(self, day: date) -> Optional[DayOverride]:
+        """返回某一天的日期覆盖，没有时返回None"""
+        return self._overrides.get(day.toordinal())
+
+    def replace_all(self, overrides: List[DayOverride]) -> None:
+        """用新的日期覆盖替换整个日历（同一天出现多次时以最后一条为准）"""
+        self._compile(overrides)
+
+    def merge(self, overrides: List[DayOverride]) -> None:
+        """批量导入日期覆盖，与已有内容合并"""
+        self._compile(self.overrides + list(overrides))
+
+    def import_file(self, path: str) -> int:
+        """从文件批量导入日期覆盖，返回导入的条数"""
+        overrides = read_override_file(path)
+        self.merge(overrides)
+        return len(overrides)
+
+    def _compile(self, overrides: List[DayOverride]) -> None:
+        self._overrides = {override.date.toordinal(): override for override in overrides}
+        self.version += 1
+
+
+class DayResolver:
+    """
+    计算某一天最终生效的课表安排：先查日期覆盖，再按课表轮换选择课表。
+    结果按日期保存在LRU缓存中，日历、课表或轮换设置变化时通过invalidate清空，
+    因此逐秒更新的路径上没有额外开销，整周、整学期的查询也不会冲掉今天的结果。
+    """
+
+    CACHE_SIZE = 64  # 缓存的天数
+
+    def __init__(self, holiday_calendar: HolidayCalendar, schedule_name_for: Callable[[date], str]):
+        """
+        Args:
+            holiday_calendar: 节假日与调休日历
+            schedule_name_for: 返回某一天按轮换应使用的课表名称
+        """
+        self.holiday_calendar = holiday_calendar
+        self.schedule_name_for = schedule_name_for
+        self._cache: "OrderedDict[date, ResolvedDay]" = OrderedDict()
+        self._cache_key: Optional[Tuple[int, int]] = None
+        self._revision = 0
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        """解析结果的版本，日历或课表变化后改变"""
+        return (self.holiday_calendar.version, self._revision)
+
+    def invalidate(self) -> None:
+        """课表或轮换设置变化后清空缓存"""
+        self._revision += 1
+        self._cache.clear()
+
+    def resolve(self, day: date) -> ResolvedDay:
+        """返回某一天的课表安排"""
+        if self._cache_key != self.version:
+            self._cache.clear()
+            self._cache_key = self.version
+        resolved = self._cache.get(day)
+        if resolved is None:
+            resolved = self._resolve(day)
+            self._cache[day] = resolved
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(day)
+        return resolved
+
+    def _resolve(self, day: date) -> ResolvedDay:
+        override = self.holiday_calendar.lookup(day)
+        if override is None:
+            return ResolvedDay(day, self.schedule_name_for(day), day.weekday(), False)
+        if override.no_classes:
+            return ResolvedDay(day, None, day.weekday(), True, override)
+        weekday = override.weekday if override.weekday is not None else day.weekday()
+        schedule_name = override.schedule or self.schedule_name_for(day)
+        return ResolvedDay(day, schedule_name, weekday, False, override)
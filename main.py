@@ -79,5 +79,7 @@ if __name__ == "__main__":
         app.root.mainloop()
     finally:
         s.close()
+        # 菜单中的退出只结束主循环，在这里写完尚未落盘的修改并合并课表修改日志
+        app.flush_on_exit()
         logger.shutdown()
 
@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import ttk
 from typing import Callable
 from constants import VERSION
+from font_manager import font_manager
 
 class MainMenu:
     """主菜单类"""
@@ -43,13 +44,13 @@ class MainMenu:
         # 动态配置样式
         self.style.configure("TFrame", background="white")
         self.style.configure("TLabel", background="white",
-                           font=("微软雅黑", self.dpi_manager.scale(14)))
-        self.style.configure("Title.TLabel", font=("微软雅黑", self.dpi_manager.scale(24), "bold"),
+                           font=font_manager.font("menu_text"))
+        self.style.configure("Title.TLabel", font=font_manager.font("menu_title"),
                            foreground="#2c3e50")
-        self.style.configure("Subtitle.TLabel", font=("微软雅黑", self.dpi_manager.scale(14)),
+        self.style.configure("Subtitle.TLabel", font=font_manager.font("menu_text"),
                            foreground="#7f8c8d")
         scaled_padding = self.dpi_manager.scale(10)
-        self.style.configure("TButton", font=("微软雅黑", self.dpi_manager.scale(12)),
+        self.style.configure("TButton", font=font_manager.font("menu_button"),
                            padding=scaled_padding)
         self.style.map("TButton",
                       foreground=[("active", "#ffffff")],
@@ -98,10 +99,9 @@ class MainMenu:
     def create_menu_button(self, parent: tk.Widget) -> ttk.Button:
         """创建主菜单按钮"""
         # 动态配置主菜单按钮样式
-        scaled_font_size = self.dpi_manager.scale(12)
         scaled_padding = self.dpi_manager.scale(3)
         self.style.configure("Menu.TButton",
-                           font=("微软雅黑", scaled_font_size),
+                           font=font_manager.font("menu_button"),
                            padding=scaled_padding,
                            width=8,
                            foreground="#000000",
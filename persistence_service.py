@@ -0,0 +1,213 @@
+import atexit
+import os
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional, Set
+from logger import logger
+from file_watcher import file_watcher
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """
+    原子化写入文本文件：先写入同目录下的临时文件并fsync，再用os.replace替换原文件。
+    写入过程中崩溃或断电时，原文件保持完整；替换登记为程序自己的写入，不会触发热重载。
+    """
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        with file_watcher.own_write(path):
+            os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    # POSIX下还需要同步目录项，Windows不支持打开目录
+    if os.name != "nt":
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class PersistenceService:
+    """
+    一个单例类，在后台线程中执行课表和配置的保存（write-behind）。
+    界面线程只提交已经生成好快照的写入任务，不等待磁盘；
+    同一个键的任务在防抖窗口内多次提交时只保留最后一次，
+    所有待写任务在最近一次提交后安静 DEBOUNCE_SECONDS 秒（最长 MAX_DELAY_SECONDS 秒）后
+    按提交顺序依次执行。程序退出或重启前调用flush/shutdown确保所有修改落盘。
+    写入失败（磁盘已满、没有权限等）的任务保留在队列中，RETRY_SECONDS 秒后重试，
+    并通过错误处理函数通知界面（每个任务从成功到失败时通知一次）。
+    """
+    _instance = None
+
+    DEBOUNCE_SECONDS = 0.5
+    MAX_DELAY_SECONDS = 3.0
+    RETRY_SECONDS = 5.0
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(PersistenceService, cls).__new__(cls)
+            cls._instance._setup()
+        return cls._instance
+
+    def _setup(self) -> None:
+        self._condition = threading.Condition()
+        self._pending: Dict[Hashable, Callable[[], None]] = {}
+        self._first_submit: Optional[float] = None
+        self._last_submit: Optional[float] = None
+        self._writing = False
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._failed: Set[Hashable] = set()     # 上次写入失败、等待重试的任务键
+        self._retry_at: Optional[float] = None
+        self._drain_count = 0
+        self._error_handler: Optional[Callable[[Hashable, Exception], None]] = None
+
+    def set_error_handler(self, handler: Optional[Callable[[Hashable, Exception], None]]) -> None:
+        """
+        设置写入失败时的处理函数。
+        处理函数在后台线程中调用，界面程序应通过 root.after 转到界面线程再显示提示。
+        """
+        self._error_handler = handler
+
+    def submit(self, key: Hashable, write: Callable[[], None]) -> None:
+        """
+        提交一个写入任务。
+        Args:
+            key: 任务键，相同键的待写任务会被新任务替换
+            write: 在后台线程执行的写入函数，应只使用提交时的数据快照
+        """
+        with self._condition:
+            if self._stopped:
+                # 已经关闭，直接同步写入
+                self._run_reporting(key, write)
+                return
+            now = time.monotonic()
+            # 重新插入，使字典顺序始终为最后一次提交的顺序
+            self._pending.pop(key, None)
+            self._pending[key] = write
+            if self._first_submit is None:
+                self._first_submit = now
+            self._last_submit = now
+            self._ensure_thread()
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即执行所有待写任务（包括等待重试的任务）并等待完成。
+        返回是否全部写入成功；超时或只剩下再次失败的任务时返回False。
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                if self._pending:
+                    self._drain()
+                return not self._pending
+            # 正在进行的一轮写入不一定包含等待重试的任务，从下一轮开始计算
+            start = self._drain_count + (1 if self._writing else 0)
+            self._retry_at = None
+            while self._pending or self._writing:
+                if not self._writing and self._drain_count > start and set(self._pending) <= self._failed:
+                    # 重试过一次仍然失败，不再等待
+                    return False
+                if self._pending:
+                    self._retry_at = None
+                    # 写入期间新提交的任务同样立即写入
+                    self._first_submit = self._last_submit = float("-inf")
+                    self._condition.notify_all()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = 10.0) -> None:
+        """写入所有待写任务并停止后台线程；之后提交的任务将同步执行"""
+        self.flush(timeout)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    @property
+    def has_pending(self) -> bool:
+        with self._condition:
+            return bool(self._pending) or self._writing
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._worker, name="PersistenceService", daemon=True)
+            self._thread.start()
+
+    def _due_time(self) -> float:
+        due = min(self._last_submit + self.DEBOUNCE_SECONDS, self._first_submit + self.MAX_DELAY_SECONDS)
+        return max(due, self._retry_at) if self._retry_at is not None else due
+
+    def _worker(self) -> None:
+        with self._condition:
+            while not self._stopped:
+                if not self._pending:
+                    self._condition.wait()
+                    continue
+                delay = self._due_time() - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                self._drain()
+
+    def _drain(self) -> None:
+        """执行当前所有待写任务，调用时必须持有锁；写入期间释放锁，界面线程可以继续提交"""
+        batch = self._pending
+        self._pending = {}
+        self._first_submit = self._last_submit = None
+        self._retry_at = None
+        self._writing = True
+        failed = {}
+        self._condition.release()
+        try:
+            for key, write in batch.items():
+                if not self._run_reporting(key, write):
+                    failed[key] = write
+        finally:
+            self._condition.acquire()
+            self._writing = False
+            self._drain_count += 1
+            if failed:
+                # 失败的任务放回队列最前面（保持提交顺序），期间提交的同键新任务优先
+                retry = {key: write for key, write in failed.items() if key not in self._pending}
+                retry.update(self._pending)
+                self._pending = retry
+                now = time.monotonic()
+                if self._first_submit is None:
+                    self._first_submit = self._last_submit = now
+                self._retry_at = now + self.RETRY_SECONDS
+            self._condition.notify_all()
+
+    def _run_reporting(self, key: Hashable, write: Callable[[], None]) -> bool:
+        """执行一个写入任务，返回是否成功；任务第一次失败时调用错误处理函数"""
+        try:
+            write()
+        except Exception as e:
+            logger.log_error(f"后台保存 {key} 失败: {e}")
+            if key not in self._failed:
+                self._failed.add(key)
+                handler = self._error_handler
+                if handler is not None:
+                    try:
+                        handler(key, e)
+                    except Exception as handler_error:
+                        logger.log_error(f"处理保存失败时出错: {handler_error}")
+            return False
+        self._failed.discard(key)
+        return True
+
+
+# 创建一个全局实例供方便访问
+persistence_service = PersistenceService()
+# 没有调用shutdown就正常退出的程序（命令行工具等）在解释器退出前写完待写任务，
+# 后台线程是守护线程，否则尚未写入的配置会被直接丢弃
+atexit.register(persistence_service.shutdown)
@@ -5,6 +5,7 @@ import tempfile
 import logging
 from tkinter import messagebox
 from logger import logger
+from persistence_service import persistence_service
 
 class RestartManager:
     @staticmethod
@@ -47,6 +48,8 @@ class RestartManager:
     @staticmethod
     def restart_application(main_app, app_path=None, open_settings=False):
         """执行进程级完全重启"""
+        # 重启脚本会直接结束当前进程，先写完所有尚未落盘的课表和配置
+        persistence_service.flush()
         try:
             # 记录调试信息
             logger.log_debug(f"开始生成重启脚本 - 工作目录: {os.getcwd()}")
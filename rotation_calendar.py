@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+# 预先计算的周数（约一个学期）
+TERM_WEEKS = 26
+
+
+class RotationCalendar:
+    """
+    N周课表轮换日历。
+    轮换周期由 rotation_schedule1、rotation_schedule2 和 rotation_extra_schedules 依次组成
+    （第一周、第二周、第三周……），只配置前两项时与旧版的单双周轮换完全一致。
+    配置或课表变化时预先计算整个学期的 日期→课表 对照表，主界面、周课表预览和编辑器
+    查询某一天的课表都是O(1)；超出学期范围的日期按周数取模计算。
+    """
+
+    def __init__(self, config_handler):
+        self.config_handler = config_handler
+        self._table: Dict[date, str] = {}
+        self._cycle: List[str] = []
+        self._schedule_names: List[str] = []
+        self._anchor: Optional[date] = None
+        self._config_key: Optional[tuple] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.config_handler.schedule_rotation_enabled
+
+    def configured_cycle(self) -> List[str]:
+        """配置中的轮换周期（可能包含已不存在的课表）"""
+        handler = self.config_handler
+        cycle = [handler.rotation_schedule1, handler.rotation_schedule2]
+        cycle.extend(name for name in handler.rotation_extra_schedules if name)
+        return cycle
+
+    def rebuild(self, schedule_names: List[str], today: Optional[date] = None) -> None:
+        """
+        课表列表或轮换配置变化后重新计算对照表。
+        Args:
+            schedule_names: 当前存在的所有课表名称
+            today: 学期对照表的起算日期，默认为今天
+        """
+        self._schedule_names = list(schedule_names)
+        self._cycle = self._resolve_cycle(self.configured_cycle(), self._schedule_names)
+        self._anchor = self.config_handler.rotation_start_date.date()
+        self._config_key = self._current_config_key()
+
+        # 从今天所在的轮换周开始，预先计算整个学期
+        today = today or date.today()
+        week_start = today - timedelta(days=(today - self._anchor).days % 7)
+        self._table = {}
+        for offset in range(TERM_WEEKS * 7):
+            day = week_start + timedelta(days=offset)
+            self._table[day] = self._compute(day)
+
+    def schedule_for(self, day: date) -> Optional[str]:
+        """返回某一天应使用的课表名称，未启用轮换时返回None"""
+        if not self.enabled:
+            return None
+        if self._current_config_key() != self._config_key:
+            self.rebuild(self._schedule_names)
+        name = self._table.get(day)
+        if name is None:
+            name = self._compute(day)
+        return name
+
+    def week_number(self, day: date) -> int:
+        """某一天位于轮换周期中的第几周（从1开始）"""
+        if not self._cycle:
+            return 1
+        return (day - self._anchor).days // 7 % len(self._cycle) + 1
+
+    def _compute(self, day: date) -> Optional[str]:
+        if not self._cycle:
+            return None
+        return self._cycle[(day - self._anchor).days // 7 % len(self._cycle)]
+
+    def _current_config_key(self) -> tuple:
+        handler = self.config_handler
+        return (handler.rotation_start_date, tuple(self.configured_cycle()))
+
+    @staticmethod
+    def _resolve_cycle(cycle: List[str], schedule_names: List[str]) -> List[str]:
+        """将不存在的课表替换为可用课表：第一周回退到第一个课表，其余回退到最后一个课表"""
+        if not schedule_names:
+            return []
+        resolved = []
+        for week, name in enumerate(cycle):
+            if name not in schedule_names:
+                name = schedule_names[0] if week == 0 else schedule_names[-1]
+            resolved.append(name)
+        return resolved
@@ -0,0 +1,135 @@
+"""
+课表文档的紧凑存储格式。
+
+课表中同一节次的时间、同一门课的名称会重复出现成百上千次，复制出来的课表更是整套重复。
+紧凑格式把它们各存一份，课表只保存引用：
+
+    {
+      "packed": 1,
+      "periods": [["08:00", "08:45"], ...],      # 节次时间表
+      "names": ["语文", ...],                      # 课程名称表
+      "days": [[[0, 0], [1, 3]], ...],            # 一天的课程：[节次, 名称] 或 [节次, 名称, 其他字段]
+      "schedules": {"A": [0, 1, 1, 1, 2, 3, 3]},  # 星期一到星期日各引用一个 days，null 表示没有该天
+      "current_schedule": "A", ...
+    }
+
+复制的课表只多出七个下标，文件大小不再随复制次数增长。
+结构不规范的课表（多余的键、缺少字段的课程等）原样保存为 {"raw": 课表}，解码后与原文档完全相同。
+解码时内容相同的天共享同一个列表、相同的课程共享同一个字典；
+程序中修改课表都是整体替换某一天的列表（写时复制），不会原地修改共享的对象。
+"""
+import sys
+from typing import Dict, List, Optional
+
+PACKED_VERSION = 1
+
+_WEEKDAY_KEYS = tuple(str(weekday) for weekday in range(7))
+_COURSE_KEYS = ("start_time", "end_time", "name")
+
+
+def is_packed(document) -> bool:
+    return isinstance(document, dict) and document.get("packed") == PACKED_VERSION
+
+
+class _Tables:
+    """编码时的去重表：值 → 下标"""
+
+    def __init__(self):
+        self.periods: List[List[str]] = []
+        self.names: List[str] = []
+        self.days: List[List[list]] = []
+        self._period_ids: Dict[tuple, int] = {}
+        self._name_ids: Dict[str, int] = {}
+        self._day_ids: Dict[tuple, int] = {}
+
+    def _add(self, table: list, ids: dict, key, value) -> int:
+        index = ids.get(key)
+        if index is None:
+            index = ids[key] = len(table)
+            table.append(value)
+        return index
+
+    def pack_course(self, course) -> Optional[list]:
+        """编码一门课程，不是规范的课程字典时返回None"""
+        if not isinstance(course, dict) or not all(isinstance(course.get(key), str) for key in _COURSE_KEYS):
+            return None
+        start, end, name = course["start_time"], course["end_time"], course["name"]
+        packed = [self._add(self.periods, self._period_ids, (start, end), [start, end]),
+                  self._add(self.names, self._name_ids, name, name)]
+        if len(course) > len(_COURSE_KEYS):
+            packed.append({key: value for key, value in course.items() if key not in _COURSE_KEYS})
+        return packed
+
+    def pack_day(self, courses) -> Optional[int]:
+        """编码一天的课程，返回days中的下标；无法编码时返回None"""
+        if not isinstance(courses, list):
+            return None
+        packed = []
+        for course in courses:
+            item = self.pack_course(course)
+            if item is None:
+                return None
+            packed.append(item)
+        key = tuple((item[0], item[1]) if len(item) == 2 else (item[0], item[1], repr(sorted(item[2].items())))
+                    for item in packed)
+        return self._add(self.days, self._day_ids, key, packed)
+
+    def pack_schedule(self, schedule):
+        """编码一套课表，结构不规范时原样保存"""
+        if not isinstance(schedule, dict) or any(key not in _WEEKDAY_KEYS for key in schedule):
+            return {"raw": schedule}
+        refs = []
+        for key in _WEEKDAY_KEYS:
+            if key not in schedule:
+                refs.append(None)
+                continue
+            index = self.pack_day(schedule[key])
+            if index is None:
+                return {"raw": schedule}
+            refs.append(index)
+        return refs
+
+
+def pack_document(document: Dict) -> Dict:
+    """将课表文档编码为紧凑格式（旧版单套课表等没有schedules的文档原样返回）"""
+    if not isinstance(document, dict) or not isinstance(document.get("schedules"), dict) or is_packed(document):
+        return document
+    tables = _Tables()
+    schedules = {name: tables.pack_schedule(schedule) for name, schedule in document["schedules"].items()}
+    packed = {key: value for key, value in document.items() if key != "schedules"}
+    packed.update(packed=PACKED_VERSION, periods=tables.periods, names=tables.names, days=tables.days,
+                  schedules=schedules)
+    return packed
+
+
+def unpack_document(document: Dict) -> Dict:
+    """将紧凑格式解码为普通课表文档；普通格式原样返回"""
+    if not is_packed(document):
+        return document
+    periods = document.get("periods", [])
+    names = [sys.intern(name) for name in document.get("names", [])]
+    course_cache: Dict[tuple, Dict] = {}
+
+    def course_at(item: list) -> Dict:
+        if len(item) > 2:
+            start, end = periods[item[0]]
+            return {"start_time": start, "end_time": end, "name": names[item[1]], **item[2]}
+        key = (item[0], item[1])
+        course = course_cache.get(key)
+        if course is None:
+            start, end = periods[item[0]]
+            course = course_cache[key] = {"start_time": start, "end_time": end, "name": names[item[1]]}
+        return course
+
+    days = [[course_at(item) for item in day] for day in document.get("days", [])]
+    schedules = {}
+    for name, schedule in document.get("schedules", {}).items():
+        if isinstance(schedule, list):
+            schedules[name] = {key: days[ref] for key, ref in zip(_WEEKDAY_KEYS, schedule) if ref is not None}
+        else:
+            schedules[name] = schedule["raw"]
+
+    unpacked = {key: value for key, value in document.items()
+                if key not in ("packed", "periods", "names", "days", "schedules")}
+    unpacked["schedules"] = schedules
+    return unpacked
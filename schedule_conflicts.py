@@ -0,0 +1,172 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from constants import WEEKDAYS
+from schedule_model import Course, parse_course
+
+# 问题类型
+KIND_INVALID_COURSE = "invalid_course"      # 课程不是字典、一天的课程不是列表等结构错误
+KIND_INVALID_TIME = "invalid_time"          # 时间格式错误
+KIND_END_BEFORE_START = "end_before_start"  # 结束时间不晚于开始时间
+KIND_OVERLAP = "overlap"                    # 与其他课程时间重叠
+KIND_SHORT_BREAK = "short_break"            # 与上一节课的间隔短于课间时长（提示）
+
+_ERROR_KINDS = (KIND_INVALID_COURSE, KIND_INVALID_TIME, KIND_END_BEFORE_START, KIND_OVERLAP)
+
+
+class Conflict:
+    """课表中的一处问题"""
+    __slots__ = ("kind", "schedule", "weekday", "indices", "message")
+
+    def __init__(self, kind: str, schedule: str, weekday: int, indices: Tuple[int, ...], message: str):
+        self.kind = kind
+        self.schedule = schedule  # 课表名称
+        self.weekday = weekday    # 星期几（0-6），整套课表格式错误时为-1
+        self.indices = indices    # 涉及的课程在当天课程列表中的位置
+        self.message = message
+
+    @property
+    def is_error(self) -> bool:
+        """是否是必须修正的错误（间隔过短只是提示）"""
+        return self.kind in _ERROR_KINDS
+
+    def to_dict(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "schedule": self.schedule,
+            "weekday": self.weekday,
+            "indices": list(self.indices),
+            "message": self.message,
+        }
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class ConflictReport:
+    """整个课表文档的检查结果"""
+
+    def __init__(self, conflicts: Optional[List[Conflict]] = None):
+        self.conflicts: List[Conflict] = conflicts or []
+
+    @property
+    def errors(self) -> List[Conflict]:
+        return [conflict for conflict in self.conflicts if conflict.is_error]
+
+    @property
+    def warnings(self) -> List[Conflict]:
+        return [conflict for conflict in self.conflicts if not conflict.is_error]
+
+    @property
+    def has_errors(self) -> bool:
+        return any(conflict.is_error for conflict in self.conflicts)
+
+    def for_day(self, schedule: str, weekday: int) -> List[Conflict]:
+        return [c for c in self.conflicts if c.schedule == schedule and c.weekday == weekday]
+
+    def summary(self, limit: int = 20) -> str:
+        """多行文本摘要，超过limit条时省略其余部分"""
+        lines = [str(conflict) for conflict in self.conflicts[:limit]]
+        if len(self.conflicts) > limit:
+            lines.append(f"……另有 {len(self.conflicts) - limit} 处问题")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict:
+        return {
+            "errors": len(self.errors),
+            "warnings": len(self.warnings),
+            "conflicts": [conflict.to_dict() for conflict in self.conflicts],
+        }
+
+
+def _label(course: Course) -> str:
+    return f"{course.start_time}-{course.end_time} {course.name}".strip()
+
+
+def analyze_day(courses: Iterable, min_break: int = 0, schedule: str = "", weekday: int = 0) -> List[Conflict]:
+    """
+    检查一天的课程：按开始时间排序后扫描一遍，O(n log n)。
+    扫描时只记住已扫描课程中结束最晚的一门，后面的课程在它结束前开始即为重叠，
+    在它结束后不足min_break分钟开始即为间隔过短。
+    Args:
+        courses: 课程字典或Course列表（保持课表中的顺序，问题中的位置即该列表中的下标）
+        min_break: 最短课间（分钟），为0时不检查间隔
+        schedule, weekday: 写入结果中的课表名称和星期
+    """
+    conflicts = []
+    prefix = f"{schedule} " if schedule else ""
+    prefix += f"星期{WEEKDAYS[weekday]}: " if 0 <= weekday < 7 else ""
+    intervals = []
+    for index, data in enumerate(courses):
+        if not isinstance(data, (dict, Course)):
+            # 手工整理的课表文件中可能混入其他内容，报告该位置而不是中断检查
+            conflicts.append(Conflict(KIND_INVALID_COURSE, schedule, weekday, (index,),
+                                      f"{prefix}第{index + 1}门课程格式不正确: {data!r}"))
+            continue
+        course = parse_course(data)
+        if not course.is_valid:
+            conflicts.append(Conflict(KIND_INVALID_TIME, schedule, weekday, (index,),
+                                      f"{prefix}'{_label(course)}' 的时间格式不正确"))
+        elif course.end <= course.start:
+            conflicts.append(Conflict(KIND_END_BEFORE_START, schedule, weekday, (index,),
+                                      f"{prefix}'{_label(course)}' 的结束时间不晚于开始时间"))
+        else:
+            intervals.append((course.start, course.end, index, course))
+
+    intervals.sort()
+    latest: Optional[Tuple[int, int, int, Course]] = None  # 已扫描的课程中结束最晚的一门
+    for interval in intervals:
+        start, end, index, course = interval
+        if latest is not None:
+            _, latest_end, latest_index, latest_course = latest
+            if start < latest_end:
+                conflicts.append(Conflict(KIND_OVERLAP, schedule, weekday, (latest_index, index),
+                                          f"{prefix}'{_label(course)}' 与 '{_label(latest_course)}' 时间重叠"))
+            elif start - latest_end < min_break:
+                conflicts.append(Conflict(KIND_SHORT_BREAK, schedule, weekday, (latest_index, index),
+                                          f"{prefix}'{_label(latest_course)}' 与 '{_label(course)}' "
+                                          f"之间只有 {start - latest_end} 分钟课间"))
+        if latest is None or end > latest[1]:
+            latest = interval
+    return conflicts
+
+
+def analyze_schedule(name: str, data: Dict, min_break: int = 0) -> List[Conflict]:
+    """检查一套课表（键为 "0"~"6" 的字典）的七天"""
+    conflicts = []
+    for weekday in range(7):
+        courses = data.get(str(weekday), [])
+        if not isinstance(courses, list):
+            conflicts.append(Conflict(KIND_INVALID_COURSE, name, weekday, (),
+                                      f"{name} 星期{WEEKDAYS[weekday]}: 课程必须是列表: {courses!r}"))
+        elif courses:
+            conflicts.extend(analyze_day(courses, min_break, name, weekday))
+    return conflicts
+
+
+def analyze_document(document: Dict, min_break: int = 0,
+                     schedule_names: Optional[Iterable[str]] = None) -> ConflictReport:
+    """
+    检查课表文档中的所有课表。
+    Args:
+        document: 课表文档（包含 schedules）
+        min_break: 最短课间（分钟），为0时不检查间隔
+        schedule_names: 只检查这些课表，默认检查全部
+    """
+    schedules = document.get("schedules", {})
+    names = list(schedules) if schedule_names is None else [name for name in schedule_names if name in schedules]
+    report = ConflictReport()
+    for name in names:
+        data = schedules[name]
+        if isinstance(data, dict):
+            report.conflicts.extend(analyze_schedule(name, data, min_break))
+        else:
+            report.conflicts.append(Conflict(KIND_INVALID_COURSE, name, -1, (),
+                                             f"{name}: 课表必须是以星期为键的字典"))
+    return report
+
+
+def conflicting_indices(conflicts: Iterable[Conflict]) -> Tuple[Set[int], Set[int]]:
+    """返回 (有错误的课程位置, 只有提示的课程位置)，用于在编辑器中标出对应的行"""
+    errors, warnings = set(), set()
+    for conflict in conflicts:
+        (errors if conflict.is_error else warnings).update(conflict.indices)
+    return errors, warnings - errors
@@ -0,0 +1,202 @@
+import bisect
+from datetime import datetime, timedelta, time
+from typing import Dict, List, Optional, Sequence
+from schedule_model import Course, InternPool, Schedule, parse_course, parse_schedule
+
+# 课程状态
+STATUS_PENDING = "pending"    # 未开始
+STATUS_ONGOING = "ongoing"    # 进行中
+STATUS_FINISHED = "finished"  # 已结束
+
+
+def make_course_keys(courses: Sequence[Course]) -> List[tuple]:
+    """
+    为课程列表生成稳定的身份键。
+    键由课程名称和起止时间组成，同一天内完全相同的课程按出现次序区分，
+    因此课程顺序调整或增删时，未变化的课程仍能对应到原来的控件。
+    """
+    seen: Dict[tuple, int] = {}
+    keys = []
+    for course in courses:
+        identity = (course.name, course.start_time, course.end_time)
+        occurrence = seen.get(identity, 0)
+        seen[identity] = occurrence + 1
+        keys.append(identity + (occurrence,))
+    return keys
+
+
+def minute_of_day(now: datetime) -> float:
+    """返回当前时间在一天中的分钟数（含秒的小数部分）"""
+    return now.hour * 60 + now.minute + (now.second + now.microsecond / 1_000_000) / 60
+
+
+class CourseInterval:
+    """一门课程编译后的时间区间"""
+    __slots__ = ("position", "start", "end", "course")
+
+    def __init__(self, position: int, start: int, end: int, course: Course):
+        self.position = position  # 在当天课程列表中的位置
+        self.start = start        # 开始时间（当天分钟数）
+        self.end = end            # 结束时间（当天分钟数）
+        self.course = course      # 课程对象
+
+
+class DayIndex:
+    """
+    单日课程的区间索引。
+    课程由schedule_model加载为Course对象，时间已是分钟数，按开始/结束时间排序后
+    所有查询均通过bisect完成。时间格式错误的课程不参与索引，始终视为未开始。
+    """
+
+    def __init__(self, courses: Sequence):
+        """
+        Args:
+            courses: 当天的课程（Course对象，或课表JSON中的课程字典）
+        """
+        self.courses = tuple(parse_course(course) for course in courses)
+        self.keys = make_course_keys(self.courses)  # 每门课程的身份键，供渲染器协调控件
+        self.intervals: List[Optional[CourseInterval]] = [
+            CourseInterval(position, course.start, course.end, course) if course.is_valid else None
+            for position, course in enumerate(self.courses)
+        ]
+
+        valid = [interval for interval in self.intervals if interval is not None]
+        self._by_start = sorted(valid, key=lambda interval: (interval.start, interval.end))
+        self._starts = [interval.start for interval in self._by_start]
+        self._ends = sorted(interval.end for interval in valid)
+        # 按开始时间排序后的结束时间前缀最大值，用于快速判断是否有课程正在进行
+        self._max_end_prefix = []
+        max_end = -1
+        for interval in self._by_start:
+            max_end = max(max_end, interval.end)
+            self._max_end_prefix.append(max_end)
+
+    @property
+    def course_count(self) -> int:
+        """时间格式有效的课程数量"""
+        return len(self._ends)
+
+    @property
+    def intervals_by_start(self) -> List[CourseInterval]:
+        """按开始时间排序的课程区间（不含时间格式错误的课程）"""
+        return self._by_start
+
+    @property
+    def courses_by_start(self) -> List[Course]:
+        """按开始时间排序的课程，时间格式错误的课程排在最后"""
+        return [interval.course for interval in self._by_start] + \
+            [course for course, interval in zip(self.courses, self.intervals) if interval is None]
+
+    @property
+    def last_end(self) -> Optional[int]:
+        """当天最后一节课的结束时间（分钟数）"""
+        return self._ends[-1] if self._ends else None
+
+    def status(self, position: int, minute: float) -> str:
+        """返回指定位置的课程在给定时间的状态"""
+        interval = self.intervals[position]
+        if interval is None or minute < interval.start:
+            return STATUS_PENDING
+        if minute <= interval.end:
+            return STATUS_ONGOING
+        return STATUS_FINISHED
+
+    def current_course(self, minute: float) -> Optional[CourseInterval]:
+        """返回给定时间正在进行的课程（有重叠时返回最晚开始的一门）"""
+        i = bisect.bisect_right(self._starts, minute) - 1
+        if i < 0 or self._max_end_prefix[i] < minute:
+            return None
+        while i >= 0:
+            if self._by_start[i].end >= minute:
+                return self._by_start[i]
+            i -= 1
+        return None
+
+    def next_course(self, minute: float) -> Optional[CourseInterval]:
+        """返回给定时间之后第一门开始的课程"""
+        i = bisect.bisect_right(self._starts, minute)
+        return self._by_start[i] if i < len(self._by_start) else None
+
+    def starting_between(self, start_minute: float, end_minute: float) -> List[CourseInterval]:
+        """返回在 [start_minute, end_minute) 之间开始的课程，按开始时间排序"""
+        i = bisect.bisect_left(self._starts, start_minute)
+        j = bisect.bisect_left(self._starts, end_minute)
+        return self._by_start[i:j]
+
+    def finished_count(self, minute: float) -> int:
+        """返回给定时间已经结束的课程数量"""
+        return bisect.bisect_left(self._ends, minute)
+
+    def all_finished(self, minute: float) -> bool:
+        """给定时间当天所有课程是否都已结束（没有有效课程时返回False）"""
+        return bool(self._ends) and minute > self._ends[-1]
+
+    def next_change(self, now: datetime) -> datetime:
+        """
+        返回now之后课程状态的下一个变化时间点，最迟为下一个午夜。
+        课程在开始时间变为进行中，在结束时间之后的第一个瞬间变为已结束。
+        """
+        minute = minute_of_day(now)
+        midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+        day_start = datetime.combine(now.date(), time.min)
+        candidates = [midnight]
+
+        i = bisect.bisect_right(self._starts, minute)
+        if i < len(self._starts):
+            candidates.append(day_start + timedelta(minutes=self._starts[i]))
+        j = bisect.bisect_left(self._ends, minute)
+        if j < len(self._ends):
+            candidates.append(day_start + timedelta(minutes=self._ends[j], microseconds=1))
+        return min(candidate for candidate in candidates if candidate > now)
+
+
+class ScheduleIndex:
+    """
+    所有课表的区间索引。
+    每套课表在首次查询时由schedule_model加载为Schedule对象（只解析一次），
+    每一天在首次查询时编译为DayIndex并缓存；
+    相同的课程、相同的一天在所有课表之间共享（InternPool），复制出来的课表不会重复占用内存，
+    课程完全相同的天也共用同一个DayIndex。
+    只有课表数据变化（加载、保存、导入）时才通过rebuild清空重建。
+    """
+
+    _EMPTY_DAY = DayIndex([])
+
+    def __init__(self):
+        self._schedule_data: Dict = {}
+        self._schedules: Dict[str, Schedule] = {}
+        self._days: Dict[tuple, DayIndex] = {}
+        self._pool = InternPool()
+        self._indexes_by_courses: Dict[int, DayIndex] = {}  # 课程元组（由驻留池保持）的id → DayIndex
+
+    def rebuild(self, schedule_data: Dict) -> None:
+        """使用新的课表数据重建索引"""
+        self._schedule_data = schedule_data
+        self._schedules.clear()
+        self._days.clear()
+        self._pool.clear()
+        self._indexes_by_courses.clear()
+
+    def schedule(self, schedule_name: str) -> Schedule:
+        """返回指定课表加载后的模型，课表不存在时为没有课程的空课表"""
+        schedule = self._schedules.get(schedule_name)
+        if schedule is None:
+            data = self._schedule_data.get("schedules", {}).get(schedule_name)
+            schedule = parse_schedule(schedule_name, data if isinstance(data, dict) else {}, pool=self._pool)
+            self._schedules[schedule_name] = schedule
+        return schedule
+
+    def day(self, schedule_name: str, weekday: int) -> DayIndex:
+        """返回指定课表某一星期的索引"""
+        key = (schedule_name, weekday)
+        day_index = self._days.get(key)
+        if day_index is None:
+            courses = self.schedule(schedule_name).day(weekday).courses
+            if not courses:
+                day_index = self._EMPTY_DAY
+            else:
+                day_index = self._indexes_by_courses.get(id(courses))
+                if day_index is None:
+                    day_index = self._indexes_by_courses[id(courses)] = DayIndex(courses)
+            self._days[key] = day_index
+        return day_index
@@ -0,0 +1,271 @@
+import copy
+import json
+import os
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+from logger import logger
+from persistence_service import atomic_write_text
+from schedule_codec import pack_document, unpack_document
+
+# 保留的历史日志段数量（每次合并产生一段），用于恢复到历史时间点
+HISTORY_SEGMENTS = 10
+
+# 操作类型
+OP_CHECKPOINT = "checkpoint"            # 日志段开头的完整课表快照
+OP_BATCH = "batch"                      # 一次保存产生的全部操作（写在同一行中，要么全部生效要么全部忽略）
+OP_ADD_COURSE = "add_course"
+OP_UPDATE_COURSE = "update_course"
+OP_DELETE_COURSE = "delete_course"
+OP_MOVE_COURSE = "move_course"
+OP_ADD_SCHEDULE = "add_schedule"
+OP_RENAME_SCHEDULE = "rename_schedule"
+OP_COPY_SCHEDULE = "copy_schedule"
+OP_DELETE_SCHEDULE = "delete_schedule"
+OP_SET_FIELD = "set_field"              # 顶层字段（current_schedule、last_modified等）
+OP_DELETE_FIELD = "delete_field"
+
+
+def _course_key(course: Dict) -> str:
+    return json.dumps(course, sort_keys=True, ensure_ascii=False)
+
+
+def diff_day(schedule_name: str, weekday: int, old: List[Dict], new: List[Dict]) -> List[Dict]:
+    """
+    计算一天课程列表的变化，返回按顺序应用的操作。
+    只调整了顺序时生成移动操作，否则按最长公共子序列生成增加、修改和删除操作。
+    """
+    if old == new:
+        return []
+    base = {"schedule": schedule_name, "weekday": weekday}
+    old_keys = [_course_key(course) for course in old]
+    new_keys = [_course_key(course) for course in new]
+
+    ops = []
+    if sorted(old_keys) == sorted(new_keys):
+        # 只是重新排序（编辑器中的上移/下移）
+        current = list(old_keys)
+        for target, key in enumerate(new_keys):
+            if current[target] != key:
+                source = current.index(key, target + 1)
+                current.insert(target, current.pop(source))
+                ops.append(dict(base, op=OP_MOVE_COURSE, index=source, to=target))
+        return ops
+
+    # 依次处理每个差异块时，当前列表中 j1 之前的部分已经与新列表一致
+    matcher = SequenceMatcher(a=old_keys, b=new_keys, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        updated = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        for offset in range(updated):
+            ops.append(dict(base, op=OP_UPDATE_COURSE, index=j1 + offset, course=new[j1 + offset]))
+        for _ in range(i2 - i1 - updated):
+            ops.append(dict(base, op=OP_DELETE_COURSE, index=j1 + updated))
+        for offset in range(updated, j2 - j1):
+            ops.append(dict(base, op=OP_ADD_COURSE, index=j1 + offset, course=new[j1 + offset]))
+    return ops
+
+
+def diff_documents(old: Dict, new: Dict) -> List[Dict]:
+    """计算两个课表文档之间的变化，返回按顺序应用的操作"""
+    ops = []
+    old_schedules = old.get("schedules", {})
+    new_schedules = new.get("schedules", {})
+    removed = [name for name in old_schedules if name not in new_schedules]
+    added = [name for name in new_schedules if name not in old_schedules]
+
+    # 内容相同的一删一增视为重命名
+    for name in list(added):
+        source = next((old_name for old_name in removed if old_schedules[old_name] == new_schedules[name]), None)
+        if source is not None:
+            ops.append({"op": OP_RENAME_SCHEDULE, "schedule": source, "to": name})
+            removed.remove(source)
+            added.remove(name)
+    for name in removed:
+        ops.append({"op": OP_DELETE_SCHEDULE, "schedule": name})
+    for name in added:
+        # 与本次没有修改的已有课表内容相同视为复制；
+        # 原课表本次也被修改时，复制操作会在它的修改之前应用，复制到的是旧内容，因此保存完整内容
+        source = next((other for other in old_schedules
+                       if other in new_schedules and old_schedules[other] == new_schedules[other]
+                       and new_schedules[other] == new_schedules[name]), None)
+        if source is not None:
+            ops.append({"op": OP_COPY_SCHEDULE, "schedule": source, "to": name})
+        else:
+            ops.append({"op": OP_ADD_SCHEDULE, "schedule": name, "data": new_schedules[name]})
+
+    for name, schedule in new_schedules.items():
+        previous = old_schedules.get(name)
+        if previous is None or previous == schedule:
+            continue
+        for weekday in range(7):
+            key = str(weekday)
+            ops.extend(diff_day(name, weekday, previous.get(key, []), schedule.get(key, [])))
+
+    for key, value in new.items():
+        if key != "schedules" and (key not in old or old[key] != value):
+            ops.append({"op": OP_SET_FIELD, "key": key, "value": value})
+    for key in old:
+        if key != "schedules" and key not in new:
+            ops.append({"op": OP_DELETE_FIELD, "key": key})
+    return ops
+
+
+def apply_op(data: Dict, op: Dict) -> None:
+    """
+    将一条操作应用到课表文档上（原地修改文档）。
+    课程列表可能被多套课表共享，修改某一天时替换为新的列表（写时复制）。
+    """
+    kind = op["op"]
+    schedules = data.setdefault("schedules", {})
+    if kind in (OP_ADD_COURSE, OP_UPDATE_COURSE, OP_DELETE_COURSE, OP_MOVE_COURSE):
+        schedule = schedules.setdefault(op["schedule"], {})
+        courses = schedule[str(op["weekday"])] = list(schedule.get(str(op["weekday"]), []))
+        index = op["index"]
+        if kind == OP_ADD_COURSE:
+            courses.insert(index, copy.deepcopy(op["course"]))
+        elif kind == OP_UPDATE_COURSE:
+            courses[index] = copy.deepcopy(op["course"])
+        elif kind == OP_DELETE_COURSE:
+            del courses[index]
+        else:
+            courses.insert(op["to"], courses.pop(index))
+    elif kind == OP_ADD_SCHEDULE:
+        schedules[op["schedule"]] = copy.deepcopy(op["data"])
+    elif kind == OP_RENAME_SCHEDULE:
+        schedules[op["to"]] = schedules.pop(op["schedule"])
+    elif kind == OP_COPY_SCHEDULE:
+        # 与原课表共享每一天的课程列表
+        schedules[op["to"]] = dict(schedules[op["schedule"]])
+    elif kind == OP_DELETE_SCHEDULE:
+        schedules.pop(op["schedule"], None)
+    elif kind == OP_SET_FIELD:
+        data[op["key"]] = copy.deepcopy(op["value"])
+    elif kind == OP_DELETE_FIELD:
+        data.pop(op["key"], None)
+    else:
+        raise ValueError(f"未知的日志操作: {kind}")
+
+
+def replay(data: Dict, ops: List[Dict]) -> Dict:
+    """依次应用操作，返回应用后的课表文档（原地修改data）"""
+    for op in ops:
+        apply_op(data, op)
+    return data
+
+
+class JournalSegment:
+    """一个日志段：开头的完整快照，以及之后追加的操作"""
+    __slots__ = ("timestamp", "checkpoint", "entries", "truncated")
+
+    def __init__(self, timestamp: float, checkpoint: Dict, entries: List[Dict], truncated: bool = False):
+        self.timestamp = timestamp    # 快照时间
+        self.checkpoint = checkpoint  # 日志段开始时的完整课表
+        self.entries = entries        # 之后的操作，每条带有 ts 时间戳
+        self.truncated = truncated    # 末尾是否有写了一半的记录（不能再继续追加）
+
+
+class ScheduleJournal:
+    """
+    课表修改日志（仅追加）。
+    日志文件第一行是合并时写入的完整课表快照，之后每次保存只追加发生变化的操作，
+    保存的开销与修改量成正比。操作数超过阈值后由课表存储合并回主文件并开始新的日志段，
+    旧的日志段保留 HISTORY_SEGMENTS 份，用于恢复到历史时间点。
+    """
+
+    COMPACT_AFTER = 500  # 日志中的操作数超过该值后合并
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entry_count = 0
+        self.segment_time: Optional[float] = None  # 当前日志段的快照时间，用于标识日志段
+
+    def history_paths(self) -> List[str]:
+        """当前日志段和历史日志段的路径，由新到旧"""
+        return [self.path] + [f"{self.path}.{i}" for i in range(1, HISTORY_SEGMENTS + 1)]
+
+    def read(self, path: Optional[str] = None) -> Optional[JournalSegment]:
+        """读取一个日志段，文件不存在或没有快照时返回None；末尾写了一半的记录被忽略"""
+        path = path or self.path
+        if not os.path.exists(path):
+            return None
+        checkpoint = None
+        entries = []
+        truncated = False
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.log_warning(f"课表日志 {path} 第{line_no}行不完整，已忽略之后的记录")
+                    truncated = True
+                    break
+                if checkpoint is None:
+                    if entry.get("op") != OP_CHECKPOINT:
+                        logger.log_warning(f"课表日志 {path} 缺少开头的快照，已忽略")
+                        return None
+                    checkpoint = entry
+                elif entry.get("op") == OP_BATCH:
+                    entries.extend(dict(op, ts=entry["ts"]) for op in entry["ops"])
+                else:
+                    # 旧版日志每条操作单独一行
+                    entries.append(entry)
+        if checkpoint is None:
+            return None
+        if path == self.path:
+            self.entry_count = len(entries)
+            self.segment_time = checkpoint["ts"]
+        return JournalSegment(checkpoint["ts"], unpack_document(checkpoint["data"]), entries, truncated)
+
+    def append(self, ops: List[Dict]) -> None:
+        """
+        追加一次保存产生的操作并同步到磁盘。
+        所有操作写在同一行中：崩溃时写了一半的行在读取时整体忽略，不会重放出从未保存过的中间状态。
+        """
+        batch = {"op": OP_BATCH, "ts": datetime.now().timestamp(), "ops": ops}
+        line = json.dumps(batch, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.entry_count += len(ops)
+
+    def start_segment(self, data: Dict) -> None:
+        """归档当前日志段，并以data为快照开始新的日志段"""
+        if os.path.exists(self.path):
+            paths = self.history_paths()
+            if os.path.exists(paths[-1]):
+                os.remove(paths[-1])
+            for older, newer in zip(reversed(paths[1:]), reversed(paths[:-1])):
+                if os.path.exists(newer):
+                    os.replace(newer, older)
+        checkpoint = {"op": OP_CHECKPOINT, "ts": datetime.now().timestamp(), "data": pack_document(data)}
+        atomic_write_text(self.path, json.dumps(checkpoint, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.entry_count = 0
+        self.segment_time = checkpoint["ts"]
+
+    def earliest_time(self) -> Optional[datetime]:
+        """可以恢复到的最早时间，没有日志时返回None"""
+        for path in reversed(self.history_paths()):
+            segment = self.read(path)
+            if segment is not None:
+                return datetime.fromtimestamp(segment.timestamp)
+        return None
+
+    def restore_point(self, when: datetime) -> Optional[Dict]:
+        """返回课表在when时刻的内容，早于所有日志时返回None"""
+        timestamp = when.timestamp()
+        for path in self.history_paths():
+            segment = self.read(path)
+            if segment is None or segment.timestamp > timestamp:
+                continue
+            ops = [entry for entry in segment.entries if entry["ts"] <= timestamp]
+            return replay(copy.deepcopy(segment.checkpoint), ops)
+        return None
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self.entry_count >= self.COMPACT_AFTER
@@ -0,0 +1,235 @@
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 课程字典中的标准字段，其余字段原样保存在Course.extra中
+COURSE_FIELDS = ("start_time", "end_time", "name")
+# 可选字段：上课教室和任课教师（保存在extra中，没有时不写入课表）
+COURSE_ROOM = "room"
+COURSE_TEACHER = "teacher"
+
+# 一天中每一分钟对应的 "HH:MM" 文本，所有课程共享同一份字符串
+_TIME_TEXTS = tuple(f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(24 * 60))
+
+
+class ScheduleValidationError(ValueError):
+    """课表数据不符合格式要求"""
+
+
+def parse_minutes(value) -> Optional[int]:
+    """将 "HH:MM" 格式的时间解析为当天的分钟数，格式错误时返回None"""
+    try:
+        hour_str, minute_str = value.split(":")
+        hour, minute = int(hour_str), int(minute_str)
+    except (AttributeError, ValueError):
+        return None
+    if 0 <= hour < 24 and 0 <= minute < 60:
+        return hour * 60 + minute
+    return None
+
+
+def format_minutes(minute: int) -> str:
+    """将当天的分钟数格式化为 "HH:MM"（返回共享的字符串对象）"""
+    return _TIME_TEXTS[minute]
+
+
+class Course:
+    """
+    一门课程。
+    时间保存为当天的分钟数，名称经过sys.intern驻留，同名课程共享同一个字符串；
+    只有非标准字段或格式错误的原始时间才会占用extra字典。
+    提供与原课程字典相同的只读访问方式（course["name"]、course.get("end_time")），
+    已有代码无需区分两种表示。
+    """
+    __slots__ = ("name", "start", "end", "extra")
+
+    def __init__(self, name: str, start: Optional[int], end: Optional[int], extra: Optional[Dict] = None):
+        self.name = sys.intern(name)
+        self.start = start  # 开始时间（当天分钟数），格式错误时为None
+        self.end = end      # 结束时间（当天分钟数），格式错误时为None
+        self.extra = extra  # 其他字段，以及格式错误时的原始时间文本
+
+    @property
+    def start_time(self) -> str:
+        if self.start is None:
+            return (self.extra or {}).get("start_time", "")
+        return _TIME_TEXTS[self.start]
+
+    @property
+    def end_time(self) -> str:
+        if self.end is None:
+            return (self.extra or {}).get("end_time", "")
+        return _TIME_TEXTS[self.end]
+
+    @property
+    def room(self) -> str:
+        """上课教室，未填写时为空字符串"""
+        return str((self.extra or {}).get(COURSE_ROOM) or "")
+
+    @property
+    def teacher(self) -> str:
+        """任课教师，未填写时为空字符串"""
+        return str((self.extra or {}).get(COURSE_TEACHER) or "")
+
+    @property
+    def is_valid(self) -> bool:
+        """起止时间是否都有效"""
+        return self.start is not None and self.end is not None
+
+    def __getitem__(self, key: str):
+        if key == "name":
+            return self.name
+        if key == "start_time":
+            return self.start_time
+        if key == "end_time":
+            return self.end_time
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        extra_keys = [key for key in (self.extra or {}) if key not in COURSE_FIELDS]
+        return list(COURSE_FIELDS) + extra_keys
+
+    def to_dict(self) -> Dict[str, str]:
+        """转换为课表JSON中的课程字典"""
+        data = {"start_time": self.start_time, "end_time": self.end_time, "name": self.name}
+        if self.extra:
+            data.update((key, value) for key, value in self.extra.items() if key not in COURSE_FIELDS)
+        return data
+
+    def __repr__(self) -> str:
+        return f"Course({self.start_time}-{self.end_time} {self.name})"
+
+
+class Day:
+    """某套课表中一天的课程，保持课表中的原始顺序"""
+    __slots__ = ("weekday", "courses")
+
+    def __init__(self, weekday: int, courses: Tuple[Course, ...]):
+        self.weekday = weekday
+        self.courses = courses
+
+    def __iter__(self) -> Iterator[Course]:
+        return iter(self.courses)
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def sorted_courses(self) -> List[Course]:
+        """按开始时间排序的课程，时间格式错误的课程排在最后"""
+        return sorted(self.courses, key=lambda course: (course.start is None, course.start or 0, course.end or 0))
+
+    def to_list(self) -> List[Dict[str, str]]:
+        return [course.to_dict() for course in self.courses]
+
+
+class Schedule:
+    """一套课表，包含星期一到星期日（0-6）七天"""
+    __slots__ = ("name", "days")
+
+    def __init__(self, name: str, days: Tuple[Day, ...]):
+        self.name = name
+        self.days = days
+
+    def day(self, weekday: int) -> Day:
+        return self.days[weekday]
+
+    def to_dict(self) -> Dict[str, List[Dict[str, str]]]:
+        return {str(day.weekday): day.to_list() for day in self.days}
+
+
+def parse_course(data, strict: bool = False) -> Course:
+    """
+    解析一门课程。
+    Args:
+        data: 课程字典，包含 start_time、end_time、name
+        strict: 为True时格式错误抛出ScheduleValidationError；否则保留原始时间，课程视为时间无效
+    """
+    if isinstance(data, Course):
+        return data
+    if not isinstance(data, dict):
+        raise ScheduleValidationError(f"课程必须是字典: {data!r}")
+    name = data.get("name", "")
+    if not isinstance(name, str):
+        if strict:
+            raise ScheduleValidationError(f"课程名称必须是字符串: {data}")
+        name = str(name)
+    start_text, end_text = data.get("start_time"), data.get("end_time")
+    start, end = parse_minutes(start_text), parse_minutes(end_text)
+    if strict and (start is None or end is None):
+        raise ScheduleValidationError(f"时间格式不正确，必须是 HH:MM 格式: {data}")
+
+    extra = {key: value for key, value in data.items() if key not in COURSE_FIELDS}
+    if start is None and start_text is not None:
+        extra["start_time"] = start_text
+    if end is None and end_text is not None:
+        extra["end_time"] = end_text
+    return Course(name, start, end, extra or None)
+
+
+class InternPool:
+    """
+    课程驻留池：名称和起止时间都相同的课程只创建一个Course对象，
+    课程完全相同的一天（各星期之间、复制出来的课表之间）共享同一个课程元组。
+    Course和课程元组创建后不再修改，共享是安全的；课表修改后重新解析得到新的对象（写时复制）。
+    """
+
+    def __init__(self):
+        self._courses: Dict[tuple, Course] = {}
+        self._days: Dict[tuple, Tuple[Course, ...]] = {}
+        self._by_list: Dict[int, Tuple[list, Tuple[Course, ...]]] = {}
+
+    def course(self, data, strict: bool = False) -> Course:
+        course = parse_course(data, strict)
+        key = (course.name, course.start, course.end)
+        if course.extra is not None:
+            # 教室、教师等附加字段相同的课程同样可以共享
+            try:
+                key += tuple(sorted(course.extra.items()))
+                hash(key)
+            except TypeError:
+                return course
+        return self._courses.setdefault(key, course)
+
+    def courses(self, courses: list, strict: bool = False) -> Tuple[Course, ...]:
+        # 解码时共享的课程列表只解析一次（保留列表本身的引用，防止id被复用）
+        cached = self._by_list.get(id(courses))
+        if cached is not None and cached[0] is courses:
+            return cached[1]
+        parsed = tuple(self.course(course, strict) for course in courses)
+        parsed = self._days.setdefault(tuple(id(course) for course in parsed), parsed)
+        self._by_list[id(courses)] = (courses, parsed)
+        return parsed
+
+    def clear(self) -> None:
+        self._courses.clear()
+        self._days.clear()
+        self._by_list.clear()
+
+
+def parse_day(weekday: int, courses, strict: bool = False, pool: Optional[InternPool] = None) -> Day:
+    """解析一天的课程列表，指定pool时与其他课表共享相同的课程"""
+    if not isinstance(courses, list):
+        if strict:
+            raise ScheduleValidationError(f"星期 {weekday} 的值必须是一个列表")
+        courses = []
+    if pool is not None:
+        return Day(weekday, pool.courses(courses, strict))
+    return Day(weekday, tuple(parse_course(course, strict) for course in courses))
+
+
+def parse_schedule(name: str, data: Dict, strict: bool = False, pool: Optional[InternPool] = None) -> Schedule:
+    """解析一套课表（键为 "0"~"6" 的字典，缺少的天视为没有课程）"""
+    if not isinstance(data, dict):
+        raise ScheduleValidationError(f"课表 '{name}' 必须是一个字典")
+    if strict:
+        invalid_keys = set(data.keys()) - {str(i) for i in range(7)}
+        if invalid_keys:
+            raise ScheduleValidationError(f"字典的键必须是 '0' 到 '6' 的字符串。无效的键: {sorted(invalid_keys)}")
+    return Schedule(name, tuple(parse_day(weekday, data.get(str(weekday), []), strict, pool) for weekday in range(7)))
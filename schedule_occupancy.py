@@ -0,0 +1,288 @@
+import heapq
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from constants import WEEKDAYS
+from schedule_model import COURSE_ROOM, COURSE_TEACHER, Course, parse_course
+from schedule_store import LazyScheduleMap
+
+# 资源类型：教室、教师（与课程字典中的可选字段同名）
+RESOURCE_ROOM = COURSE_ROOM
+RESOURCE_TEACHER = COURSE_TEACHER
+RESOURCE_KINDS = (RESOURCE_ROOM, RESOURCE_TEACHER)
+RESOURCE_LABELS = {RESOURCE_ROOM: "教室", RESOURCE_TEACHER: "教师"}
+
+# 一天的键：(来源, 课表名称, 星期几)；时间线的键：(资源类型, 资源名称, 星期几)
+DayKey = Tuple[str, str, int]
+TimelineKey = Tuple[str, str, int]
+
+# 课表已释放：占用记录保留，不再引用课程列表，课表重新加载后重新索引
+_RELEASED = ()
+
+
+class Booking:
+    """一门课程对某个教室或教师的占用"""
+    __slots__ = ("source", "schedule", "weekday", "index", "course")
+
+    def __init__(self, source: str, schedule: str, weekday: int, index: int, course: Course):
+        self.source = source      # 课表文档的来源（例如文件路径），同一个程序中为空字符串
+        self.schedule = schedule  # 课表名称
+        self.weekday = weekday    # 星期几（0-6）
+        self.index = index        # 课程在当天课程列表中的位置
+        self.course = course
+
+    @property
+    def start(self) -> int:
+        return self.course.start
+
+    @property
+    def end(self) -> int:
+        return self.course.end
+
+    @property
+    def label(self) -> str:
+        where = f"{self.source}:" if self.source else ""
+        return f"{where}{self.schedule} {self.course.start_time}-{self.course.end_time} {self.course.name}"
+
+    def to_dict(self) -> Dict:
+        return {
+            "source": self.source,
+            "schedule": self.schedule,
+            "weekday": self.weekday,
+            "index": self.index,
+            "start_time": self.course.start_time,
+            "end_time": self.course.end_time,
+            "name": self.course.name,
+        }
+
+    def __repr__(self) -> str:
+        return f"Booking({self.label})"
+
+
+class Clash:
+    """同一教室或同一教师在同一时间被两门课程占用"""
+    __slots__ = ("kind", "resource", "weekday", "first", "second")
+
+    def __init__(self, kind: str, resource: str, weekday: int, first: Booking, second: Booking):
+        self.kind = kind          # RESOURCE_ROOM 或 RESOURCE_TEACHER
+        self.resource = resource  # 教室或教师名称
+        self.weekday = weekday
+        self.first = first        # 先开始的课程
+        self.second = second
+
+    @property
+    def message(self) -> str:
+        return (f"星期{WEEKDAYS[self.weekday]} {RESOURCE_LABELS[self.kind]} {self.resource}: "
+                f"'{self.first.label}' 与 '{self.second.label}' 时间重叠")
+
+    def involves(self, schedule: str, weekday: Optional[int] = None, source: str = "") -> bool:
+        """是否涉及某套课表（某一天）的课程"""
+        if weekday is not None and weekday != self.weekday:
+            return False
+        return any(booking.source == source and booking.schedule == schedule
+                   for booking in (self.first, self.second))
+
+    def to_dict(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "resource": self.resource,
+            "weekday": self.weekday,
+            "bookings": [self.first.to_dict(), self.second.to_dict()],
+            "message": self.message,
+        }
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class OccupancyIndex:
+    """
+    教室和教师的占用时间线：按 (资源类型, 资源名称, 星期几) 汇总所有课表中填写了教室或教师的课程，
+    并用扫描线找出同一资源在同一时间被重复占用的情况。
+    可以加入多个课表文档（例如每个教室一台电脑的课表文件），用source区分。
+    同一文档中互为轮换的课表不会同时使用，它们之间的重叠不算冲突。
+
+    与搜索索引相同，课表修改总是整体替换某一天的课程列表（写时复制），
+    update只记录文档，查询时按列表对象的身份找出变化的天，只重新扫描受影响的时间线，
+    因此编辑器每次保存后检查冲突的开销与修改量成正比。
+    """
+
+    def __init__(self):
+        self._documents: Dict[str, Dict] = {}
+        self._alternatives: Dict[str, Set[str]] = {}
+        self._pending: Set[str] = set()
+        self._days: Dict[DayKey, list] = {}                   # 已索引的课程列表（用于比较身份）
+        self._day_bookings: Dict[DayKey, List[Tuple[TimelineKey, Booking]]] = {}
+        self._timelines: Dict[TimelineKey, List[Booking]] = {}
+        self._clashes: Dict[TimelineKey, List[Clash]] = {}
+        self._dirty: Set[TimelineKey] = set()
+
+    def update(self, document: Dict, source: str = "", alternatives: Iterable[str] = ()) -> None:
+        """
+        课表保存或重新加载后调用，下一次查询时增量更新。
+        Args:
+            document: 课表文档（包含 schedules）
+            source: 文档的来源，加入多个文档时用于区分
+            alternatives: 该文档中互为轮换、不会同时使用的课表名称
+        """
+        alternatives = set(alternatives)
+        if self._alternatives.get(source, set()) != alternatives:
+            # 轮换配置变化会影响该文档涉及的所有时间线
+            self._dirty.update(key for key, bookings in self._timelines.items()
+                               if any(booking.source == source for booking in bookings))
+        self._documents[source] = document
+        self._alternatives[source] = alternatives
+        self._pending.add(source)
+
+    def remove(self, source: str) -> None:
+        """移除某个来源的所有课程"""
+        self._documents.pop(source, None)
+        self._alternatives.pop(source, None)
+        self._pending.discard(source)
+        for key in [key for key in self._days if key[0] == source]:
+            self._remove_day(key)
+
+    def release_unloaded(self) -> None:
+        """
+        按需加载的课表被释放（LazyScheduleMap.evict）后调用，
+        不再引用已释放课表的课程列表，使它们可以被回收；这些课表的占用仍然参与冲突检查。
+        """
+        # 先索引释放前的修改，释放后同步时只检查已加载的课表
+        self._refresh()
+        for source, document in self._documents.items():
+            schedules = document.get("schedules")
+            if not isinstance(schedules, LazyScheduleMap):
+                continue
+            loaded = set(schedules.loaded_names())
+            for key in self._days:
+                if key[0] == source and key[1] not in loaded:
+                    self._days[key] = _RELEASED
+
+    def _refresh(self) -> None:
+        for source in self._pending:
+            self._sync(source)
+        self._pending.clear()
+        for key in self._dirty:
+            timeline = self._timelines.get(key)
+            if timeline is None:
+                self._clashes.pop(key, None)
+                continue
+            timeline.sort(key=lambda booking: (booking.start, booking.end))
+            clashes = self._sweep(key, timeline)
+            if clashes:
+                self._clashes[key] = clashes
+            else:
+                self._clashes.pop(key, None)
+        self._dirty.clear()
+
+    def _sync(self, source: str) -> None:
+        schedules = self._documents[source].get("schedules", {})
+        indexed = any(key[0] == source for key in self._days)
+        # 按需加载的课表中未加载的部分自上次索引后没有变化
+        if isinstance(schedules, LazyScheduleMap) and indexed:
+            changed_names = schedules.loaded_names()
+        else:
+            changed_names = list(schedules)
+        present = set(schedules)
+
+        for key in [key for key in self._days if key[0] == source and key[1] not in present]:
+            self._remove_day(key)
+        for name in changed_names:
+            data = schedules.get(name)
+            if not isinstance(data, dict):
+                continue
+            for weekday in range(7):
+                key = (source, name, weekday)
+                courses = data.get(str(weekday))
+                if not isinstance(courses, list):
+                    courses = []
+                if self._days.get(key) is not courses:
+                    self._remove_day(key)
+                    self._add_day(key, courses)
+
+    def _add_day(self, key: DayKey, courses: list) -> None:
+        source, schedule, weekday = key
+        entries = []
+        for index, data in enumerate(courses):
+            if not isinstance(data, dict) or not (data.get(COURSE_ROOM) or data.get(COURSE_TEACHER)):
+                continue
+            course = parse_course(data)
+            if not course.is_valid or course.end <= course.start:
+                continue
+            booking = Booking(source, schedule, weekday, index, course)
+            for kind, resource in ((RESOURCE_ROOM, course.room), (RESOURCE_TEACHER, course.teacher)):
+                resource = resource.strip()
+                if resource:
+                    timeline_key = (kind, resource, weekday)
+                    self._timelines.setdefault(timeline_key, []).append(booking)
+                    self._dirty.add(timeline_key)
+                    entries.append((timeline_key, booking))
+        self._days[key] = courses
+        if entries:
+            self._day_bookings[key] = entries
+
+    def _remove_day(self, key: DayKey) -> None:
+        self._days.pop(key, None)
+        removed: Dict[TimelineKey, Set[int]] = defaultdict(set)
+        for timeline_key, booking in self._day_bookings.pop(key, []):
+            removed[timeline_key].add(id(booking))
+        for timeline_key, ids in removed.items():
+            remaining = [booking for booking in self._timelines[timeline_key] if id(booking) not in ids]
+            if remaining:
+                self._timelines[timeline_key] = remaining
+            else:
+                del self._timelines[timeline_key]
+            self._dirty.add(timeline_key)
+
+    def _concurrent(self, first: Booking, second: Booking) -> bool:
+        """两门课程是否可能同时进行（同一文档中互为轮换的两套课表不会）"""
+        if first.source != second.source or first.schedule == second.schedule:
+            return True
+        alternatives = self._alternatives.get(first.source, ())
+        return not (first.schedule in alternatives and second.schedule in alternatives)
+
+    def _sweep(self, key: TimelineKey, timeline: List[Booking]) -> List[Clash]:
+        """
+        按开始时间扫描一条时间线：堆中保存尚未结束的课程，
+        新的课程开始时先移除已经结束的课程，与堆中剩余的每一门课程都重叠。
+        复杂度为 O(n log n + 冲突数)。
+        """
+        kind, resource, weekday = key
+        clashes = []
+        active: List[Tuple[int, int, Booking]] = []
+        for order, booking in enumerate(timeline):
+            while active and active[0][0] <= booking.start:
+                heapq.heappop(active)
+            for _, _, other in active:
+                if self._concurrent(other, booking):
+                    clashes.append(Clash(kind, resource, weekday, other, booking))
+            heapq.heappush(active, (booking.end, order, booking))
+        return clashes
+
+    def clashes(self) -> List[Clash]:
+        """所有重复占用，按星期、资源类型和名称排序"""
+        self._refresh()
+        keys = sorted(self._clashes, key=lambda key: (key[2], key[0], key[1]))
+        return [clash for key in keys for clash in self._clashes[key]]
+
+    def clashes_for(self, schedule: str, weekday: Optional[int] = None, source: str = "") -> List[Clash]:
+        """涉及某套课表（某一天）的重复占用"""
+        self._refresh()
+        keys = sorted((key for key in self._clashes if weekday is None or key[2] == weekday),
+                      key=lambda key: (key[2], key[0], key[1]))
+        return [clash for key in keys for clash in self._clashes[key] if clash.involves(schedule, weekday, source)]
+
+    def resources(self, kind: str) -> List[str]:
+        """所有出现过的教室或教师名称"""
+        self._refresh()
+        return sorted({key[1] for key in self._timelines if key[0] == kind})
+
+    def timeline(self, kind: str, resource: str, weekday: int) -> List[Booking]:
+        """某个教室或教师某一天按开始时间排序的占用"""
+        self._refresh()
+        return list(self._timelines.get((kind, resource, weekday), []))
+
+    def occupancy(self, kind: str, resource: str) -> Dict[int, List[Booking]]:
+        """某个教室或教师一周的占用：星期几 → 按开始时间排序的课程"""
+        self._refresh()
+        return {weekday: list(self._timelines[(kind, resource, weekday)])
+                for weekday in range(7) if (kind, resource, weekday) in self._timelines}
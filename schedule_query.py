@@ -0,0 +1,159 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Optional
+from holiday_calendar import DayResolver, HolidayCalendar, ResolvedDay
+from rotation_calendar import RotationCalendar
+from schedule_index import CourseInterval, DayIndex, ScheduleIndex, minute_of_day
+from schedule_model import Course
+
+# next_course 向后查找的最多天数（覆盖寒暑假）
+NEXT_COURSE_HORIZON_DAYS = 62
+
+_DAY_MINUTES = 24 * 60
+
+
+class CourseOccurrence:
+    """某一天实际上的一节课"""
+    __slots__ = ("date", "schedule_name", "interval")
+
+    def __init__(self, day: date, schedule_name: str, interval: CourseInterval):
+        self.date = day
+        self.schedule_name = schedule_name  # 使用的课表
+        self.interval = interval            # 课程在当天索引中的区间
+
+    @property
+    def course(self) -> Course:
+        return self.interval.course
+
+    @property
+    def position(self) -> int:
+        """课程在课表当天列表中的位置"""
+        return self.interval.position
+
+    @property
+    def start(self) -> datetime:
+        return datetime.combine(self.date, time.min) + timedelta(minutes=self.interval.start)
+
+    @property
+    def end(self) -> datetime:
+        return datetime.combine(self.date, time.min) + timedelta(minutes=self.interval.end)
+
+    def __repr__(self) -> str:
+        return f"CourseOccurrence({self.date} {self.course!r} @{self.schedule_name})"
+
+
+def _occurrence(plan: "DayPlan", interval: Optional[CourseInterval]) -> Optional[CourseOccurrence]:
+    return CourseOccurrence(plan.date, plan.schedule_name, interval) if interval is not None else None
+
+
+class DayPlan:
+    """某一天的课程安排：解析后的课表（节假日、调休、轮换）与对应的课程索引"""
+    __slots__ = ("resolved", "index")
+
+    def __init__(self, resolved: ResolvedDay, index: Optional[DayIndex]):
+        self.resolved = resolved
+        self.index = index  # 停课时为None
+
+    @property
+    def date(self) -> date:
+        return self.resolved.date
+
+    @property
+    def schedule_name(self) -> Optional[str]:
+        return self.resolved.schedule_name
+
+    @property
+    def weekday(self) -> int:
+        """使用课表中星期几的课程（调休时与日期本身的星期不同）"""
+        return self.resolved.weekday
+
+    @property
+    def no_classes(self) -> bool:
+        return self.resolved.no_classes
+
+    @property
+    def courses(self) -> List[Course]:
+        """按开始时间排序的课程，停课时为空"""
+        return self.index.courses_by_start if self.index is not None else []
+
+    def occurrences(self, start_minute: float = 0, end_minute: float = _DAY_MINUTES) -> List[CourseOccurrence]:
+        """在 [start_minute, end_minute) 之间开始的课程"""
+        if self.index is None:
+            return []
+        return [CourseOccurrence(self.date, self.schedule_name, interval)
+                for interval in self.index.starting_between(start_minute, end_minute)]
+
+
+class ScheduleQuery:
+    """
+    整个学期的课程查询：某一时刻在上什么课、下一节是什么课、某一天的安排、一段时间内的所有课程。
+    每一天先由DayResolver按节假日、调休和课表轮换解析（结果在LRU缓存中），
+    再使用ScheduleIndex中预先编译的区间索引，单次查询为O(log n)；
+    range按天惰性生成，查询很长的时间段也不会一次性占用内存。
+    """
+
+    def __init__(self, schedule_index: ScheduleIndex, day_resolver: DayResolver):
+        self.schedule_index = schedule_index
+        self.day_resolver = day_resolver
+
+    def day_plan(self, day: date) -> DayPlan:
+        """返回某一天的课程安排"""
+        resolved = self.day_resolver.resolve(day)
+        if resolved.no_classes or resolved.schedule_name is None:
+            return DayPlan(resolved, None)
+        return DayPlan(resolved, self.schedule_index.day(resolved.schedule_name, resolved.weekday))
+
+    def course_at(self, when: datetime) -> Optional[CourseOccurrence]:
+        """返回when时刻正在进行的课程，没有时返回None"""
+        plan = self.day_plan(when.date())
+        if plan.index is None:
+            return None
+        return _occurrence(plan, plan.index.current_course(minute_of_day(when)))
+
+    def next_course(self, when: datetime, horizon_days: int = NEXT_COURSE_HORIZON_DAYS) -> Optional[CourseOccurrence]:
+        """返回when之后第一节开始的课程（可能在之后的某一天），horizon_days天内没有课时返回None"""
+        plan = self.day_plan(when.date())
+        if plan.index is not None:
+            occurrence = _occurrence(plan, plan.index.next_course(minute_of_day(when)))
+            if occurrence is not None:
+                return occurrence
+        for offset in range(1, horizon_days + 1):
+            plan = self.day_plan(when.date() + timedelta(days=offset))
+            if plan.index is not None and plan.index.intervals_by_start:
+                return _occurrence(plan, plan.index.intervals_by_start[0])
+        return None
+
+    def range(self, start: datetime, end: datetime) -> Iterator[CourseOccurrence]:
+        """依次返回在 [start, end) 之间开始的所有课程（按天惰性计算）"""
+        day = start.date()
+        while True:
+            day_start = datetime.combine(day, time.min)
+            if day_start >= end:
+                return
+            start_minute = minute_of_day(start) if day == start.date() else 0
+            end_minute = minute_of_day(end) if day == end.date() else _DAY_MINUTES
+            yield from self.day_plan(day).occurrences(start_minute, end_minute)
+            day += timedelta(days=1)
+
+
+def resolve_schedule_name(document: Dict, rotation_calendar: RotationCalendar, day: date) -> str:
+    """返回某一天应使用的课表名称：启用轮换时按轮换日历，轮换到的课表不存在时使用当前课表"""
+    name = rotation_calendar.schedule_for(day)
+    if name in document.get("schedules", {}):
+        return name
+    return document.get("current_schedule", "default")
+
+
+def query_for_document(document: Dict, rotation_calendar: RotationCalendar, holiday_calendar: HolidayCalendar,
+                       schedule_index: Optional[ScheduleIndex] = None) -> ScheduleQuery:
+    """
+    为课表文档创建单独的ScheduleQuery（导出等需要逐天解析整个学期的场合）。
+    使用单独的DayResolver，不会冲掉主界面的缓存。
+    Args:
+        rotation_calendar: 已按文档中的课表rebuild过的轮换日历
+        schedule_index: 文档已编译的课表索引，为None时新建
+    """
+    if schedule_index is None:
+        schedule_index = ScheduleIndex()
+        schedule_index.rebuild(document)
+    resolver = DayResolver(holiday_calendar, lambda day: resolve_schedule_name(document, rotation_calendar, day))
+    return ScheduleQuery(schedule_index, resolver)
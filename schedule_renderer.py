@@ -0,0 +1,121 @@
+import tkinter as tk
+from typing import Callable, Dict, Hashable, List, Tuple
+from font_manager import font_manager
+
+
+class CourseRow:
+    """一行已渲染的课程控件及其当前显示状态"""
+    __slots__ = ("frame", "label", "canvas", "oval_id", "text", "color", "row")
+
+    def __init__(self, frame: tk.Frame, label: tk.Label, canvas: tk.Canvas, oval_id: int,
+                 text: str, color: str, row: int):
+        self.frame = frame
+        self.label = label
+        self.canvas = canvas
+        self.oval_id = oval_id
+        self.text = text
+        self.color = color
+        self.row = row
+
+
+class WidgetScheduleRenderer:
+    """
+    主窗口课程列表的键控协调渲染器。
+    每次渲染时将期望的 (文本, 颜色, 行号) 与已渲染的状态逐项比较，
+    只对真正发生变化的属性发出Tk调用；状态未变时渲染几乎没有开销。
+    """
+
+    def __init__(self, parent: tk.Frame, config_handler, dpi_manager, bind_events: Callable[[tk.Widget], None]):
+        """
+        Args:
+            parent: 课程行所在的容器（课表框架）
+            config_handler: 配置处理器
+            dpi_manager: DPI管理器
+            bind_events: 为新建控件绑定滑动、双击等事件的回调
+        """
+        self.parent = parent
+        self.config_handler = config_handler
+        self.dpi_manager = dpi_manager
+        self.bind_events = bind_events
+        self.rows: Dict[Hashable, CourseRow] = {}
+        self.parent.grid_columnconfigure(0, weight=1)
+
+    def render(self, desired: List[Tuple[Hashable, str, str]]) -> None:
+        """
+        将课程列表协调为期望状态。
+        Args:
+            desired: 按显示顺序排列的 (课程键, 显示文本, 状态颜色) 列表
+        """
+        wanted_keys = set()
+        for index, (key, text, color) in enumerate(desired):
+            wanted_keys.add(key)
+            row = self.rows.get(key)
+            if row is None or not row.frame.winfo_exists():
+                self.rows[key] = self._create_row(text, color, index)
+                continue
+
+            if row.text != text:
+                row.label.config(text=text)
+                row.text = text
+            if row.color != color:
+                row.canvas.itemconfigure(row.oval_id, fill=color, outline=color)
+                row.canvas.config(bg=color)
+                row.color = color
+            if row.row != index:
+                row.frame.grid(row=index)
+                row.row = index
+
+        # 销毁不再需要的课程行
+        for key in [key for key in self.rows if key not in wanted_keys]:
+            row = self.rows.pop(key)
+            if row.frame.winfo_exists():
+                row.frame.destroy()
+
+    def update_fonts(self) -> None:
+        """字体大小或颜色变化后更新所有课程行（字号由共享的命名字体自动更新）"""
+        circle_size = font_manager.metric("indicator_size")
+        for row in self.rows.values():
+            if not row.frame.winfo_exists():
+                continue
+            row.label.config(fg=self.config_handler.font_color)
+            row.canvas.config(width=circle_size, height=circle_size)
+            row.canvas.coords(row.oval_id, 0, 0, circle_size, circle_size)
+
+    @property
+    def labels(self) -> List[tk.Label]:
+        """按显示顺序排列的课程标签"""
+        return [row.label for row in sorted(self.rows.values(), key=lambda r: r.row)]
+
+    def _create_row(self, text: str, color: str, index: int) -> CourseRow:
+        """创建新的课程行"""
+        scaled_pady = self.dpi_manager.scale(2)
+        course_frame = tk.Frame(self.parent)
+        course_frame.grid(row=index, column=0, sticky="ew", pady=scaled_pady)
+
+        label = tk.Label(
+            course_frame,
+            text=text,
+            font=font_manager.font("schedule"),
+            fg=self.config_handler.font_color,
+            anchor='w'
+        )
+
+        # --- 事件绑定 ---
+        self.bind_events(label)
+        self.bind_events(course_frame)
+        label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        # 色块尺寸由字体管理器根据字体大小预先计算
+        circle_size = font_manager.metric("indicator_size")
+        status_canvas = tk.Canvas(
+            course_frame,
+            width=circle_size,
+            height=circle_size,
+            bg=color,
+            highlightthickness=0
+        )
+        oval_id = status_canvas.create_oval(0, 0, circle_size, circle_size, fill=color, outline=color)
+        scaled_padx = self.dpi_manager.scale(5)
+        status_canvas.pack(side=tk.RIGHT, padx=scaled_padx)
+
+        return CourseRow(course_frame, label, status_canvas, oval_id, text, color, index)
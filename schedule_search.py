@@ -0,0 +1,185 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from schedule_model import parse_minutes
+from schedule_store import LazyScheduleMap
+
+# 课程位置：(课表名称, 星期几, 在当天课程列表中的下标)
+Location = Tuple[str, int, int]
+# 时间段：(开始分钟数, 结束分钟数)
+Slot = Tuple[int, int]
+
+# 课表已释放：索引内容保留，不再引用课程列表，课表重新加载后重新索引
+_RELEASED = ()
+
+
+class ScheduleSearchIndex:
+    """
+    所有课表的搜索索引：
+    - 倒排索引：课程名称 → 出现的位置；
+    - 时间段索引：(开始, 结束) → 位置，用于查询某一时刻所有课表正在上的课。
+    课表修改时总是整体替换某一天的课程列表（写时复制），因此每次保存后只需按列表对象的
+    身份比较找出变化的天并重新索引，不必重新扫描全部课表。索引在第一次查询时才建立。
+    """
+
+    def __init__(self):
+        self._document: Optional[Dict] = None
+        self._built = False
+        self._days: Dict[Tuple[str, int], list] = {}                   # 已索引的课程列表（用于比较身份）
+        self._day_entries: Dict[Tuple[str, int], List[Tuple[str, Optional[Slot]]]] = {}
+        self._by_name: Dict[str, Set[Location]] = defaultdict(set)
+        self._by_slot: Dict[Slot, Set[Location]] = defaultdict(set)
+
+    def update(self, document: Dict) -> None:
+        """课表保存或重新加载后调用：已建立索引时增量更新，否则只记录文档"""
+        self._document = document
+        if self._built:
+            self._sync()
+
+    def _ensure_built(self) -> None:
+        if not self._built and self._document is not None:
+            self._built = True
+            self._sync()
+
+    def _sync(self) -> None:
+        schedules = self._document.get("schedules", {})
+        # 按需加载的课表中未加载的部分自上次索引后没有变化
+        if isinstance(schedules, LazyScheduleMap) and self._days:
+            changed_names = schedules.loaded_names()
+        else:
+            changed_names = list(schedules)
+        present = set(schedules)
+
+        for key in [key for key in self._days if key[0] not in present]:
+            self._remove_day(key)
+        for name in changed_names:
+            data = schedules.get(name)
+            if not isinstance(data, dict):
+                continue
+            for weekday in range(7):
+                key = (name, weekday)
+                courses = data.get(str(weekday))
+                if not isinstance(courses, list):
+                    courses = []
+                if self._days.get(key) is not courses:
+                    self._remove_day(key)
+                    self._add_day(key, courses)
+
+    def release_unloaded(self) -> None:
+        """
+        按需加载的课表被释放（LazyScheduleMap.evict）后调用，
+        不再引用已释放课表的课程列表，使它们可以被回收；这些课表仍然可以被搜索到。
+        """
+        schedules = self._document.get("schedules") if self._document is not None else None
+        if not isinstance(schedules, LazyScheduleMap):
+            return
+        loaded = set(schedules.loaded_names())
+        for key in self._days:
+            if key[0] not in loaded:
+                self._days[key] = _RELEASED
+
+    def _add_day(self, key: Tuple[str, int], courses: list) -> None:
+        name, weekday = key
+        entries = []
+        for index, course in enumerate(courses):
+            if not isinstance(course, dict):
+                entries.append(("", None))
+                continue
+            course_name = course.get("name", "")
+            start, end = parse_minutes(course.get("start_time")), parse_minutes(course.get("end_time"))
+            slot = (start, end) if start is not None and end is not None else None
+            location = (name, weekday, index)
+            self._by_name[course_name].add(location)
+            if slot is not None:
+                self._by_slot[slot].add(location)
+            entries.append((course_name, slot))
+        self._days[key] = courses
+        self._day_entries[key] = entries
+
+    def _remove_day(self, key: Tuple[str, int]) -> None:
+        self._days.pop(key, None)
+        name, weekday = key
+        for index, (course_name, slot) in enumerate(self._day_entries.pop(key, [])):
+            location = (name, weekday, index)
+            self._discard(self._by_name, course_name, location)
+            if slot is not None:
+                self._discard(self._by_slot, slot, location)
+
+    @staticmethod
+    def _discard(postings: Dict, key, location: Location) -> None:
+        locations = postings.get(key)
+        if locations is not None:
+            locations.discard(location)
+            if not locations:
+                del postings[key]
+
+    def names(self) -> List[str]:
+        """所有课表中出现过的课程名称"""
+        self._ensure_built()
+        return sorted(name for name in self._by_name if name)
+
+    def find(self, name: str) -> List[Location]:
+        """某门课程在所有课表中出现的位置"""
+        self._ensure_built()
+        return sorted(self._by_name.get(name, ()))
+
+    def search(self, text: str) -> List[Location]:
+        """名称包含text的课程出现的位置"""
+        self._ensure_built()
+        text = text.strip().lower()
+        locations = []
+        for name, postings in self._by_name.items():
+            if text in name.lower():
+                locations.extend(postings)
+        return sorted(locations)
+
+    def at(self, minute: int, weekday: Optional[int] = None) -> List[Location]:
+        """在某一时刻（当天分钟数）正在上的课程，可限定星期"""
+        self._ensure_built()
+        locations = []
+        for (start, end), postings in self._by_slot.items():
+            if start <= minute <= end:
+                locations.extend(location for location in postings if weekday is None or location[1] == weekday)
+        return sorted(locations)
+
+    def course(self, location: Location) -> Optional[Dict]:
+        """返回某个位置上的课程字典"""
+        name, weekday, index = location
+        courses = self._days.get((name, weekday), [])
+        if courses is _RELEASED:
+            # 从文档中重新加载已释放的课表
+            schedule = self._document.get("schedules", {}).get(name)
+            courses = schedule.get(str(weekday)) if isinstance(schedule, dict) else None
+            if not isinstance(courses, list):
+                return None
+        return courses[index] if 0 <= index < len(courses) else None
+
+
+def rename_course_at(document: Dict, locations: Iterable[Location], old_name: Optional[str], new_name: str) -> List[str]:
+    """
+    将指定位置上的课程改名为new_name（新名称已存在时即合并为同一门课）。
+    old_name不为None时只修改名称仍为old_name的课程，避免位置过期后改错课程。
+    受影响的每一天替换为新的课程列表（写时复制），不修改原来的列表和课程字典。
+    Returns:
+        发生变化的课表名称
+    """
+    schedules = document.get("schedules", {})
+    days: Dict[Tuple[str, int], List[int]] = defaultdict(list)
+    for name, weekday, index in locations:
+        days[(name, weekday)].append(index)
+
+    changed = []
+    for (name, weekday), indices in days.items():
+        schedule = schedules.get(name)
+        courses = schedule.get(str(weekday)) if isinstance(schedule, dict) else None
+        if not isinstance(courses, list):
+            continue
+        renamed = list(courses)
+        for index in indices:
+            if index < len(renamed) and isinstance(renamed[index], dict) \
+                    and (old_name is None or renamed[index].get("name") == old_name):
+                renamed[index] = dict(renamed[index], name=new_name)
+        if renamed != courses:
+            schedule[str(weekday)] = renamed
+            if name not in changed:
+                changed.append(name)
+    return changed
@@ -0,0 +1,512 @@
+import copy
+import json
+import os
+import sqlite3
+from collections.abc import MutableMapping
+from contextlib import closing
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from constants import SCHEDULE_FILE, SCHEDULE_DB_FILE
+from logger import logger
+from persistence_service import atomic_write_text
+from schedule_codec import is_packed, pack_document, unpack_document
+from schedule_journal import ScheduleJournal, diff_documents, replay
+from schedule_model import parse_minutes
+
+# 课程字典中单独存为列的字段，其余字段以JSON保存在extra列中
+_COURSE_COLUMNS = ("start_time", "end_time", "name")
+
+# 课表文档中单独存储的顶层字段，其余字段以JSON保存在meta表中
+_DOCUMENT_KEYS = ("schedules",)
+
+# JSON主文件中记录已包含的日志位置的键：{"segment": 日志段快照时间, "entries": 已包含的操作数}
+JOURNAL_POSITION_KEY = "journal_position"
+
+
+class LazyScheduleMap(MutableMapping):
+    """
+    按需加载的 课表名称→课表数据 字典，用作课表文档的 "schedules"。
+    创建时只需要课表名称列表，每套课表在第一次被访问时才从存储中读取，
+    通过evict释放近期不用的课表，因此课表数量很多时启动时间和常驻内存都不会随之增长。
+    只有SQLite后端按需加载；JSON后端启动时读取并解码整个文件（包括重放修改日志），
+    课表都在普通字典中，不会被释放。
+    """
+
+    def __init__(self, names: Iterable[str], loader: Callable[[str], Dict], source: str):
+        """
+        Args:
+            names: 所有课表名称（保持顺序）
+            loader: 读取一套课表的函数
+            source: 数据来源（数据库路径），用于判断保存时是否可以跳过未加载的课表
+        """
+        self._schedules: Dict[str, Optional[Dict]] = dict.fromkeys(names)  # None 表示尚未加载
+        self._loader = loader
+        self.source = source
+        self._dirty: Set[str] = set()  # 上次保存后新增或替换、尚未写入存储的课表
+
+    def __getitem__(self, name: str) -> Dict:
+        schedule = self._schedules[name]
+        if schedule is None:
+            schedule = self._loader(name)
+            self._schedules[name] = schedule
+        return schedule
+
+    def __setitem__(self, name: str, schedule: Dict) -> None:
+        self._schedules[name] = schedule
+        self._dirty.add(name)
+
+    def __delitem__(self, name: str) -> None:
+        del self._schedules[name]
+        self._dirty.discard(name)
+
+    def __iter__(self):
+        return iter(self._schedules)
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def __contains__(self, name) -> bool:
+        return name in self._schedules
+
+    def __deepcopy__(self, memo) -> "LazyScheduleMap":
+        # 只复制已加载的课表，未加载的课表在副本中同样按需读取
+        clone = LazyScheduleMap((), self._loader, self.source)
+        clone._schedules = {name: copy.deepcopy(schedule, memo) for name, schedule in self._schedules.items()}
+        clone._dirty = set(self._dirty)
+        return clone
+
+    def loaded_names(self) -> List[str]:
+        """已加载到内存中的课表名称"""
+        return [name for name, schedule in self._schedules.items() if schedule is not None]
+
+    def mark_saved(self) -> None:
+        """当前内容已提交保存（已生成快照）"""
+        self._dirty.clear()
+
+    def evict(self, keep: Iterable[str]) -> int:
+        """
+        释放keep之外、已经保存过的课表，返回释放的数量。
+        调用前所有保存必须已经写入存储，否则之后会读到旧数据。
+        """
+        keep = set(keep) | self._dirty
+        released = 0
+        for name, schedule in self._schedules.items():
+            if schedule is not None and name not in keep:
+                self._schedules[name] = None
+                released += 1
+        return released
+
+
+def materialize_document(data: Dict) -> Dict:
+    """将课表文档中按需加载的课表全部读入，返回普通字典结构的文档（用于写入其他后端）"""
+    schedules = data.get("schedules")
+    if not isinstance(schedules, LazyScheduleMap):
+        return data
+    document = dict(data)
+    document["schedules"] = {name: schedules[name] for name in schedules}
+    return document
+
+
+class ScheduleStore:
+    """
+    课表存储后端的公共接口。
+    课表在内存中始终是 self.schedule 使用的字典结构：
+        {"current_schedule": ..., "schedules": {课表名: {"0".."6": [课程, ...]}}, "last_modified": ...}
+    各后端只负责持久化，保存时可以只写入发生变化的部分。
+    """
+
+    backend: str = ""
+    backup_path: Optional[str] = None
+
+    def exists(self) -> bool:
+        """存储中是否已有课表数据"""
+        raise NotImplementedError
+
+    def load(self) -> Optional[Dict]:
+        """读取完整的课表文档，没有数据时返回None"""
+        raise NotImplementedError
+
+    def open_document(self) -> Optional[Dict]:
+        """读取供程序运行使用的课表文档，支持的后端只读取课表名称，课表内容按需加载"""
+        return self.load()
+
+    def save_all(self, data: Dict) -> None:
+        """保存完整的课表文档"""
+        raise NotImplementedError
+
+    def save_day(self, data: Dict, schedule_name: str, weekday: int) -> None:
+        """保存某套课表某一天的课程（以及课表列表和顶层字段的变化）"""
+        self.save_all(data)
+
+    def save_schedules(self, data: Dict, schedule_names: Iterable[str]) -> None:
+        """保存指定的若干套课表（以及课表列表和顶层字段的变化）"""
+        self.save_all(data)
+
+    def backup(self) -> None:
+        """在覆盖保存前为当前数据创建备份"""
+
+    def sync_main_file(self) -> None:
+        """将尚未合并的修改写入主文件，使直接读取文件的程序看到最新内容（没有修改日志的后端无需处理）"""
+
+    def restore_point(self, when: datetime) -> Optional[Dict]:
+        """返回课表在某一历史时刻的内容，不支持或没有记录时返回None"""
+        return None
+
+
+class JsonScheduleStore(ScheduleStore):
+    """
+    JSON文件存储（默认）。
+    启用修改日志时，每次保存只把与上次保存相比的变化追加到 <文件名>.journal，
+    日志积累到一定数量后才原子化地重写整个文件（合并）；启动时重放未合并的日志，
+    因此崩溃也不会丢失已保存的修改，日志同时提供按时间点恢复，不再需要整文件备份。
+    文件使用schedule_codec的紧凑格式写入，旧版的普通格式同样可以读取。
+
+    磁盘上的课表由主文件和日志共同组成：读取课表（备份、导入导出、检查工具）都应通过load，
+    直接读取主文件只能看到上次写入主文件时的内容。程序在最后一次保存后不久和退出时调用sync_main_file，
+    外部编辑器和其他实例看到的主文件最多落后这段时间。
+    sync_main_file只重写主文件，并在其中记录已包含的日志位置（journal_position），日志段继续追加，
+    只有日志超过COMPACT_AFTER条操作时才开始新的日志段，因此历史日志段覆盖的时间不受同步次数影响。
+    load一次解码全部课表，课表数量很多、需要按需加载时请使用SQLite后端。
+    """
+
+    backend = "json"
+
+    def __init__(self, path: str = SCHEDULE_FILE, journaled: bool = True):
+        """
+        Args:
+            path: 课表文件路径
+            journaled: 是否使用修改日志；一次性导出的文件不需要
+        """
+        self.path = path
+        self.journal = ScheduleJournal(path + ".journal") if journaled else None
+        self._mirror: Optional[Dict] = None  # 文件与日志合起来的当前内容
+        self._segment_valid = False          # 当前日志段是否以主文件为基础
+        self._synced_entries = 0             # 主文件已包含的日志操作数
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> Optional[Dict]:
+        if not self.exists():
+            return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        position = raw.pop(JOURNAL_POSITION_KEY, None) if isinstance(raw, dict) else None
+        data = unpack_document(raw)
+        self._segment_valid = False
+        self._synced_entries = 0
+        if self.journal is not None:
+            segment = self.journal.read()
+            merged = self._merged_entries(segment, data, position) if segment is not None else None
+            # 日志段与主文件对应时才属于这个文件（文件被外部替换后日志作废）
+            if merged is not None:
+                # 崩溃时写了一半的日志段不能继续追加，下次保存时合并
+                self._segment_valid = not segment.truncated
+                self._synced_entries = merged
+                pending = segment.entries[merged:]
+                if pending:
+                    replay(data, pending)
+                    logger.log_info(f"已从课表日志恢复 {len(pending)} 条尚未写入主文件的修改")
+        self._mirror = copy.deepcopy(data)
+        return data
+
+    @staticmethod
+    def _merged_entries(segment, data: Dict, position) -> Optional[int]:
+        """主文件已包含日志段中的前几条操作；日志段不属于这个主文件时返回None"""
+        if isinstance(position, dict) and position.get("segment") == segment.timestamp:
+            count = position.get("entries")
+            if not isinstance(count, int) or not 0 <= count <= len(segment.entries):
+                return None
+            # 重放前count条操作后必须与主文件一致，否则主文件在同步后被外部修改过
+            return count if replay(segment.checkpoint, segment.entries[:count]) == data else None
+        return 0 if segment.checkpoint == data else None
+
+    def save_all(self, data: Dict) -> None:
+        if self.journal is None:
+            atomic_write_text(self.path, self._dumps(data))
+            return
+        if self._mirror is None or not self._segment_valid:
+            self.compact(data)
+            return
+        ops = diff_documents(self._mirror, data)
+        if not ops:
+            return
+        self.journal.append(ops)
+        replay(self._mirror, ops)
+        if self.journal.needs_compaction:
+            self.compact(self._mirror)
+
+    def sync_main_file(self) -> None:
+        journal = self.journal
+        if journal is None or self._mirror is None or journal.entry_count == self._synced_entries:
+            return
+        if not self._segment_valid or journal.needs_compaction:
+            self.compact()
+            return
+        packed = pack_document(self._mirror)
+        if not is_packed(packed):
+            self.compact()
+            return
+        # 只重写主文件，日志段保持不变；读取时跳过主文件已包含的操作
+        packed[JOURNAL_POSITION_KEY] = {"segment": journal.segment_time, "entries": journal.entry_count}
+        atomic_write_text(self.path, json.dumps(packed, ensure_ascii=False, separators=(",", ":")))
+        self._synced_entries = journal.entry_count
+
+    def compact(self, data: Optional[Dict] = None) -> None:
+        """将课表完整写入主文件，并以此为快照开始新的日志段"""
+        data = self._mirror if data is None else data
+        if data is None:
+            return
+        text = self._dumps(data)
+        atomic_write_text(self.path, text)
+        self._mirror = unpack_document(json.loads(text))
+        self._synced_entries = 0
+        if self.journal is not None:
+            self.journal.start_segment(self._mirror)
+            self._segment_valid = True
+
+    @staticmethod
+    def _dumps(data: Dict) -> str:
+        """以紧凑格式序列化（重复的节次时间、课程名称和相同的天只保存一份）"""
+        return json.dumps(pack_document(data), ensure_ascii=False, separators=(",", ":"))
+
+    def restore_point(self, when: datetime) -> Optional[Dict]:
+        if self.journal is None:
+            return None
+        return self.journal.restore_point(when)
+
+
+class SqliteScheduleStore(ScheduleStore):
+    """
+    SQLite存储。
+    每门课程是courses表中的一行，并在 (schedule, weekday, start_minute) 上建立索引；
+    编辑器保存某一天时只删除并重新插入这一天的课程行，课表数量很多时也不必重写全部数据。
+    """
+
+    backend = "sqlite"
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS schedules (
+            name TEXT PRIMARY KEY
+        );
+        CREATE TABLE IF NOT EXISTS courses (
+            id INTEGER PRIMARY KEY,
+            schedule TEXT NOT NULL,
+            weekday INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            start_minute INTEGER,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            name TEXT NOT NULL,
+            extra TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_courses_schedule_weekday_start
+            ON courses (schedule, weekday, start_minute);
+    """
+
+    def __init__(self, path: str = SCHEDULE_DB_FILE):
+        self.path = path
+        self.backup_path = path + ".bak"
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.executescript(self._SCHEMA)
+        return conn
+
+    def exists(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM schedules LIMIT 1").fetchone() is not None
+
+    def load(self) -> Optional[Dict]:
+        if not self.exists():
+            return None
+        with closing(self._connect()) as conn:
+            data = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM meta")}
+            schedules = {}
+            for (name,) in conn.execute("SELECT name FROM schedules ORDER BY rowid"):
+                schedules[name] = {str(weekday): [] for weekday in range(7)}
+            rows = conn.execute(
+                "SELECT schedule, weekday, start_time, end_time, name, extra FROM courses "
+                "ORDER BY schedule, weekday, position"
+            )
+            for schedule, weekday, start_time, end_time, name, extra in rows:
+                course = {"start_time": start_time, "end_time": end_time, "name": name}
+                if extra:
+                    course.update(json.loads(extra))
+                schedules.setdefault(schedule, {}).setdefault(str(weekday), []).append(course)
+        data["schedules"] = schedules
+        return data
+
+    def open_document(self) -> Optional[Dict]:
+        if not self.exists():
+            return None
+        with closing(self._connect()) as conn:
+            data = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM meta")}
+            names = [name for (name,) in conn.execute("SELECT name FROM schedules ORDER BY rowid")]
+        data["schedules"] = LazyScheduleMap(names, self.load_schedule, self.path)
+        return data
+
+    def load_schedule(self, name: str) -> Dict:
+        """读取一套课表（使用 (schedule, weekday, start_minute) 索引）"""
+        schedule = {str(weekday): [] for weekday in range(7)}
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT weekday, start_time, end_time, name, extra FROM courses "
+                "WHERE schedule = ? ORDER BY weekday, position",
+                (name,)
+            )
+            for weekday, start_time, end_time, course_name, extra in rows:
+                course = {"start_time": start_time, "end_time": end_time, "name": course_name}
+                if extra:
+                    course.update(json.loads(extra))
+                schedule.setdefault(str(weekday), []).append(course)
+        return schedule
+
+    def save_all(self, data: Dict) -> None:
+        schedules = data.get("schedules")
+        if isinstance(schedules, LazyScheduleMap) and schedules.source == self.path:
+            # 未加载的课表与数据库一致，只需写入已加载的课表
+            self.save_schedules(data, schedules.loaded_names())
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM courses")
+            conn.execute("DELETE FROM schedules")
+            conn.execute("DELETE FROM meta")
+            for name, schedule in data.get("schedules", {}).items():
+                self._insert_schedule(conn, name, schedule)
+            self._write_meta(conn, data)
+
+    def save_day(self, data: Dict, schedule_name: str, weekday: int) -> None:
+        with closing(self._connect()) as conn, conn:
+            added = self._sync_schedule_names(conn, data)
+            if schedule_name not in added:
+                courses = data["schedules"].get(schedule_name, {}).get(str(weekday), [])
+                conn.execute("DELETE FROM courses WHERE schedule = ? AND weekday = ?", (schedule_name, weekday))
+                self._insert_courses(conn, schedule_name, weekday, courses)
+            self._write_meta(conn, data)
+
+    def save_schedules(self, data: Dict, schedule_names: Iterable[str]) -> None:
+        with closing(self._connect()) as conn, conn:
+            added = self._sync_schedule_names(conn, data)
+            for name in schedule_names:
+                if name in added or name not in data["schedules"]:
+                    continue
+                conn.execute("DELETE FROM courses WHERE schedule = ?", (name,))
+                for weekday, courses in data["schedules"][name].items():
+                    self._insert_courses(conn, name, int(weekday), courses)
+            self._write_meta(conn, data)
+
+    def backup(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with closing(sqlite3.connect(self.path)) as source, closing(sqlite3.connect(self.backup_path)) as target:
+            source.backup(target)
+
+    def courses_between(self, schedule_name: str, weekday: int,
+                        start_minute: int, end_minute: int) -> List[Dict[str, str]]:
+        """查询某套课表某一天在 [start_minute, end_minute) 之间开始的课程（使用索引）"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT start_time, end_time, name, extra FROM courses "
+                "WHERE schedule = ? AND weekday = ? AND start_minute >= ? AND start_minute < ? "
+                "ORDER BY start_minute",
+                (schedule_name, weekday, start_minute, end_minute)
+            ).fetchall()
+        courses = []
+        for start_time, end_time, name, extra in rows:
+            course = {"start_time": start_time, "end_time": end_time, "name": name}
+            if extra:
+                course.update(json.loads(extra))
+            courses.append(course)
+        return courses
+
+    def _sync_schedule_names(self, conn: sqlite3.Connection, data: Dict) -> set:
+        """同步课表列表（新增、复制、重命名、删除课表），返回新插入的课表名称"""
+        schedules = data.get("schedules", {})
+        existing = {name for (name,) in conn.execute("SELECT name FROM schedules")}
+        for name in existing - schedules.keys():
+            conn.execute("DELETE FROM courses WHERE schedule = ?", (name,))
+            conn.execute("DELETE FROM schedules WHERE name = ?", (name,))
+        added = set(schedules.keys()) - existing
+        for name in added:
+            self._insert_schedule(conn, name, schedules[name])
+        return added
+
+    def _insert_schedule(self, conn: sqlite3.Connection, name: str, schedule: Dict) -> None:
+        conn.execute("INSERT INTO schedules (name) VALUES (?)", (name,))
+        for weekday, courses in schedule.items():
+            self._insert_courses(conn, name, int(weekday), courses)
+
+    def _insert_courses(self, conn: sqlite3.Connection, schedule_name: str, weekday: int,
+                        courses: List[Dict[str, str]]) -> None:
+        rows = []
+        for position, course in enumerate(courses):
+            start = parse_minutes(course.get("start_time", ""))
+            extra = {key: value for key, value in course.items() if key not in _COURSE_COLUMNS}
+            rows.append((
+                schedule_name, weekday, position,
+                start,
+                course.get("start_time", ""), course.get("end_time", ""), course.get("name", ""),
+                json.dumps(extra, ensure_ascii=False) if extra else None
+            ))
+        conn.executemany(
+            "INSERT INTO courses (schedule, weekday, position, start_minute, start_time, end_time, name, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def _write_meta(self, conn: sqlite3.Connection, data: Dict) -> None:
+        conn.execute("DELETE FROM meta")
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value, ensure_ascii=False)) for key, value in data.items() if key not in _DOCUMENT_KEYS]
+        )
+
+
+def store_for_backend(backend: str) -> ScheduleStore:
+    """返回指定后端（json / sqlite）的课表存储"""
+    return SqliteScheduleStore() if backend == "sqlite" else JsonScheduleStore()
+
+
+def create_schedule_store(backend: str) -> ScheduleStore:
+    """
+    根据配置创建课表存储。
+    首次使用SQLite时，如果数据库中还没有课表，会自动导入现有的JSON课表。
+    """
+    store = store_for_backend(backend)
+    if not isinstance(store, SqliteScheduleStore):
+        return store
+    try:
+        json_store = JsonScheduleStore()
+        if not store.exists() and json_store.exists():
+            import_json(json_store.path, store.path)
+            logger.log_info(f"已将 {json_store.path} 导入到 {store.path}")
+    except Exception as e:
+        logger.log_error(f"导入JSON课表到SQLite失败，继续使用JSON存储: {e}")
+        return JsonScheduleStore()
+    return store
+
+
+def import_json(json_path: str, db_path: str) -> None:
+    """一次性将JSON课表文件导入SQLite数据库（覆盖数据库中的课表）"""
+    data = JsonScheduleStore(json_path).load()
+    if data is None:
+        raise FileNotFoundError(json_path)
+    if "schedules" not in data:
+        # 兼容旧版单套课表
+        data = {"current_schedule": "default", "schedules": {"default": data}}
+    SqliteScheduleStore(db_path).save_all(data)
+
+
+def export_json(db_path: str, json_path: str) -> None:
+    """一次性将SQLite数据库中的课表导出为JSON课表文件"""
+    data = SqliteScheduleStore(db_path).load()
+    if data is None:
+        raise FileNotFoundError(db_path)
+    JsonScheduleStore(json_path, journaled=False).save_all(data)
@@ -0,0 +1,186 @@
+from datetime import date, datetime
+from typing import Hashable, List, Optional, Tuple
+from constants import WEEKDAYS
+from schedule_model import Course
+from schedule_index import (
+    CourseInterval, DayIndex, ScheduleIndex,
+    STATUS_ONGOING, STATUS_FINISHED, minute_of_day
+)
+
+# 课程状态对应的指示颜色
+COLOR_PENDING = "red"      # 未上过的课程
+COLOR_ONGOING = "yellow"   # 正在上的课程
+COLOR_FINISHED = "green"   # 已上完的课程
+
+_STATUS_COLORS = {
+    STATUS_ONGOING: COLOR_ONGOING,
+    STATUS_FINISHED: COLOR_FINISHED,
+}
+
+
+class DayContext:
+    """
+    当天的日历上下文。
+    这些值只在跨天（或相关配置变化）时才会改变，每天计算一次后由所有使用者共享，
+    逐秒更新的路径只需格式化时分秒。
+    """
+    __slots__ = ("date", "date_text", "weekday", "countdown_days", "countdown_alert", "is_holiday")
+
+    def __init__(self, day: date, countdown_days: int, countdown_alert: bool, is_holiday: bool = False):
+        self.date = day
+        self.date_text = day.strftime("%Y-%m-%d")
+        self.weekday = day.weekday()
+        self.countdown_days = countdown_days    # 距离倒计时目标日期的天数
+        self.countdown_alert = countdown_alert  # 倒计时是否需要醒目显示（高考彩蛋）
+        self.is_holiday = is_holiday            # 当天是否为假期
+
+
+class HeaderView:
+    """时间/星期区域的渲染描述"""
+    __slots__ = ("date_text", "weekday_text", "is_preview")
+
+    def __init__(self, date_text: str, weekday_text: str, is_preview: bool):
+        self.date_text = date_text        # 日期（显示当天时包含时分秒）
+        self.weekday_text = weekday_text  # “星期X”
+        self.is_preview = is_preview      # 是否正在预览其他天（星期显示为斜体）
+
+
+class ScheduleView:
+    """课程列表的渲染描述"""
+    __slots__ = ("weekday", "is_today", "rows", "has_current_course", "per_second", "day_index")
+
+    def __init__(self, weekday: int, is_today: bool, rows: List[Tuple[Hashable, str, str]],
+                 has_current_course: bool, per_second: bool, day_index: DayIndex):
+        self.weekday = weekday
+        self.is_today = is_today
+        self.rows = rows                              # 按显示顺序排列的 (课程键, 显示文本, 状态颜色)
+        self.has_current_course = has_current_course  # 是否有正在进行的课程
+        self.per_second = per_second                  # 显示内容是否每秒都会变化
+        self.day_index = day_index                    # 当天课程的区间索引
+
+
+class ScheduleViewModel:
+    """
+    主界面的视图模型。
+    根据给定的时间、课表和配置计算界面应当显示的内容（课程颜色、显示文本、倒计时、
+    明日预览触发条件等），不依赖Tk，可以在没有显示器的环境中测量和测试。
+    Tk窗口只负责把这里产生的渲染描述交给渲染器。
+    """
+
+    def __init__(self, config_handler, schedule_index: ScheduleIndex, day_resolver=None):
+        """
+        Args:
+            config_handler: 配置处理器（只读取显示相关的配置项）
+            schedule_index: 课表区间索引
+            day_resolver: 节假日与调休解析器，为None时不考虑日期覆盖
+        """
+        self.config_handler = config_handler
+        self.schedule_index = schedule_index
+        self.day_resolver = day_resolver
+        self._day_context: Optional[DayContext] = None
+        self._day_context_key: Optional[tuple] = None
+
+    def day_context(self, now: datetime) -> DayContext:
+        """返回当天的日历上下文，跨天或相关配置变化时才重新计算"""
+        handler = self.config_handler
+        today = now.date()
+        resolver_version = self.day_resolver.version if self.day_resolver else None
+        key = (today, handler.countdown_date, handler.countdown_name, resolver_version)
+        if key != self._day_context_key:
+            countdown_days = (handler.countdown_date.date() - today).days
+            # 高考彩蛋：当倒计时名称是高考且天数<=100时醒目显示
+            countdown_alert = handler.countdown_name == "高考" and countdown_days <= 100
+            is_holiday = self.day_resolver.resolve(today).no_classes if self.day_resolver else False
+            self._day_context = DayContext(today, countdown_days, countdown_alert, is_holiday)
+            self._day_context_key = key
+        return self._day_context
+
+    def header(self, now: datetime, displayed_weekday: int) -> HeaderView:
+        """计算时间/星期区域的显示内容"""
+        context = self.day_context(now)
+        weekday_text = f"星期{WEEKDAYS[displayed_weekday]}"
+        if displayed_weekday == context.weekday:
+            # 逐秒变化的只有时分秒
+            return HeaderView(f"{context.date_text}\n{now.hour:02d}:{now.minute:02d}:{now.second:02d}", weekday_text, False)
+        # 预览其他天时日期不变，不显示秒数
+        return HeaderView(context.date_text, weekday_text, True)
+
+    def schedule(self, now: datetime, schedule_name: Optional[str], weekday_to_show: int,
+                 is_today: Optional[bool] = None) -> ScheduleView:
+        """
+        计算课程列表的显示内容。
+        Args:
+            now: 当前时间
+            schedule_name: 课表名称，为None时表示停课（没有课程）
+            weekday_to_show: 要显示课表中星期几的课程 (0-6)
+            is_today: 是否按当天的课程进度着色，默认在显示今天的星期时着色（调休时需显式指定）
+        """
+        day_index = self.schedule_index.day(schedule_name, weekday_to_show)
+        if is_today is None:
+            is_today = weekday_to_show == now.weekday()
+        minute = minute_of_day(now)
+
+        has_current_course = False
+        rows = []
+        for position, course in enumerate(day_index.courses):
+            color = self.course_color(day_index, position, minute, is_today)
+            if color == COLOR_ONGOING:
+                has_current_course = True
+            text = self.course_text(course, color, now, day_index.intervals[position])
+            rows.append((day_index.keys[position], text, color))
+
+        # “倒计时”模式下正在进行的课程每秒都会变化
+        per_second = has_current_course and self.config_handler.current_course_time_display_mode == "countdown"
+        return ScheduleView(weekday_to_show, is_today, rows, has_current_course, per_second, day_index)
+
+    def course_color(self, day_index: DayIndex, position: int, minute: float, is_today: bool) -> str:
+        """根据课程时间获取显示颜色"""
+        # 如果显示的不是当天的课表，则所有课程都显示为“未开始”状态
+        if not is_today:
+            return COLOR_PENDING
+        # 时间格式错误的课程始终为“未开始”
+        return _STATUS_COLORS.get(day_index.status(position, minute), COLOR_PENDING)
+
+    def course_text(self, course: Course, color: str, now: datetime,
+                    interval: Optional[CourseInterval] = None) -> str:
+        """
+        根据课程状态和设置生成显示文本
+        Args:
+            interval: 课程编译后的时间区间，时间格式错误时为None
+        """
+        mode = self.config_handler.current_course_time_display_mode
+
+        # 仅当课程正在进行中且模式不是 "default" 时，才应用特殊显示
+        if color == COLOR_ONGOING and mode != "default":
+            if mode == "end_time":
+                return f"{course.end_time or '00:00'} {course.name}"
+
+            if mode == "countdown" and interval is not None:
+                # 如果结束时间在当前时间之前（例如，刚好过了一秒），则显示为0
+                elapsed_seconds = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1_000_000
+                remaining_seconds = max(0.0, interval.end * 60 - elapsed_seconds)
+                minutes = int(remaining_seconds // 60)
+                seconds = int(remaining_seconds % 60)
+                return f"{minutes:02d}:{seconds:02d} {course.name}"
+
+        # 默认显示开始时间
+        return f"{course.start_time} {course.name}"
+
+    def should_preview_tomorrow(self, now: datetime, schedule_name: Optional[str],
+                                weekday: Optional[int] = None) -> bool:
+        """
+        判断当天的课程进度是否已满足自动预览明日课表的条件
+        Args:
+            weekday: 今天使用课表中星期几的课程，默认为今天的星期
+        """
+        day_index = self.schedule_index.day(schedule_name, now.weekday() if weekday is None else weekday)
+        if not day_index.intervals:
+            return False  # 今天没课，不触发
+
+        trigger_count = self.config_handler.preview_tomorrow_trigger_count
+        minute = minute_of_day(now)
+        if trigger_count > 0:
+            # 按第N节课触发
+            return day_index.finished_count(minute) >= trigger_count
+        # 按全部课程结束后触发 (旧逻辑)
+        return day_index.all_finished(minute)
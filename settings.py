@@ -1,12 +1,14 @@
 import tkinter as tk
 from tkinter import ttk
 import sys
-from tkinter import messagebox, colorchooser, simpledialog
+from tkinter import messagebox, colorchooser, simpledialog, filedialog
 from datetime import datetime
 from constants import CONFIG_FILE, APP_NAME, AUTHOR, VERSION, PROJECT_URL
 from about_window import AboutWindow
 from logger import logger
+from persistence_service import persistence_service
 from dpi_manager import dpi_manager
+from holiday_calendar import parse_override_lines, read_override_file
 
 
 class ScrollableFrame(ttk.Frame):
@@ -299,6 +301,21 @@ class SettingsWindow:
         self.vertical_padding.grid(row=1, column=1, padx=5, pady=5)
         create_spinbox(padding_frame, vertical_var, 1)
 
+        # ========== 渲染模式 ==========
+        renderer_frame = ttk.LabelFrame(ui_frame, text="渲染模式", style="Settings.TLabelframe")
+        renderer_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        self.renderer_mode_var = tk.StringVar(value=self.main_app.config_handler.schedule_renderer_mode)
+        renderer_modes = [("控件", "widget"), ("单画布", "canvas")]
+        for i, (text, mode) in enumerate(renderer_modes):
+            ttk.Radiobutton(
+                renderer_frame,
+                text=text,
+                variable=self.renderer_mode_var,
+                value=mode,
+                style="Settings.White.TRadiobutton"
+            ).grid(row=0, column=i, padx=5, pady=5, sticky=tk.W)
+
     def _create_course_tab(self) -> None:
         """创建课程设置标签页"""
         scrollable_tab = ScrollableFrame(self.notebook, style="Settings.TFrame")
@@ -420,6 +437,33 @@ class SettingsWindow:
         )
         self.schedule2_combo.grid(row=2, column=1, padx=5, pady=2)
 
+        # 第三周及以后的课表，实现A/B/C/D等多周轮换
+        ttk.Label(rotation_frame, text="后续周课表:", style="Settings.TLabel").grid(row=3, column=0, padx=5, sticky=tk.N)
+        self.extra_schedules_text = tk.Text(rotation_frame, height=3, width=20)
+        self.extra_schedules_text.grid(row=3, column=1, padx=5, pady=2)
+        self.extra_schedules_text.insert(tk.END, "\n".join(self.main_app.config_handler.rotation_extra_schedules))
+        ttk.Label(
+            rotation_frame, text="每行一个课表，依次为第三周、第四周……", style="Settings.TLabel"
+        ).grid(row=4, column=0, columnspan=2, padx=5, sticky=tk.W)
+
+        # 节假日与调休设置（保存在独立的日历文件中，不随配置方案切换）
+        holiday_frame = ttk.LabelFrame(course_frame, text="节假日与调休", style="Settings.TLabelframe")
+        holiday_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        self.holiday_text = tk.Text(holiday_frame, height=5, width=30)
+        self.holiday_text.pack(padx=5, pady=5)
+        self.holiday_text.insert(tk.END, "\n".join(
+            override.to_line() for override in self.main_app.holiday_calendar.overrides
+        ))
+        ttk.Label(
+            holiday_frame,
+            text="每行一条，例如:\n2026-10-01~2026-10-07 放假 #国庆节\n2026-10-11 星期五 [课表名] #调休",
+            style="Settings.TLabel"
+        ).pack(padx=5, anchor=tk.W)
+        ttk.Button(
+            holiday_frame, text="从文件导入...", command=self._import_holiday_file, style="Settings.TButton"
+        ).pack(padx=5, pady=5, anchor=tk.W)
+
         # 倒计时与默认课表设置
         gaokao_frame = ttk.LabelFrame(course_frame, text="倒计时与默认课表", style="Settings.TLabelframe")
         gaokao_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -592,6 +636,38 @@ class SettingsWindow:
             style="Settings.White.TCheckbutton")
         self.auto_update_check.pack(side=tk.LEFT, padx=5)
 
+        # 省电模式设置
+        power_frame = ttk.LabelFrame(other_frame, text="省电模式", style="Settings.TLabelframe")
+        power_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        self.power_saving_var = tk.BooleanVar(value=self.main_app.config_handler.power_saving_enabled)
+        self.power_saving_check = ttk.Checkbutton(
+            power_frame, text="窗口最小化或被遮挡时降低刷新频率",
+            variable=self.power_saving_var,
+            style="Settings.White.TCheckbutton")
+        self.power_saving_check.pack(side=tk.LEFT, padx=5)
+
+        # 课表存储设置
+        storage_frame = ttk.LabelFrame(other_frame, text="课表存储", style="Settings.TLabelframe")
+        storage_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        self.storage_backend_var = tk.StringVar(value=self.main_app.config_handler.schedule_storage_backend)
+        storage_backends = [("JSON文件", "json"), ("SQLite数据库", "sqlite")]
+        for i, (text, backend) in enumerate(storage_backends):
+            ttk.Radiobutton(
+                storage_frame,
+                text=text,
+                variable=self.storage_backend_var,
+                value=backend,
+                style="Settings.White.TRadiobutton"
+            ).grid(row=0, column=i, padx=5, pady=5, sticky=tk.W)
+        # JSON文件启动时读取全部课表，只有SQLite按需加载、释放近期不用的课表
+        ttk.Label(
+            storage_frame,
+            text="课表很多（上百套）时建议使用SQLite：启动时只读取当前课表，其余课表按需加载",
+            style="Settings.TLabel"
+        ).grid(row=1, column=0, columnspan=len(storage_backends), padx=5, pady=(0, 5), sticky=tk.W)
+
         # 日志设置
         log_frame = ttk.LabelFrame(other_frame, text="日志设置", style="Settings.TLabelframe")
         log_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -663,6 +739,22 @@ class SettingsWindow:
             style="Settings.TButton"
         ).pack(pady=10)
 
+        # --- 历史版本区域 ---
+        history_frame = ttk.LabelFrame(backup_frame, text="课表历史版本", style="Settings.TLabelframe")
+        history_frame.pack(fill=tk.X, padx=10, pady=10, ipady=5)
+
+        ttk.Label(history_frame, text="恢复到时间 (YYYY-MM-DD HH:MM):", style="Settings.TLabel").pack(anchor=tk.W, padx=5, pady=2)
+        self.restore_time_entry = ttk.Entry(history_frame, width=20)
+        self.restore_time_entry.insert(0, datetime.now().strftime("%Y-%m-%d %H:%M"))
+        self.restore_time_entry.pack(anchor=tk.W, padx=5, pady=2)
+
+        ttk.Button(
+            history_frame,
+            text="恢复课表...",
+            command=self._handle_restore_point,
+            style="Settings.TButton"
+        ).pack(pady=5)
+
     def _handle_export(self):
         """处理导出按钮点击事件"""
         from backup_restore_manager import BackupRestoreManager
@@ -688,6 +780,29 @@ class SettingsWindow:
         self._update_config_combobox()
 
 
+    def _handle_restore_point(self):
+        """将课表恢复到修改日志中的某一历史时间点"""
+        try:
+            when = datetime.strptime(self.restore_time_entry.get().strip(), "%Y-%m-%d %H:%M")
+        except ValueError:
+            messagebox.showerror("错误", "请输入有效的时间，格式为 YYYY-MM-DD HH:MM", parent=self.window)
+            return
+
+        # 先写完尚未落盘的修改，日志才是完整的
+        persistence_service.flush()
+        restored = self.main_app.schedule_store.restore_point(when)
+        if restored is None:
+            messagebox.showwarning("无法恢复", "没有该时间点的课表记录（仅JSON存储支持历史版本）。", parent=self.window)
+            return
+        if not messagebox.askyesno("确认", f"确定要将课表恢复到 {when:%Y-%m-%d %H:%M} 的状态吗？\n恢复本身也会记录在历史中。", parent=self.window):
+            return
+
+        self.main_app.schedule = restored
+        self.main_app._apply_schedule_rotation(datetime.now())
+        self.main_app.save_schedule()
+        logger.log_info(f"课表已恢复到 {when:%Y-%m-%d %H:%M}")
+        messagebox.showinfo("成功", "课表已恢复", parent=self.window)
+
     def _get_contrasting_color(self, hex_color):
         """Calculates contrasting text color (black or white) for a given hex background color."""
         try:
@@ -765,7 +880,8 @@ class SettingsWindow:
             'font_size': self.main_app.config_handler.font_size,
             'font_color': self.main_app.config_handler.font_color,
             'window_width_du': self.main_app.config_handler.window_width_du,
-            'window_height_du': self.main_app.config_handler.window_height_du
+            'window_height_du': self.main_app.config_handler.window_height_du,
+            'schedule_renderer_mode': self.main_app.config_handler.schedule_renderer_mode
         }
         
         try:
@@ -835,7 +951,8 @@ class SettingsWindow:
             
             # 应用自动更新检查设置
             self.main_app.config_handler.auto_update_check_enabled = self.auto_update_check_var.get()
-            
+            self.main_app.config_handler.power_saving_enabled = self.power_saving_var.get()
+
             # 应用自动补全结束时间设置
             self.main_app.config_handler.auto_complete_end_time = self.auto_complete_var.get()
             
@@ -885,14 +1002,30 @@ class SettingsWindow:
             self.main_app.config_handler.ai_assistant_model_name = self.ai_model_name_entry.get()
             
             # 保存课表轮换设置
+            extra_schedules = [name.strip() for name in self.extra_schedules_text.get("1.0", tk.END).split("\n") if name.strip()]
+            unknown_schedules = [name for name in extra_schedules if name not in self.main_app.schedule["schedules"]]
+            if unknown_schedules:
+                messagebox.showerror("错误", f"以下课表不存在: {', '.join(unknown_schedules)}", parent=self.window)
+                return
             self.main_app.config_handler.schedule_rotation_enabled = self.rotation_var.get()
             self.main_app.config_handler.rotation_schedule1 = self.schedule1_var.get()
             self.main_app.config_handler.rotation_schedule2 = self.schedule2_var.get()
+            self.main_app.config_handler.rotation_extra_schedules = extra_schedules
 
-            # 保存课表轮换设置
-            self.main_app.config_handler.schedule_rotation_enabled = self.rotation_var.get()
-            self.main_app.config_handler.rotation_schedule1 = self.schedule1_var.get()
-            self.main_app.config_handler.rotation_schedule2 = self.schedule2_var.get()
+            # 校验节假日与调休设置，保存配置后再写入日历文件
+            try:
+                holiday_overrides = parse_override_lines(self.holiday_text.get("1.0", tk.END))
+            except ValueError as e:
+                messagebox.showerror("错误", f"节假日与调休设置有误: {e}", parent=self.window)
+                return
+            unknown_schedules = sorted({override.schedule for override in holiday_overrides
+                                        if override.schedule and override.schedule not in self.main_app.schedule["schedules"]})
+            if unknown_schedules:
+                messagebox.showerror("错误", f"调休设置中的课表不存在: {', '.join(unknown_schedules)}", parent=self.window)
+                return
+
+            # 应用渲染模式设置（重启后生效）
+            self.main_app.config_handler.schedule_renderer_mode = self.renderer_mode_var.get()
 
             # 应用当前课程时间显示模式设置
             self.main_app.config_handler.current_course_time_display_mode = self.course_time_display_mode_var.get()
@@ -918,7 +1051,24 @@ class SettingsWindow:
                 messagebox.showerror("错误", "请输入有效的日志保留天数（正整数）")
                 return
             
+            # 所有设置校验通过后才切换课表存储（立即迁移当前课表），随后保存配置，
+            # 避免校验失败提前返回时运行中的存储与配置文件不一致
+            storage_backend = self.storage_backend_var.get()
+            if storage_backend != self.main_app.schedule_store.backend:
+                try:
+                    self.main_app.switch_schedule_store(storage_backend)
+                except Exception as e:
+                    logger.log_error(f"切换课表存储失败: {e}")
+                    messagebox.showerror("错误", f"切换课表存储失败: {e}", parent=self.window)
+                    return
+            self.main_app.config_handler.schedule_storage_backend = storage_backend
+
             self.main_app.config_handler.save_config()
+            self.main_app.holiday_calendar.replace_all(holiday_overrides)
+            self.main_app.holiday_calendar.save()
+            # 轮换与调休设置可能已变化，立即重新选择今天的课表
+            self.main_app._apply_schedule_rotation(datetime.now())
+            self.main_app.notify_schedule_changed()
             # 更新字体设置
             self.main_app._update_font_settings()
             
@@ -932,7 +1082,8 @@ class SettingsWindow:
                 'font_size': self.main_app.config_handler.font_size,
                 'font_color': self.main_app.config_handler.font_color,
                 'window_width_du': self.main_app.config_handler.window_width_du,
-                'window_height_du': self.main_app.config_handler.window_height_du
+                'window_height_du': self.main_app.config_handler.window_height_du,
+                'schedule_renderer_mode': self.main_app.config_handler.schedule_renderer_mode
             }
             
             if new_layout != old_layout:
@@ -946,6 +1097,28 @@ class SettingsWindow:
         finally:
             self.applying = False  # 重置标志位
 
+    def _import_holiday_file(self):
+        """从文件批量导入节假日与调休，追加到文本框中"""
+        path = filedialog.askopenfilename(
+            title="导入节假日与调休",
+            filetypes=[("日历文件", "*.json *.csv *.txt"), ("所有文件", "*.*")],
+            parent=self.window
+        )
+        if not path:
+            return
+        try:
+            overrides = read_override_file(path)
+        except Exception as e:
+            logger.log_error(f"导入节假日与调休失败: {e}")
+            messagebox.showerror("错误", f"导入失败: {e}", parent=self.window)
+            return
+        existing = self.holiday_text.get("1.0", tk.END).strip()
+        lines = [existing] if existing else []
+        lines.extend(override.to_line() for override in overrides)
+        self.holiday_text.delete("1.0", tk.END)
+        self.holiday_text.insert(tk.END, "\n".join(lines))
+        messagebox.showinfo("成功", f"已导入 {len(overrides)} 条记录，点击应用后生效", parent=self.window)
+
     def _add_new_config(self):
         """添加新配置"""
         new_name = simpledialog.askstring("新配置", "请输入新配置名称:", parent=self.window)
@@ -1039,8 +1212,12 @@ class SettingsWindow:
         self.preview_trigger_count_var.set(str(handler.preview_tomorrow_trigger_count))
         self.rotation_var.set(handler.schedule_rotation_enabled)
         self.course_time_display_mode_var.set(handler.current_course_time_display_mode)
+        self.renderer_mode_var.set(handler.schedule_renderer_mode)
+        self.storage_backend_var.set(handler.schedule_storage_backend)
         self.schedule1_var.set(handler.rotation_schedule1)
         self.schedule2_var.set(handler.rotation_schedule2)
+        self.extra_schedules_text.delete("1.0", tk.END)
+        self.extra_schedules_text.insert(tk.END, "\n".join(handler.rotation_extra_schedules))
         self.countdown_name_entry.delete(0, tk.END)
         self.countdown_name_entry.insert(0, handler.countdown_name)
         self.countdown_date_entry.delete(0, tk.END)
@@ -1060,6 +1237,7 @@ class SettingsWindow:
         self.auto_start_var.set(handler.auto_start)
         self.debug_var.set(handler.debug_mode)
         self.auto_update_check_var.set(handler.auto_update_check_enabled)
+        self.power_saving_var.set(handler.power_saving_enabled)
         self.log_retention_days_entry.delete(0, tk.END)
         self.log_retention_days_entry.insert(0, str(handler.log_retention_days))
 
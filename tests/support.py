@@ -0,0 +1,20 @@
+"""
+测试共用的工具。
+导入本模块时把项目根目录加入sys.path，测试文件直接运行（python tests/test_xxx.py）和通过pytest运行都能导入项目模块。
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def course(start, end, name="课", **extra):
+    """课程字典；extra为room、teacher等可选字段"""
+    return dict({"start_time": start, "end_time": end, "name": name}, **extra)
+
+
+def document(**schedules):
+    """每套课表只有星期一课程的课表文档：document(A=[课程, ...], B=...)"""
+    return {"current_schedule": "A", "schedules": {name: {"0": day} for name, day in schedules.items()}}
@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import support  # noqa: F401  项目根目录加入sys.path
+
+from app import CourseScheduler
+from persistence_service import PersistenceService
+from schedule_codec import unpack_document
+from schedule_store import JOURNAL_POSITION_KEY, JsonScheduleStore
+
+
+def document(name):
+    return {"current_schedule": "A",
+            "schedules": {"A": {"0": [{"start_time": "08:00", "end_time": "08:45", "name": name}]}}}
+
+
+class ExitTest(unittest.TestCase):
+    """菜单中的退出只结束主循环，main.py随后调用flush_on_exit"""
+
+    def test_exit_writes_pending_saves_into_main_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "schedule.json")
+            store = JsonScheduleStore(path)
+            store.save_all(document("语文"))
+            store.save_all(document("数学"))  # 已写入日志，空闲同步的定时器尚未触发
+
+            service = object.__new__(PersistenceService)
+            service._setup()
+            service.DEBOUNCE_SECONDS = 60  # 退出时仍在等待写入
+            service.submit("schedule", lambda: store.save_all(document("英语")))
+
+            scheduler = object.__new__(CourseScheduler)
+            scheduler.schedule_store = store
+            with mock.patch("app.persistence_service", service), mock.patch("app.file_watcher"):
+                scheduler.flush_on_exit()
+
+            with open(path, encoding="utf-8") as f:
+                raw = json.load(f)
+            self.assertEqual(raw.pop(JOURNAL_POSITION_KEY)["entries"], store.journal.entry_count)
+            self.assertEqual(unpack_document(raw), document("英语"))
+            self.assertEqual(JsonScheduleStore(path).load(), document("英语"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import gc
+import os
+import tempfile
+import unittest
+import weakref
+
+from support import course
+
+from schedule_occupancy import OccupancyIndex
+from schedule_search import ScheduleSearchIndex
+from schedule_store import LazyScheduleMap, SqliteScheduleStore
+
+
+class CourseList(list):
+    """可以被弱引用的课程列表，用于确认释放后能被回收"""
+
+
+class EvictTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SqliteScheduleStore(os.path.join(self.tmp.name, "schedule.db"))
+        self.store.save_all({"current_schedule": "A", "schedules": {
+            "A": {"0": [course("08:00", "08:45", "语文", room="301")]},
+            "B": {"0": [course("08:30", "09:15", "数学", room="301")]},
+        }})
+        self.document = self.store.open_document()
+        self.schedules = self.document["schedules"]
+        self.assertIsInstance(self.schedules, LazyScheduleMap)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_indexes_release_evicted_days(self):
+        search, occupancy = ScheduleSearchIndex(), OccupancyIndex()
+        search.update(self.document)
+        occupancy.update(self.document)
+        self.schedules["B"]["0"] = CourseList(self.schedules["B"]["0"])
+        self.schedules.mark_saved()
+        search.update(self.document)
+        occupancy.update(self.document)
+        self.assertEqual(len(search.find("数学")), 1)
+        self.assertEqual(len(occupancy.clashes()), 1)
+        day = weakref.ref(self.schedules["B"]["0"])
+
+        self.assertEqual(self.schedules.evict(["A"]), 1)
+        search.release_unloaded()
+        occupancy.release_unloaded()
+        gc.collect()
+        self.assertIsNone(day())
+        self.assertEqual(self.schedules.loaded_names(), ["A"])
+
+        # 已释放的课表仍然可以被搜索到、参与冲突检查
+        self.assertEqual(search.find("数学"), [("B", 0, 0)])
+        self.assertEqual(len(occupancy.clashes()), 1)
+        self.assertEqual(search.course(("B", 0, 0))["name"], "数学")
+
+    def test_reloaded_schedule_is_reindexed(self):
+        occupancy = OccupancyIndex()
+        occupancy.update(self.document)
+        self.assertEqual(len(occupancy.clashes()), 1)
+        self.schedules.evict(["A"])
+        occupancy.release_unloaded()
+        self.schedules["B"]["0"] = [course("09:00", "09:45", "数学", room="301")]
+        occupancy.update(self.document)
+        self.assertEqual(occupancy.clashes(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import support
+
+from persistence_service import PersistenceService
+
+
+class FlakyWrite:
+    """前几次调用失败的写入任务"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OSError("No space left on device")
+
+
+class PersistenceServiceTest(unittest.TestCase):
+    def setUp(self):
+        # 不使用全局单例，每个测试一个独立的服务
+        self.service = object.__new__(PersistenceService)
+        self.service._setup()
+        self.service.DEBOUNCE_SECONDS = 0.01
+        self.service.RETRY_SECONDS = 0.05
+        self.errors = []
+        self.service.set_error_handler(lambda key, error: self.errors.append((key, str(error))))
+
+    def tearDown(self):
+        self.service.shutdown(timeout=1)
+
+    def test_failed_write_is_reported_and_retried(self):
+        write = FlakyWrite(failures=1)
+        self.service.submit("schedule", write)
+        # flush不会在界面线程中反复重试，失败的任务由后台线程稍后重试
+        self.assertFalse(self.service.flush(timeout=2))
+        deadline = time.monotonic() + 2
+        while self.service.has_pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(write.calls, 2)
+        self.assertEqual(self.errors, [("schedule", "No space left on device")])
+        self.assertFalse(self.service.has_pending)
+
+    def test_flush_gives_up_on_persistent_failure(self):
+        write = FlakyWrite(failures=100)
+        self.service.submit("schedule", write)
+        self.assertFalse(self.service.flush(timeout=2))
+        self.assertTrue(self.service.has_pending)
+        # 同一个任务持续失败只通知一次
+        self.assertEqual(len(self.errors), 1)
+
+    def test_newer_submit_replaces_failed_job(self):
+        failing, replacement = FlakyWrite(failures=100), FlakyWrite(failures=0)
+        self.service.submit("schedule", failing)
+        self.assertFalse(self.service.flush(timeout=2))
+        self.service.submit("schedule", replacement)
+        self.assertTrue(self.service.flush(timeout=2))
+        self.assertEqual(replacement.calls, 1)
+        self.assertFalse(self.service.has_pending)
+
+    def test_submission_order_is_kept(self):
+        order = []
+        self.service.submit("a", lambda: order.append("a"))
+        self.service.submit("b", lambda: order.append("b"))
+        self.service.submit("a", lambda: order.append("a2"))
+        self.assertTrue(self.service.flush(timeout=2))
+        self.assertEqual(order, ["b", "a2"])
+
+
+class ExitWithoutShutdownTest(unittest.TestCase):
+    def test_pending_write_is_flushed_at_interpreter_exit(self):
+        # 命令行工具提交写入后直接退出，没有调用shutdown
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "config.json")
+            script = ("import sys; sys.path.insert(0, sys.argv[1])\n"
+                      "from persistence_service import atomic_write_text, persistence_service\n"
+                      "persistence_service.submit('config', lambda: atomic_write_text(sys.argv[2], 'saved'))\n")
+            subprocess.run([sys.executable, "-c", script, support.ROOT, path], cwd=tmp, check=True, timeout=30)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "saved")
+
+
+if __name__ == "__main__":
+    unittest.main()
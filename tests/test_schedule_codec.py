@@ -0,0 +1,64 @@
+import json
+import unittest
+
+from support import course
+
+from schedule_codec import is_packed, pack_document, unpack_document
+
+
+WEEK = {"0": [course("08:00", "08:45", "语文"), course("09:00", "09:45", "数学")],
+        "1": [course("08:00", "08:45", "数学")],
+        "2": [], "3": [course("08:00", "08:45", "语文")], "4": [], "5": [], "6": []}
+
+
+class CodecTest(unittest.TestCase):
+    def round_trip(self, document):
+        packed = pack_document(document)
+        # 紧凑格式本身必须能写入JSON
+        restored = unpack_document(json.loads(json.dumps(packed, ensure_ascii=False)))
+        self.assertEqual(restored, document)
+        return packed, restored
+
+    def test_round_trip_and_dedup(self):
+        document = {"current_schedule": "A", "schedules": {"A": WEEK, "B": dict(WEEK), "C": {"0": []}},
+                    "last_modified": "2024-09-01"}
+        packed, restored = self.round_trip(document)
+        self.assertTrue(is_packed(packed))
+        self.assertEqual(len(packed["periods"]), 2)
+        self.assertEqual(packed["names"], ["语文", "数学"])
+        # 复制的课表只保存对相同天的引用
+        self.assertEqual(packed["schedules"]["A"], packed["schedules"]["B"])
+        empty = packed["schedules"]["A"][2]
+        self.assertEqual(packed["schedules"]["C"], [empty, None, None, None, None, None, None])
+        # 解码后相同的天和课程共享对象
+        schedules = restored["schedules"]
+        self.assertIs(schedules["A"]["0"], schedules["B"]["0"])
+        self.assertIs(schedules["A"]["0"][0], schedules["A"]["3"][0])
+
+    def test_extra_fields(self):
+        document = {"schedules": {"A": {"0": [course("08:00", "08:45", "语文", room="301", teacher="张老师"),
+                                             course("08:00", "08:45", "语文")]}}}
+        packed, restored = self.round_trip(document)
+        self.assertEqual(packed["days"][0][0][2], {"room": "301", "teacher": "张老师"})
+        self.assertIsNot(restored["schedules"]["A"]["0"][0], restored["schedules"]["A"]["0"][1])
+
+    def test_irregular_schedules_are_kept_raw(self):
+        document = {"schedules": {
+            "extra_key": {"0": [], "notes": "x"},
+            "missing_field": {"0": [{"start_time": "08:00", "name": "语文"}]},
+            "not_a_list": {"0": "语文"},
+            "not_a_dict": ["语文"],
+        }}
+        packed, _ = self.round_trip(document)
+        self.assertTrue(all("raw" in schedule for schedule in packed["schedules"].values()))
+
+    def test_plain_documents_pass_through(self):
+        legacy = {"0": [course("08:00", "08:45", "语文")]}
+        self.assertIs(pack_document(legacy), legacy)
+        self.assertIs(unpack_document(legacy), legacy)
+        packed = pack_document({"schedules": {"A": WEEK}})
+        self.assertIs(pack_document(packed), packed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from support import course
+
+from schedule_conflicts import (KIND_END_BEFORE_START, KIND_INVALID_COURSE, KIND_INVALID_TIME, KIND_OVERLAP,
+                                KIND_SHORT_BREAK, analyze_day, analyze_document, conflicting_indices)
+from tools import conflict_analyzer
+
+
+class AnalyzeDayTest(unittest.TestCase):
+    def kinds(self, courses, min_break=0):
+        return [(conflict.kind, conflict.indices) for conflict in analyze_day(courses, min_break)]
+
+    def test_clean_day(self):
+        self.assertEqual(self.kinds([course("09:00", "09:45"), course("08:00", "08:45")], 10), [])
+
+    def test_overlap_with_longest_earlier_course(self):
+        # 第三门课与第一门（结束最晚）重叠，而不是与相邻的第二门
+        courses = [course("08:00", "10:00"), course("08:10", "08:30"), course("09:00", "09:30")]
+        self.assertEqual(self.kinds(courses), [(KIND_OVERLAP, (0, 1)), (KIND_OVERLAP, (0, 2))])
+
+    def test_short_break(self):
+        self.assertEqual(self.kinds([course("08:00", "08:45"), course("08:50", "09:35")], 10),
+                         [(KIND_SHORT_BREAK, (0, 1))])
+
+    def test_invalid_entries(self):
+        courses = [course("25:00", "08:45"), course("09:00", "08:00"), "oops", None, course("10:00", "10:45")]
+        self.assertEqual(self.kinds(courses), [(KIND_INVALID_TIME, (0,)), (KIND_END_BEFORE_START, (1,)),
+                                               (KIND_INVALID_COURSE, (2,)), (KIND_INVALID_COURSE, (3,))])
+
+    def test_conflicting_indices(self):
+        courses = [course("08:00", "08:45"), course("08:30", "09:00"), course("09:05", "09:50")]
+        self.assertEqual(conflicting_indices(analyze_day(courses, 10)), ({0, 1}, {2}))
+
+
+class AnalyzeDocumentTest(unittest.TestCase):
+    def test_malformed_document(self):
+        document = {"schedules": {"A": {"0": [course("08:00", "08:45"), "oops"], "1": "语文"}, "B": []}}
+        report = analyze_document(document)
+        self.assertTrue(report.has_errors)
+        self.assertEqual([(c.schedule, c.weekday, c.kind) for c in report.conflicts],
+                         [("A", 0, KIND_INVALID_COURSE), ("A", 1, KIND_INVALID_COURSE), ("B", -1, KIND_INVALID_COURSE)])
+        self.assertEqual(len(analyze_document(document, schedule_names=["B"]).conflicts), 1)
+
+    def test_cli_reports_bad_files_and_continues(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "a.json"), "w", encoding="utf-8") as f:
+                json.dump({"schedules": {"A": {"0": ["oops"]}}}, f)
+            with open(os.path.join(tmp, "b.json"), "w", encoding="utf-8") as f:
+                f.write("{")
+            stdout, stderr = io.StringIO(), io.StringIO()
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                code = conflict_analyzer.main([tmp])
+        self.assertEqual(code, 1)
+        self.assertIn("格式不正确", stdout.getvalue())
+        self.assertIn("b.json", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+
+from support import course, document
+
+from schedule_journal import OP_COPY_SCHEDULE, ScheduleJournal, diff_documents, replay
+from schedule_codec import unpack_document
+from schedule_store import JOURNAL_POSITION_KEY, JsonScheduleStore
+
+
+X = [course("08:00", "08:45", "语文")]
+Y = [course("09:00", "09:45", "数学")]
+
+
+class DiffReplayTest(unittest.TestCase):
+    def assertRoundTrip(self, old, new):
+        ops = diff_documents(old, new)
+        self.assertEqual(replay(copy.deepcopy(old), ops), new)
+        return ops
+
+    def test_day_edits(self):
+        old = document(A=X + Y)
+        self.assertRoundTrip(old, document(A=Y + X))
+        self.assertRoundTrip(old, document(A=[course("08:00", "08:45", "英语")] + Y))
+        self.assertRoundTrip(old, document(A=Y))
+        self.assertRoundTrip(old, document(A=X + Y + X))
+
+    def test_rename_and_delete(self):
+        ops = self.assertRoundTrip(document(A=X, B=Y), document(C=X))
+        self.assertEqual([op["op"] for op in ops], ["rename_schedule", "delete_schedule"])
+
+    def test_copy_of_unchanged_schedule(self):
+        ops = self.assertRoundTrip(document(A=X), document(A=X, B=X))
+        self.assertEqual(ops[0]["op"], OP_COPY_SCHEDULE)
+
+    def test_copy_of_schedule_changed_in_same_save(self):
+        # 原课表本次也被修改时不能用复制操作（复制会在修改之前应用）
+        ops = self.assertRoundTrip(document(A=X), document(A=Y, B=Y))
+        self.assertNotIn(OP_COPY_SCHEDULE, [op["op"] for op in ops])
+
+
+class JournalStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "schedule.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reload_replays_saves(self):
+        store = JsonScheduleStore(self.path)
+        store.save_all(document(A=X))
+        store.save_all(document(A=Y, B=Y))
+        store.save_all(document(A=Y + X, B=Y, C=Y + X))
+        self.assertEqual(JsonScheduleStore(self.path).load(), document(A=Y + X, B=Y, C=Y + X))
+
+    def test_compaction_keeps_content(self):
+        store = JsonScheduleStore(self.path)
+        store.save_all(document(A=X))
+        store.journal.COMPACT_AFTER = 1
+        store.save_all(document(A=Y, B=Y))
+        self.assertEqual(store.journal.entry_count, 0)
+        with open(self.path, encoding="utf-8") as f:
+            self.assertIn("packed", json.load(f))
+        self.assertEqual(JsonScheduleStore(self.path).load(), document(A=Y, B=Y))
+
+    def read_main_file(self):
+        with open(self.path, encoding="utf-8") as f:
+            raw = json.load(f)
+        return raw.pop(JOURNAL_POSITION_KEY, None), unpack_document(raw)
+
+    def test_sync_main_file(self):
+        store = JsonScheduleStore(self.path)
+        store.save_all(document(A=X))
+        store.save_all(document(A=Y))
+        store.sync_main_file()
+        position, data = self.read_main_file()
+        self.assertEqual(data, document(A=Y))
+        self.assertEqual(position["entries"], store.journal.entry_count)
+        self.assertEqual(JsonScheduleStore(self.path).load(), document(A=Y))
+
+    def test_sync_keeps_journal_segment(self):
+        store = JsonScheduleStore(self.path)
+        store.save_all(document(A=X))
+        for day in (Y, X + Y, Y + X):
+            store.save_all(document(A=day))
+            store.sync_main_file()
+        # 空闲同步不开始新的日志段，也不归档历史日志段
+        self.assertGreater(store.journal.entry_count, 0)
+        self.assertFalse(os.path.exists(store.journal.path + ".1"))
+        self.assertEqual(store.journal.read().checkpoint, document(A=X))
+        # 同步之后的保存在重新读取时只重放未写入主文件的部分
+        store.save_all(document(A=Y, B=X))
+        reloaded = JsonScheduleStore(self.path)
+        self.assertEqual(reloaded.load(), document(A=Y, B=X))
+        reloaded.save_all(document(A=X))
+        self.assertEqual(JsonScheduleStore(self.path).load(), document(A=X))
+
+    def test_external_edit_after_sync_discards_journal(self):
+        store = JsonScheduleStore(self.path)
+        store.save_all(document(A=X))
+        store.save_all(document(A=Y))
+        store.sync_main_file()
+        store.save_all(document(A=X + Y))
+        position, _ = self.read_main_file()
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(dict(document(B=Y), journal_position=position), f)
+        self.assertEqual(JsonScheduleStore(self.path).load(), document(B=Y))
+
+    def test_torn_batch_is_ignored(self):
+        store = JsonScheduleStore(self.path)
+        store.save_all(document(A=X))
+        store.save_all(document(A=X + Y))
+        store.save_all(document(A=Y, B=X))
+        # 模拟最后一次保存写到一半时崩溃
+        with open(store.journal.path, "rb+") as f:
+            f.seek(-10, os.SEEK_END)
+            f.truncate()
+        self.assertEqual(JsonScheduleStore(self.path).load(), document(A=X + Y))
+
+    def test_legacy_per_op_lines(self):
+        store = JsonScheduleStore(self.path)
+        store.save_all(document(A=X))
+        with open(store.journal.path, "a", encoding="utf-8") as f:
+            for op in diff_documents(document(A=X), document(A=Y)):
+                f.write(json.dumps(dict(op, ts=0)) + "\n")
+        self.assertEqual(JsonScheduleStore(self.path).load(), document(A=Y))
+
+    def test_checkpoint_starts_segment(self):
+        store = JsonScheduleStore(self.path)
+        store.save_all(document(A=X))
+        journal = ScheduleJournal(store.journal.path)
+        segment = journal.read()
+        self.assertEqual(segment.checkpoint, document(A=X))
+
+
+if __name__ == "__main__":
+    unittest.main()
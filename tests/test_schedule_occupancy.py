@@ -0,0 +1,69 @@
+import unittest
+
+from support import course, document
+
+from schedule_codec import pack_document, unpack_document
+from schedule_occupancy import OccupancyIndex, RESOURCE_ROOM, RESOURCE_TEACHER
+
+
+def pairs(clashes):
+    return [(clash.kind, clash.resource, clash.first.schedule, clash.second.schedule) for clash in clashes]
+
+
+class OccupancyIndexTest(unittest.TestCase):
+    def test_sweep_finds_all_overlaps(self):
+        index = OccupancyIndex()
+        index.update(document(
+            A=[course("08:00", "10:00", "语文", room="301")],
+            B=[course("08:10", "08:40", "数学", room="301"), course("08:40", "09:00", "英语", room="301")],
+            C=[course("10:00", "10:45", "物理", room="301")],  # 与A首尾相接，不算冲突
+        ))
+        self.assertEqual(pairs(index.clashes()), [(RESOURCE_ROOM, "301", "A", "B"), (RESOURCE_ROOM, "301", "A", "B")])
+        self.assertEqual(len(index.clashes_for("C")), 0)
+        self.assertEqual([booking.schedule for booking in index.timeline(RESOURCE_ROOM, "301", 0)],
+                         ["A", "B", "B", "C"])
+
+    def test_alternatives_do_not_clash(self):
+        index = OccupancyIndex()
+        doc = document(A=[course("08:00", "08:45", "语文", teacher="张老师")],
+                       B=[course("08:00", "08:45", "数学", teacher="张老师")])
+        index.update(doc, alternatives=["A", "B"])
+        self.assertEqual(index.clashes(), [])
+        # 轮换配置变化后重新检查
+        index.update(doc)
+        self.assertEqual(pairs(index.clashes()), [(RESOURCE_TEACHER, "张老师", "A", "B")])
+        # 不同来源的文档总是可能同时使用
+        other = OccupancyIndex()
+        other.update(doc, source="a.json", alternatives=["A", "B"])
+        other.update(document(C=[course("08:30", "09:00", "英语", teacher="张老师")]), source="b.json")
+        self.assertEqual(len(other.clashes_for("C", 0, source="b.json")), 2)
+
+    def test_incremental_update(self):
+        index = OccupancyIndex()
+        doc = document(A=[course("08:00", "08:45", "语文", room="301")], B=[])
+        index.update(doc)
+        self.assertEqual(index.clashes(), [])
+        # 写时复制：整体替换某一天的列表
+        doc["schedules"]["B"] = {"0": [course("08:30", "09:15", "数学", room="301")]}
+        index.update(doc)
+        self.assertEqual(pairs(index.clashes()), [(RESOURCE_ROOM, "301", "A", "B")])
+        del doc["schedules"]["A"]
+        index.update(doc)
+        self.assertEqual(index.clashes(), [])
+        self.assertEqual(index.resources(RESOURCE_ROOM), ["301"])
+        index.remove("")
+        self.assertEqual(index.resources(RESOURCE_ROOM), [])
+
+    def test_fields_survive_codec(self):
+        doc = document(A=[course("08:00", "08:45", "语文", room="301", teacher="张老师")],
+                       B=[course("08:00", "08:45", "数学", room="301")])
+        restored = unpack_document(pack_document(doc))
+        self.assertEqual(restored, doc)
+        index = OccupancyIndex()
+        index.update(restored)
+        self.assertEqual(pairs(index.clashes()), [(RESOURCE_ROOM, "301", "A", "B")])
+        self.assertEqual(list(index.occupancy(RESOURCE_TEACHER, "张老师")), [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
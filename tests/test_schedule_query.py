@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import support  # noqa: F401  项目根目录加入sys.path
+
+from holiday_calendar import DayOverride, HolidayCalendar
+from rotation_calendar import RotationCalendar
+from schedule_query import query_for_document, resolve_schedule_name
+from tools.ics_exporter import export_term
+
+MONDAY = date(2026, 9, 7)
+
+
+def config(enabled=True):
+    return SimpleNamespace(schedule_rotation_enabled=enabled, rotation_schedule1="单周", rotation_schedule2="双周",
+                           rotation_extra_schedules=[], rotation_start_date=datetime(2026, 9, 7))
+
+
+def document():
+    return {"current_schedule": "单周", "schedules": {
+        "单周": {"0": [{"start_time": "08:00", "end_time": "08:45", "name": "语文"}]},
+        "双周": {"0": [{"start_time": "08:00", "end_time": "08:45", "name": "数学"}]},
+    }}
+
+
+class QueryForDocumentTest(unittest.TestCase):
+    def rotation(self, doc, enabled=True):
+        calendar = RotationCalendar(config(enabled))
+        calendar.rebuild(list(doc["schedules"]), MONDAY)
+        return calendar
+
+    def test_rotation_and_fallback(self):
+        doc = document()
+        rotation = self.rotation(doc)
+        self.assertEqual(resolve_schedule_name(doc, rotation, MONDAY), "单周")
+        self.assertEqual(resolve_schedule_name(doc, rotation, date(2026, 9, 14)), "双周")
+        self.assertEqual(resolve_schedule_name(doc, self.rotation(doc, enabled=False), date(2026, 9, 14)), "单周")
+
+    def test_query_and_export(self):
+        doc = document()
+        holidays = HolidayCalendar(path=os.devnull)
+        holidays.replace_all([DayOverride(date(2026, 9, 21), no_classes=True)])
+        query = query_for_document(doc, self.rotation(doc), holidays)
+        names = [plan.courses[0].name if plan.courses else None
+                 for plan in (query.day_plan(date(2026, 9, day)) for day in (7, 14, 21, 28))]
+        self.assertEqual(names, ["语文", "数学", None, "数学"])
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(export_term(os.path.join(tmp, "term.ics"), MONDAY, 4, query), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from support import course
+
+from schedule_search import ScheduleSearchIndex, rename_course_at
+
+
+def make_document():
+    return {"current_schedule": "A", "schedules": {
+        "A": {"0": [course("08:00", "08:45", "语文"), course("09:00", "09:45", "数学")], "1": [course("08:00", "08:45", "数学")]},
+        "B": {"0": [course("08:00", "08:45", "语文"), "oops"]},
+    }}
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.document = make_document()
+        self.index = ScheduleSearchIndex()
+        self.index.update(self.document)
+
+    def test_queries(self):
+        self.assertEqual(self.index.names(), ["数学", "语文"])
+        self.assertEqual(self.index.find("语文"), [("A", 0, 0), ("B", 0, 0)])
+        self.assertEqual(self.index.search("数"), [("A", 0, 1), ("A", 1, 0)])
+        self.assertEqual(self.index.at(8 * 60 + 30, weekday=0), [("A", 0, 0), ("B", 0, 0)])
+        self.assertEqual(self.index.at(9 * 60 + 50), [])
+        self.assertEqual(self.index.course(("A", 1, 0))["name"], "数学")
+        self.assertIsNone(self.index.course(("A", 1, 5)))
+
+    def test_incremental_sync(self):
+        self.index.names()
+        schedules = self.document["schedules"]
+        schedules["A"]["1"] = [course("10:00", "10:45", "英语")]
+        del schedules["B"]
+        schedules["C"] = {"3": [course("08:00", "08:45", "语文")]}
+        self.index.update(self.document)
+        self.assertEqual(self.index.find("数学"), [("A", 0, 1)])
+        self.assertEqual(self.index.find("语文"), [("A", 0, 0), ("C", 3, 0)])
+        self.assertEqual(self.index.find("英语"), [("A", 1, 0)])
+
+    def test_rename_is_copy_on_write(self):
+        old_day = self.document["schedules"]["A"]["0"]
+        old_course = old_day[0]
+        changed = rename_course_at(self.document, self.index.find("语文"), "语文", "国文")
+        self.assertEqual(changed, ["A", "B"])
+        self.assertIsNot(self.document["schedules"]["A"]["0"], old_day)
+        self.assertEqual(old_course["name"], "语文")
+        self.assertEqual(self.document["schedules"]["B"]["0"][1], "oops")
+        self.index.update(self.document)
+        self.assertEqual(self.index.find("语文"), [])
+        self.assertEqual(self.index.find("国文"), [("A", 0, 0), ("B", 0, 0)])
+
+    def test_rename_skips_stale_locations(self):
+        locations = self.index.find("数学")
+        self.document["schedules"]["A"]["1"] = [course("08:00", "08:45", "英语")]
+        self.assertEqual(rename_course_at(self.document, locations, "数学", "算术"), ["A"])
+        self.assertEqual(self.document["schedules"]["A"]["1"][0]["name"], "英语")
+        # 合并到已有的课程名称
+        self.assertEqual(rename_course_at(self.document, [("A", 0, 1)], None, "语文"), ["A"])
+        self.index.update(self.document)
+        self.assertEqual(self.index.find("语文"), [("A", 0, 0), ("A", 0, 1), ("B", 0, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
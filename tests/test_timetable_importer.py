@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+import support  # noqa: F401  项目根目录加入sys.path
+
+from schedule_store import JsonScheduleStore
+from tools.timetable_importer import read_csv, read_ics, read_timetable
+
+
+class ImporterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text, encoding="utf-8"):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding=encoding, newline="") as f:
+            f.write(text)
+        return path
+
+
+class CsvTest(ImporterTestCase):
+    def test_long_format(self):
+        path = self.write("long.csv", "课表,星期,开始时间,结束时间,课程\n"
+                                      "高一1班,星期一,8:00,8:45,语文\n"
+                                      "高一1班,周一,07:00,07:40,早读\n"
+                                      "高一2班,2,09:00,,数学\n")
+        result = read_csv(path, "default", default_duration=40)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.row_count, 3)
+        self.assertEqual([course["name"] for course in result.schedules["高一1班"]["0"]], ["早读", "语文"])
+        self.assertEqual(result.schedules["高一2班"]["1"],
+                         [{"start_time": "09:00", "end_time": "09:40", "name": "数学"}])
+
+    def test_wide_format_gbk(self):
+        path = self.write("wide.csv", "开始时间,结束时间,星期一,星期二\n08:00,08:45,语文,\n09:00,09:45,数学,英语\n",
+                          encoding="gbk")
+        result = read_csv(path, "默认")
+        self.assertEqual(result.errors, [])
+        self.assertEqual([course["name"] for course in result.schedules["默认"]["0"]], ["语文", "数学"])
+        self.assertEqual([course["name"] for course in result.schedules["默认"]["1"]], ["英语"])
+
+    def test_row_errors(self):
+        path = self.write("bad.csv", "星期,开始时间,结束时间,课程\n星期八,08:00,08:45,语文\n"
+                                     "星期一,25:00,08:45,数学\n星期一,09:00,08:00,英语\n星期一,08:00,08:45,\n")
+        result = read_csv(path, "default")
+        self.assertEqual([error.line for error in result.errors], [2, 3, 4, 5])
+        self.assertEqual(result.schedules, {})
+
+    def test_missing_columns(self):
+        result = read_csv(self.write("header.csv", "课程,结束时间\n语文,08:45\n"), "default")
+        self.assertEqual([error.line for error in result.errors], [1])
+
+    def test_xlsx_is_rejected(self):
+        with self.assertRaises(ValueError):
+            read_timetable(self.write("table.xlsx", ""), "default")
+
+
+class IcsTest(ImporterTestCase):
+    def test_weekly_events(self):
+        path = self.write("cal.ics", "BEGIN:VCALENDAR\r\nX-WR-CALNAME:高一1班\r\n"
+                                     "BEGIN:VEVENT\r\nSUMMARY:语\r\n 文\r\nDTSTART:20240902T080000\r\n"
+                                     "DTEND:20240902T084500\r\nRRULE:FREQ=WEEKLY;BYDAY=MO,WE\r\nEND:VEVENT\r\n"
+                                     "BEGIN:VEVENT\r\nSUMMARY:数学\r\nDTSTART:20240903T090000\r\n"
+                                     "DURATION:PT45M\r\nEND:VEVENT\r\n"
+                                     "BEGIN:VEVENT\r\nSUMMARY:数学\r\nDTSTART:20240910T090000\r\n"
+                                     "DURATION:PT45M\r\nEND:VEVENT\r\n"
+                                     "BEGIN:VEVENT\r\nSUMMARY:运动会\r\nDTSTART;VALUE=DATE:20240904\r\nEND:VEVENT\r\n"
+                                     "END:VCALENDAR\r\n")
+        result = read_ics(path, "default")
+        days = result.schedules["高一1班"]
+        self.assertEqual(days["0"], [{"start_time": "08:00", "end_time": "08:45", "name": "语文"}])
+        self.assertEqual(days["2"], days["0"])
+        self.assertEqual(days["1"], [{"start_time": "09:00", "end_time": "09:45", "name": "数学"}])
+        self.assertEqual(len(result.errors), 1)
+
+
+class ImportCommitTest(ImporterTestCase):
+    """与CourseScheduler.import_schedules相同：更新课表文档后只保存导入的课表"""
+
+    def import_into(self, store, document, path):
+        schedules = read_csv(path, "default").schedules
+        document["schedules"].update(schedules)
+        store.save_schedules(document, list(schedules))
+
+    def test_import_twice_and_reload(self):
+        path = os.path.join(self.tmp.name, "schedule.json")
+        store = JsonScheduleStore(path)
+        document = {"current_schedule": "default", "schedules": {"default": {str(day): [] for day in range(7)}}}
+        store.save_all(document)
+
+        header = "课表,星期,开始时间,结束时间,课程\n"
+        self.import_into(store, document, self.write("first.csv", header + "1班,星期一,08:00,08:45,语文\n"))
+        # 更新1班，同时新增与1班新内容完全相同的2班
+        self.import_into(store, document, self.write("second.csv", header + "1班,星期一,09:00,09:45,数学\n"
+                                                                            "2班,星期一,09:00,09:45,数学\n"))
+        reloaded = JsonScheduleStore(path).load()
+        self.assertEqual(reloaded, document)
+        self.assertEqual(reloaded["schedules"]["2班"]["0"][0]["name"], "数学")
+
+
+if __name__ == "__main__":
+    unittest.main()
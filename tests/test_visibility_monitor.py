@@ -0,0 +1,69 @@
+import unittest
+from types import SimpleNamespace
+
+import support  # noqa: F401  项目根目录加入sys.path
+
+from visibility_monitor import VisibilityMonitor
+
+
+class FakeRoot:
+    """记录绑定的事件处理函数，窗口状态由测试设置"""
+
+    def __init__(self):
+        self.handlers = {}
+        self.window_state = "normal"
+        self.viewable = True
+
+    def bind(self, sequence, handler, add=None):
+        self.handlers[sequence] = handler
+
+    def state(self):
+        return self.window_state
+
+    def winfo_viewable(self):
+        return self.viewable
+
+    def fire(self, sequence, **fields):
+        self.handlers[sequence](SimpleNamespace(widget=self, **fields))
+
+
+class VisibilityMonitorTest(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.changes = []
+        self.monitor = VisibilityMonitor(self.root, lambda visible, restored: self.changes.append((visible, restored)))
+
+    def minimize(self):
+        self.root.window_state, self.root.viewable = "iconic", False
+
+    def restore(self):
+        self.root.window_state, self.root.viewable = "normal", True
+
+    def test_minimize_and_restore(self):
+        self.minimize()
+        self.root.fire("<Unmap>")
+        self.restore()
+        self.root.fire("<Map>")
+        self.assertEqual(self.changes, [(False, False), (True, True)])
+
+    def test_events_are_checked_against_window_state(self):
+        # 事件与窗口的实际状态不一致时（事件顺序、次数不可靠）以实际状态为准
+        self.root.fire("<Unmap>")
+        self.assertEqual(self.changes, [])
+        self.minimize()
+        self.root.fire("<Map>")
+        self.root.fire("<Unmap>")
+        self.assertEqual(self.changes, [(False, False)])
+        self.restore()
+        self.root.fire("<Unmap>")
+        self.assertEqual(self.changes, [(False, False), (True, True)])
+
+    def test_fully_obscured(self):
+        self.root.fire("<Visibility>", state="VisibilityFullyObscured")
+        self.root.fire("<Visibility>", state="VisibilityPartiallyObscured")
+        self.assertEqual(self.changes, [(False, False), (True, False)])
+        self.assertTrue(self.monitor.visible)
+
+
+if __name__ == "__main__":
+    unittest.main()
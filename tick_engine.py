@@ -0,0 +1,143 @@
+import tkinter as tk
+from datetime import datetime
+from typing import Callable, Optional, Set
+from logger import logger
+
+
+class TimerRegistry:
+    """
+    Tk定时器登记表。
+    通过它创建的 after 定时器在触发或取消后会自动移除，
+    因此登记表中只保留仍然有效的定时器句柄，长时间运行也不会增长。
+    """
+
+    def __init__(self, widget: tk.Misc):
+        """
+        Args:
+            widget: 用于调度定时器的Tk控件（通常是主窗口）
+        """
+        self.widget = widget
+        self._timer_ids: Set[str] = set()
+
+    def after(self, delay_ms: int, func: Callable, *args) -> str:
+        """安排一个定时器，返回其句柄"""
+        timer_id = None
+
+        def _run():
+            self._timer_ids.discard(timer_id)
+            func(*args)
+
+        timer_id = self.widget.after(max(0, int(delay_ms)), _run)
+        self._timer_ids.add(timer_id)
+        return timer_id
+
+    def cancel(self, timer_id: Optional[str]) -> None:
+        """取消一个定时器，已触发或不存在的句柄会被忽略"""
+        if not timer_id:
+            return
+        self._timer_ids.discard(timer_id)
+        try:
+            self.widget.after_cancel(timer_id)
+        except tk.TclError:
+            pass  # 窗口已销毁
+
+    def cancel_all(self) -> None:
+        """取消所有仍然有效的定时器"""
+        for timer_id in list(self._timer_ids):
+            self.cancel(timer_id)
+
+    def __len__(self) -> int:
+        return len(self._timer_ids)
+
+
+class TickEngine:
+    """
+    与系统时钟整秒对齐的界面节拍器。
+    每次唤醒后根据当前时间计算到下一个整秒的延迟，而不是固定间隔1000ms，
+    因此不会随着时间累积漂移，显示的秒数也不会跳变。
+    当两次节拍之间的实际间隔明显超过预期（系统休眠/恢复、时钟被调整）时，
+    本次节拍会被标记为“跳变”，由回调方一次性追赶状态，而不是补发错过的节拍。
+    窗口不可见时可切换到空闲模式，节拍降为每分钟一次；恢复时立即执行一次追赶节拍。
+    """
+
+    # 在整秒之后额外延迟的毫秒数，避免定时器略早触发时仍停留在上一秒
+    ALIGN_OFFSET_MS = 5
+    # 两次节拍间隔超过该秒数（或时间倒退）即视为时钟跳变
+    JUMP_THRESHOLD_SECONDS = 3.0
+    # 空闲模式下的节拍间隔（秒），节拍对齐到整分钟
+    IDLE_INTERVAL_SECONDS = 60
+
+    def __init__(self, timers: TimerRegistry, on_tick: Callable[[datetime, bool], None]):
+        """
+        Args:
+            timers: 定时器登记表
+            on_tick: 节拍回调，参数为 (当前时间, 是否发生了时钟跳变)
+        """
+        self.timers = timers
+        self.on_tick = on_tick
+        self._after_id: Optional[str] = None
+        self._last_tick: Optional[datetime] = None
+        self._idle = False
+        self._catch_up = False
+
+    @property
+    def running(self) -> bool:
+        return self._after_id is not None
+
+    @property
+    def idle(self) -> bool:
+        return self._idle
+
+    def set_idle(self, idle: bool) -> None:
+        """
+        切换空闲模式。
+        进入空闲模式时下一次节拍推迟到下一个整分钟；
+        退出空闲模式时立即执行一次节拍，并标记为跳变让回调方一次性追赶状态。
+        """
+        if idle == self._idle:
+            return
+        self._idle = idle
+        if not self.running:
+            return
+        self.stop()
+        if idle:
+            self._schedule_next()
+        else:
+            self._catch_up = True
+            self._tick()
+
+    def start(self) -> None:
+        """立即执行一次节拍并开始对齐整秒的调度"""
+        self.stop()
+        self._last_tick = None
+        self._tick()
+
+    def stop(self) -> None:
+        """停止调度"""
+        self.timers.cancel(self._after_id)
+        self._after_id = None
+
+    def _tick(self) -> None:
+        self._after_id = None
+        now = datetime.now()
+        jumped = self._catch_up
+        self._catch_up = False
+        if self._last_tick is not None and not jumped:
+            elapsed = (now - self._last_tick).total_seconds()
+            threshold = self.JUMP_THRESHOLD_SECONDS + (self.IDLE_INTERVAL_SECONDS if self._idle else 0)
+            jumped = elapsed < 0 or elapsed > threshold
+            if jumped:
+                logger.log_info(f"检测到时钟跳变 ({elapsed:.1f}s)，将一次性追赶界面状态")
+        self._last_tick = now
+        try:
+            self.on_tick(now, jumped)
+        finally:
+            self._schedule_next()
+
+    def _schedule_next(self) -> None:
+        """安排下一次节拍在下一个整秒（空闲模式下为下一个整分钟）之后触发"""
+        now = datetime.now()
+        delay_ms = 1000 - now.microsecond // 1000 + self.ALIGN_OFFSET_MS
+        if self._idle:
+            delay_ms += (self.IDLE_INTERVAL_SECONDS - 1 - now.second % self.IDLE_INTERVAL_SECONDS) * 1000
+        self._after_id = self.timers.after(delay_ms, self._tick)
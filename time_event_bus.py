@@ -0,0 +1,175 @@
+import heapq
+import itertools
+from datetime import date, datetime, timedelta, time
+from typing import Callable, Dict, List, Optional
+from logger import logger
+from schedule_index import DayIndex, ScheduleIndex
+
+# 事件类型
+EVENT_DAY_CHANGE = "day_change"              # 跨天，payload为新的日期
+EVENT_COURSE_START = "course_start"          # 课程开始，payload为CourseInterval
+EVENT_COURSE_END = "course_end"              # 课程结束，payload为CourseInterval
+EVENT_COURSES_FINISHED = "courses_finished"  # 第N节课结束，payload为已结束的课程数N
+
+# 同一时刻发生的事件按此顺序触发：先跨天，再下课，最后上课
+_EVENT_PRIORITY = {
+    EVENT_DAY_CHANGE: 0,
+    EVENT_COURSE_END: 1,
+    EVENT_COURSES_FINISHED: 2,
+    EVENT_COURSE_START: 3,
+}
+
+# 课程在结束时间之后的第一个瞬间才算结束（与DayIndex.status一致）
+_END_OFFSET = timedelta(microseconds=1)
+
+
+class TimeEvent:
+    """一个计划在某一时刻发生的时间事件"""
+    __slots__ = ("when", "kind", "payload")
+
+    def __init__(self, when: datetime, kind: str, payload=None):
+        self.when = when
+        self.kind = kind
+        self.payload = payload
+
+    def __repr__(self) -> str:
+        return f"TimeEvent({self.when:%Y-%m-%d %H:%M:%S}, {self.kind}, {self.payload!r})"
+
+
+class TimeEventBus:
+    """
+    基于小顶堆的时间事件总线。
+    根据当天课表预先计算上课、下课、第N节课结束和跨天等事件，订阅者注册回调后，
+    每个事件在到期后恰好触发一次。每次节拍只需查看堆顶（O(1)），事件的入堆出堆为O(log n)，
+    各功能不必再逐秒轮询；节拍跳过某一秒或系统休眠恢复时，错过的事件会按时间顺序一次性补发。
+    前一天未触发的课程事件在跨天后视为过期，直接丢弃。
+    """
+
+    def __init__(self, schedule_index: ScheduleIndex,
+                 day_index_for: Optional[Callable[[date], Optional[DayIndex]]] = None):
+        """
+        Args:
+            schedule_index: 课表区间索引
+            day_index_for: 返回某一天实际使用的课程索引（考虑调休与放假），停课时返回None；
+                为None时使用当前课表中对应星期的课程
+        """
+        self.schedule_index = schedule_index
+        self.day_index_for = day_index_for
+        self._subscribers: Dict[str, List[Callable[[TimeEvent, datetime], None]]] = {}
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+        self._schedule_name: Optional[str] = None
+        self._day: Optional[date] = None
+        self._last_dispatch: Optional[datetime] = None
+
+    def subscribe(self, kind: str, callback: Callable[[TimeEvent, datetime], None]) -> None:
+        """注册事件回调，回调参数为 (事件, 当前时间)"""
+        self._subscribers.setdefault(kind, []).append(callback)
+
+    def unsubscribe(self, kind: str, callback: Callable[[TimeEvent, datetime], None]) -> None:
+        """取消注册事件回调"""
+        callbacks = self._subscribers.get(kind, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    @property
+    def next_event_time(self) -> Optional[datetime]:
+        """下一个事件的时间"""
+        return self._heap[0][0] if self._heap else None
+
+    @property
+    def pending_events(self) -> List[TimeEvent]:
+        """按时间顺序排列的待触发事件"""
+        return [entry[-1] for entry in sorted(self._heap)]
+
+    def rebuild(self, now: datetime, schedule_name: str) -> None:
+        """
+        课表或当前课表名称变化后重建事件。
+        上一次分发之后、当前时间之前的事件仍会在下一次分发时补发。
+        """
+        self._schedule_name = schedule_name
+        since = self._last_dispatch
+        if since is None or since > now:
+            since = now
+        # 事件还停留在前一天时，跨天事件尚未触发，需要保留
+        include_day_start = self._day is not None and self._day < now.date()
+        self._build(now.date(), since, include_day_start)
+
+    def dispatch(self, now: datetime) -> int:
+        """
+        触发所有到期的事件，返回触发的事件数。
+        应在每次节拍时调用；没有到期事件时只比较一次堆顶。
+        """
+        if self._day is None:
+            return 0
+        if self._last_dispatch is not None and now < self._last_dispatch:
+            # 时钟被调回，按当前时间重新计算，不补发任何事件
+            logger.log_info("检测到时钟回退，重新计算时间事件")
+            self._last_dispatch = None
+            self._day = None
+            self.rebuild(now, self._schedule_name)
+
+        fired = 0
+        dropped = 0
+        while self._heap and self._heap[0][0] <= now:
+            event = heapq.heappop(self._heap)[-1]
+            if event.kind == EVENT_DAY_CHANGE:
+                # 直接切换到当前日期；休眠跨越多天时只触发一次跨天事件
+                today = now.date()
+                day_start = datetime.combine(today, time.min)
+                self._build(today, day_start - _END_OFFSET, include_day_start=False)
+                event.payload = today
+            elif event.when.date() < now.date():
+                dropped += 1
+                continue
+            self._fire(event, now)
+            fired += 1
+
+        if dropped:
+            logger.log_debug(f"丢弃了 {dropped} 个前一天未触发的时间事件")
+        self._last_dispatch = now
+        return fired
+
+    def _fire(self, event: TimeEvent, now: datetime) -> None:
+        for callback in list(self._subscribers.get(event.kind, [])):
+            try:
+                callback(event, now)
+            except Exception as e:
+                logger.log_error(f"处理时间事件 {event.kind} 时出错: {e}")
+
+    def _build(self, day: date, since: datetime, include_day_start: bool) -> None:
+        """计算某一天在since之后的所有事件"""
+        self._day = day
+        self._heap = []
+        day_start = datetime.combine(day, time.min)
+
+        if include_day_start:
+            self._push(TimeEvent(day_start, EVENT_DAY_CHANGE, day))
+        self._push(TimeEvent(day_start + timedelta(days=1), EVENT_DAY_CHANGE, day + timedelta(days=1)))
+
+        if self.day_index_for is not None:
+            day_index = self.day_index_for(day)
+        elif self._schedule_name is not None:
+            day_index = self.schedule_index.day(self._schedule_name, day.weekday())
+        else:
+            day_index = None
+        if day_index is None:
+            return
+        for interval in day_index.intervals:
+            if interval is None:
+                continue
+            start = day_start + timedelta(minutes=interval.start)
+            end = day_start + timedelta(minutes=interval.end) + _END_OFFSET
+            if start > since:
+                self._push(TimeEvent(start, EVENT_COURSE_START, interval))
+            if end > since:
+                self._push(TimeEvent(end, EVENT_COURSE_END, interval))
+
+        ends = sorted(interval.end for interval in day_index.intervals if interval is not None)
+        for count, end_minute in enumerate(ends, start=1):
+            end = day_start + timedelta(minutes=end_minute) + _END_OFFSET
+            if end > since:
+                self._push(TimeEvent(end, EVENT_COURSES_FINISHED, count))
+
+    def _push(self, event: TimeEvent) -> None:
+        heapq.heappush(self._heap, (event.when, _EVENT_PRIORITY[event.kind], next(self._sequence), event))
@@ -7,12 +7,18 @@ import time
 import os
 import mimetypes
 import json
+from datetime import date
 from PIL import Image, ImageTk
 from tkwebview import TkWebview
 import markdown
 from mdx_math import MathExtension
 
 from tools import prompts
+from schedule_model import COURSE_FIELDS, COURSE_ROOM, COURSE_TEACHER, ScheduleValidationError, parse_course
+from schedule_conflicts import ConflictReport, analyze_schedule
+
+# AI识别结果中课程字典允许的键
+AI_COURSE_KEYS = set(COURSE_FIELDS) | {COURSE_ROOM, COURSE_TEACHER}
 
 
 class AIAssistantWindow:
@@ -670,7 +676,9 @@ class AIAssistantWindow:
             # 如果用户选择发送当前课表，则获取并附加
             if self.send_current_schedule_var.get():
                 try:
-                    current_schedule_name = self.main_app.schedule.get("current_schedule", "default")
+                    # 今天实际使用的课表（已考虑轮换和调休），停课时使用当前课表
+                    current_schedule_name = (self.main_app.schedule_query.day_plan(date.today()).schedule_name
+                                             or self.main_app.schedule.get("current_schedule", "default"))
                     current_courses = self.main_app.schedule.get("schedules", {}).get(current_schedule_name, {})
                     if current_courses:
                         # 将当前课表数据格式化为JSON字符串
@@ -772,24 +780,18 @@ class AIAssistantWindow:
                     messagebox.showerror("数据结构错误", f"星期 {day} 列表中的元素必须是字典。", parent=self.window)
                     return None
 
-                required_keys = {"start_time", "end_time", "name"}
-                if not required_keys == course.keys():
-                    messagebox.showerror("数据结构错误", f"课程字典必须包含且仅包含 'start_time', 'end_time', 'name' 三个键。星期 {day} 的课程 '{course}' 格式不正确。", parent=self.window)
+                # 必须包含起止时间和名称，教室和教师可选
+                if not set(COURSE_FIELDS) <= course.keys() or not course.keys() <= AI_COURSE_KEYS:
+                    messagebox.showerror("数据结构错误", f"课程字典必须包含 'start_time', 'end_time', 'name'，只能另外包含可选的 'room', 'teacher'。星期 {day} 的课程 '{course}' 格式不正确。", parent=self.window)
+                    return None
+                if not all(isinstance(course.get(key, ""), str) for key in (COURSE_ROOM, COURSE_TEACHER)):
+                    messagebox.showerror("数据格式错误", f"教室和教师必须是字符串。星期 {day} 的课程 '{course}' 格式不正确。", parent=self.window)
                     return None
-
-                start_time = course.get("start_time")
-                end_time = course.get("end_time")
-                name = course.get("name")
 
                 try:
-                    time.strptime(start_time, '%H:%M')
-                    time.strptime(end_time, '%H:%M')
-                except (ValueError, TypeError):
-                    messagebox.showerror("数据格式错误", f"时间格式不正确，必须是 HH:MM 格式。错误的课程: {course}", parent=self.window)
-                    return None
-                
-                if not isinstance(name, str):
-                    messagebox.showerror("数据格式错误", f"课程名称必须是字符串。错误的课程: {course}", parent=self.window)
+                    parse_course(course, strict=True)
+                except ScheduleValidationError as e:
+                    messagebox.showerror("数据格式错误", str(e), parent=self.window)
                     return None
         
         return data
@@ -846,7 +848,16 @@ class AIAssistantWindow:
             messagebox.showinfo("导入提示", "请先修正文本框中的数据格式，然后再点击导入。", parent=self.window)
             return
 
-        # 3. 确认并导入
+        # 3. 检查课程时间冲突（重叠、结束早于开始、课间过短）
+        conflicts = analyze_schedule(self.main_app.schedule.get("current_schedule", "default"), schedule_data,
+                                     self.main_app.config_handler.break_duration)
+        if conflicts:
+            report = ConflictReport(conflicts)
+            title = "检测到时间冲突" if report.has_errors else "课间时间过短"
+            if not messagebox.askyesno(title, f"{report.summary()}\n\n仍然要导入吗？", parent=self.window):
+                return
+
+        # 4. 确认并导入
         try:
             if not messagebox.askyesno("确认导入", "这将覆盖当前的课表数据，确定要导入吗？", parent=self.window):
                 return
@@ -0,0 +1,89 @@
+"""
+批量检查课表文件中的时间冲突：课程重叠、结束时间不晚于开始时间、时间格式错误，
+以及课间短于指定时长的相邻课程。
+可以传入单个课表文件，也可以传入目录（例如收集来的多台电脑的课表），
+目录中的所有JSON课表和课表数据库都会被检查。
+
+    python -m tools.conflict_analyzer schedule.json
+    python -m tools.conflict_analyzer 课表目录 --min-break 10 --json
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterator, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import SCHEDULE_DB_FILE
+from schedule_conflicts import ConflictReport, analyze_document
+from schedule_store import JsonScheduleStore, SqliteScheduleStore
+
+
+def iter_schedule_files(paths: List[str]) -> Iterator[str]:
+    """
+    展开命令行中的路径：文件原样返回，目录中递归查找 *.json 和课表数据库。
+    其他数据库文件不会被打开（打开时会创建课表表结构）。
+    """
+    db_name = os.path.basename(SCHEDULE_DB_FILE)
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith(".json") or name == db_name:
+                    yield os.path.join(root, name)
+
+
+def load_document(path: str) -> Optional[Dict]:
+    """读取课表文件（JSON会重放未合并的修改日志），不是课表文件时返回None"""
+    if path.endswith(".db"):
+        document = SqliteScheduleStore(path).load()
+    else:
+        document = JsonScheduleStore(path).load()
+    if not isinstance(document, dict) or not isinstance(document.get("schedules"), dict):
+        return None
+    return document
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="检查课表文件中的课程时间冲突")
+    parser.add_argument("paths", nargs="+", help="课表文件或包含课表文件的目录")
+    parser.add_argument("--min-break", type=int, default=10, help="最短课间（分钟），0表示不检查课间")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出检查结果")
+    args = parser.parse_args(argv)
+
+    results = {}
+    has_errors = False
+    for path in iter_schedule_files(args.paths):
+        try:
+            document = load_document(path)
+            if document is None:
+                continue
+            report: ConflictReport = analyze_document(document, args.min_break)
+        except Exception as e:
+            # 单个文件无法读取或检查时继续检查其他文件
+            print(f"无法检查 {path}: {e}", file=sys.stderr)
+            has_errors = True
+            continue
+        results[path] = report
+        has_errors = has_errors or report.has_errors
+
+    if args.json:
+        json.dump({path: report.to_dict() for path, report in results.items()},
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for path, report in results.items():
+            print(f"{path}: {len(report.errors)} 个错误，{len(report.warnings)} 个提示")
+            if report.conflicts:
+                for line in report.summary(limit=len(report.conflicts)).splitlines():
+                    print(f"  {line}")
+        if not results:
+            print("没有找到课表文件", file=sys.stderr)
+    return 1 if has_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
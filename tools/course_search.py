@@ -0,0 +1,106 @@
+from typing import List
+from constants import WEEKDAYS
+from schedule_model import parse_minutes
+from schedule_search import Location
+
+
+class CourseSearchWindow:
+    """
+    在所有课表中搜索课程：输入课程名称（部分匹配）或时间（HH:MM，列出此时正在上的课），
+    并可将选中的课程批量改名，所有修改作为一次保存提交。
+    """
+
+    def __init__(self, main_app, dpi_manager):
+        import tkinter as tk
+        from tkinter import ttk
+        self.tk = tk
+        self.main_app = main_app
+        self.dpi_manager = dpi_manager
+        self.locations: List[Location] = []
+
+        self.window = tk.Toplevel(main_app.root)
+        self.window.title("课程搜索")
+        self.window.geometry(f"{self.dpi_manager.scale(560)}x{self.dpi_manager.scale(480)}")
+        self.window.configure(bg="white")
+
+        frame = ttk.Frame(self.window)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        ttk.Label(frame, text="课程名称或时间:").grid(row=0, column=0, sticky=tk.W, pady=2)
+        self.query_var = tk.StringVar()
+        self.query_var.trace_add("write", lambda *_: self._search())
+        query_entry = ttk.Entry(frame, textvariable=self.query_var, width=30)
+        query_entry.grid(row=0, column=1, columnspan=2, sticky="ew", pady=2)
+        query_entry.focus_set()
+
+        columns = ("schedule", "weekday", "time", "name")
+        self.tree = ttk.Treeview(frame, columns=columns, show="headings", height=15)
+        for column, text, width in zip(columns, ("课表", "星期", "时间", "课程"), (140, 60, 120, 160)):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=self.dpi_manager.scale(width))
+        self.tree.grid(row=1, column=0, columnspan=3, sticky="nsew", pady=5)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=1, column=3, sticky="ns", pady=5)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        self.summary_label = ttk.Label(frame, text="")
+        self.summary_label.grid(row=2, column=0, columnspan=3, sticky=tk.W)
+
+        ttk.Label(frame, text="将选中的课程改名为:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        self.rename_entry = ttk.Entry(frame, width=20)
+        self.rename_entry.grid(row=3, column=1, sticky="ew", pady=5)
+        ttk.Button(frame, text="改名", command=self._rename).grid(row=3, column=2, sticky=tk.E, pady=5)
+
+        frame.grid_rowconfigure(1, weight=1)
+        frame.grid_columnconfigure(1, weight=1)
+
+    def show(self):
+        self.window.deiconify()
+        self.window.lift()
+        self.window.focus_force()
+
+    def _search(self):
+        """按输入内容搜索：可以解析为时间时查询该时刻正在上的课，否则按名称部分匹配"""
+        index = self.main_app.search_index
+        text = self.query_var.get().strip()
+        minute = parse_minutes(text)
+        if not text:
+            self.locations = []
+        elif minute is not None:
+            self.locations = index.at(minute)
+        else:
+            self.locations = index.search(text)
+
+        self.tree.delete(*self.tree.get_children())
+        for position, location in enumerate(self.locations):
+            schedule_name, weekday, _ = location
+            course = index.course(location) or {}
+            self.tree.insert("", self.tk.END, iid=str(position), values=(
+                schedule_name,
+                f"星期{WEEKDAYS[weekday]}",
+                f"{course.get('start_time', '')}-{course.get('end_time', '')}",
+                course.get("name", "")
+            ))
+        self.summary_label.config(text=f"找到 {len(self.locations)} 节课" if text else "")
+
+    def _rename(self):
+        from tkinter import messagebox
+        new_name = self.rename_entry.get().strip()
+        selected = [self.locations[int(iid)] for iid in self.tree.selection()]
+        if not selected or not new_name:
+            messagebox.showwarning("提示", "请选择要改名的课程并输入新名称。", parent=self.window)
+            return
+        editor = self.main_app.editor_window
+        if editor is not None and editor.window.winfo_exists():
+            messagebox.showwarning("提示", "请先关闭课表编辑器再改名。", parent=self.window)
+            return
+
+        schedules = {location[0] for location in selected}
+        if not messagebox.askyesno("确认改名",
+                                   f"将 {len(schedules)} 套课表中的 {len(selected)} 节课改名为“{new_name}”。",
+                                   parent=self.window):
+            return
+
+        changed = self.main_app.rename_course(None, new_name, selected)
+        self._search()
+        messagebox.showinfo("成功", f"已修改 {len(changed)} 套课表", parent=self.window)
@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
 from typing import Callable
+from font_manager import font_manager
 import pycaw
 
 class FullscreenTimeWindow:
@@ -41,7 +42,7 @@ class FullscreenTimeWindow:
                       background="white",
                       foreground="black")
         style.configure("Small.TButton",
-                      font=("微软雅黑", 8))
+                      font=font_manager.font("small_button"))
         
         # 添加静音复选框
         self.mute_var = tk.BooleanVar(value=False)
@@ -67,7 +68,7 @@ class FullscreenTimeWindow:
         # 创建时间标签
         self.time_label = tk.Label(
             self.window,
-            font=("微软雅黑", 300, "bold"),
+            font=font_manager.font("fullscreen_time"),
             fg="black",
             bg="white"
         )
@@ -77,7 +78,7 @@ class FullscreenTimeWindow:
         self.subtitle_label = tk.Label(
             self.window,
             text=self.config_handler.fullscreen_subtitle,
-            font=("微软雅黑", 40),
+            font=font_manager.font("fullscreen_subtitle"),
             fg="#808080",
             bg="white"
         )
@@ -0,0 +1,171 @@
+"""
+将学期课表导出为iCalendar（.ics）文件，供手机和日历应用订阅或导入。
+
+通过ScheduleQuery逐天取得实际生效的课程（已考虑课表轮换、节假日和调休），每次上课生成一个VEVENT。
+整个导出过程由生成器串联：上课安排 → ICS文本行 → 文件，
+内存占用与导出的周数和课表数量无关。
+
+    python -m tools.ics_exporter 课表.ics
+    python -m tools.ics_exporter 课表.ics --start 2026-09-01 --weeks 20
+"""
+import argparse
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Iterator, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from holiday_calendar import HolidayCalendar
+from rotation_calendar import TERM_WEEKS, RotationCalendar
+from schedule_query import CourseOccurrence, ScheduleQuery, query_for_document
+
+# RFC 5545 规定每行最多75个字节（不含换行）
+_MAX_LINE_OCTETS = 75
+
+
+def iter_occurrences(query: ScheduleQuery, start: date, weeks: int) -> Iterator[CourseOccurrence]:
+    """依次返回从start开始weeks周内实际上的每一节课（跳过结束时间不晚于开始时间的课程）"""
+    start_time = datetime.combine(start, datetime.min.time())
+    for occurrence in query.range(start_time, start_time + timedelta(weeks=weeks)):
+        if occurrence.interval.start < occurrence.interval.end:
+            yield occurrence
+
+
+def escape_text(text: str) -> str:
+    """转义TEXT类型属性值中的特殊字符"""
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold_line(line: str) -> str:
+    """按75字节折行（不拆开多字节字符），返回以CRLF结尾的内容行"""
+    if len(line.encode("utf-8")) <= _MAX_LINE_OCTETS:
+        return line + "\r\n"
+    parts = []
+    current, size, limit = [], 0, _MAX_LINE_OCTETS
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        if size + char_size > limit:
+            parts.append("".join(current))
+            # 续行以一个空格开头，空格也计入长度
+            current, size, limit = [], 0, _MAX_LINE_OCTETS - 1
+        current.append(char)
+        size += char_size
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def iter_ics_lines(occurrences: Iterable[CourseOccurrence], calendar_name: str,
+                   stamp: Optional[datetime] = None) -> Iterator[str]:
+    """
+    将上课安排转换为ICS文件的内容行。
+    时间使用不带时区的本地时间（日历应用按设备所在时区显示），
+    UID由日期、课表和节次组成，重新导出后日历应用会更新而不是重复添加。
+    """
+    stamp_text = (stamp or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    yield fold_line("BEGIN:VCALENDAR")
+    yield fold_line("VERSION:2.0")
+    yield fold_line("PRODID:-//course_scheduler//课程表//ZH")
+    yield fold_line("CALSCALE:GREGORIAN")
+    yield fold_line(f"X-WR-CALNAME:{escape_text(calendar_name)}")
+
+    previous_day, period = None, 0
+    for occurrence in occurrences:
+        day, schedule_name = occurrence.date, occurrence.schedule_name
+        period = period + 1 if day == previous_day else 1
+        previous_day = day
+        yield fold_line("BEGIN:VEVENT")
+        yield fold_line(f"UID:{day:%Y%m%d}-{period}-{schedule_name.encode('utf-8').hex()}@course_scheduler")
+        yield fold_line(f"DTSTAMP:{stamp_text}")
+        yield fold_line(f"DTSTART:{occurrence.start:%Y%m%dT%H%M%S}")
+        yield fold_line(f"DTEND:{occurrence.end:%Y%m%dT%H%M%S}")
+        yield fold_line(f"SUMMARY:{escape_text(occurrence.course.name)}")
+        if occurrence.course.room:
+            yield fold_line(f"LOCATION:{escape_text(occurrence.course.room)}")
+        if occurrence.course.teacher:
+            yield fold_line(f"DESCRIPTION:{escape_text('教师: ' + occurrence.course.teacher)}")
+        yield fold_line(f"CATEGORIES:{escape_text(schedule_name)}")
+        yield fold_line("END:VEVENT")
+    yield fold_line("END:VCALENDAR")
+
+
+def write_ics(path: str, lines: Iterable[str]) -> int:
+    """
+    逐行写入ICS文件，写完后替换目标文件（导出失败时不会留下半个文件）。
+    Returns:
+        导出的事件数量
+    """
+    temp_path = f"{path}.tmp"
+    events = 0
+    try:
+        with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+            for line in lines:
+                if line == "BEGIN:VEVENT\r\n":
+                    events += 1
+                f.write(line)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return events
+
+
+def export_term(path: str, start: date, weeks: int, query: ScheduleQuery, calendar_name: str = "课程表") -> int:
+    """导出从start开始weeks周的课表，返回导出的事件数量"""
+    return write_ics(path, iter_ics_lines(iter_occurrences(query, start, weeks), calendar_name))
+
+
+def export_app_schedule(main_app, path: str, start: Optional[date] = None, weeks: int = TERM_WEEKS) -> int:
+    """
+    导出主程序当前的课表，默认从本周一开始导出一个学期。
+    与命令行导出相同，通过query_for_document使用主程序的轮换日历、节假日和课表索引。
+    """
+    if start is None:
+        today = date.today()
+        start = today - timedelta(days=today.weekday())
+    query = query_for_document(main_app.schedule, main_app.rotation_calendar, main_app.holiday_calendar,
+                               main_app.schedule_index)
+    return export_term(path, start, weeks, query)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="将学期课表导出为iCalendar文件")
+    parser.add_argument("target", help="导出的.ics文件")
+    parser.add_argument("--start", help="起始日期（YYYY-MM-DD），默认为本周一")
+    parser.add_argument("--weeks", type=int, default=TERM_WEEKS, help="导出的周数")
+    args = parser.parse_args(argv)
+
+    from config_handler import ConfigHandler
+    from persistence_service import persistence_service
+    from schedule_store import create_schedule_store
+
+    today = date.today()
+    try:
+        start = datetime.strptime(args.start, "%Y-%m-%d").date() if args.start else today - timedelta(days=today.weekday())
+    except ValueError:
+        print(f"起始日期格式错误: {args.start}", file=sys.stderr)
+        return 1
+
+    config_handler = ConfigHandler()
+    try:
+        document = create_schedule_store(config_handler.schedule_storage_backend).open_document()
+        if document is None:
+            print("找不到课表数据", file=sys.stderr)
+            return 1
+        rotation_calendar = RotationCalendar(config_handler)
+        rotation_calendar.rebuild(list(document.get("schedules", {}).keys()), start)
+        holiday_calendar = HolidayCalendar()
+        holiday_calendar.load()
+        query = query_for_document(document, rotation_calendar, holiday_calendar)
+        count = export_term(args.target, start, args.weeks, query)
+        print(f"已导出 {count} 节课到 {args.target}")
+        return 0
+    finally:
+        # ConfigHandler可能提交了配置保存，后台线程是守护线程，退出前写完
+        persistence_service.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
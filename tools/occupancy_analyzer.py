@@ -0,0 +1,74 @@
+"""
+检查多个课表文件中教室和教师的重复占用，并可查看某个教室或教师一周的占用情况。
+课程需要填写可选的 room（教室）和 teacher（教师）字段。
+每个文件视为一台电脑的课表：同一文件中的多套课表默认互为轮换、不会同时使用，
+集中保存多个班级课表的文件请加 --concurrent。
+
+    python -m tools.occupancy_analyzer 课表目录
+    python -m tools.occupancy_analyzer 课表目录 --room 301
+    python -m tools.occupancy_analyzer all.json --concurrent --teacher 张老师 --json
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import WEEKDAYS
+from schedule_occupancy import OccupancyIndex, RESOURCE_ROOM, RESOURCE_TEACHER, RESOURCE_LABELS
+from tools.conflict_analyzer import iter_schedule_files, load_document
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="检查课表文件中教室和教师的重复占用")
+    parser.add_argument("paths", nargs="+", help="课表文件或包含课表文件的目录")
+    parser.add_argument("--concurrent", action="store_true", help="同一文件中的课表同时使用（而不是轮换）")
+    parser.add_argument("--room", help="显示某个教室一周的占用")
+    parser.add_argument("--teacher", help="显示某位教师一周的占用")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    args = parser.parse_args(argv)
+
+    index = OccupancyIndex()
+    has_errors = False
+    for path in iter_schedule_files(args.paths):
+        try:
+            document = load_document(path)
+        except (OSError, ValueError) as e:
+            print(f"无法读取 {path}: {e}", file=sys.stderr)
+            has_errors = True
+            continue
+        if document is not None:
+            alternatives = () if args.concurrent else document["schedules"].keys()
+            index.update(document, source=path, alternatives=alternatives)
+
+    views = {kind: resource for kind, resource in ((RESOURCE_ROOM, args.room), (RESOURCE_TEACHER, args.teacher))
+             if resource}
+    clashes = index.clashes()
+    if args.json:
+        json.dump({
+            "clashes": [clash.to_dict() for clash in clashes],
+            "occupancy": {kind: {"resource": resource,
+                                 "days": {str(weekday): [booking.to_dict() for booking in bookings]
+                                          for weekday, bookings in index.occupancy(kind, resource).items()}}
+                          for kind, resource in views.items()},
+        }, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for kind, resource in views.items():
+            print(f"{RESOURCE_LABELS[kind]} {resource}:")
+            occupancy = index.occupancy(kind, resource)
+            if not occupancy:
+                print("  没有课程")
+            for weekday, bookings in occupancy.items():
+                print(f"  星期{WEEKDAYS[weekday]}")
+                for booking in bookings:
+                    print(f"    {booking.label}")
+        print(f"{len(clashes)} 处重复占用")
+        for clash in clashes:
+            print(f"  {clash}")
+    return 1 if has_errors or clashes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
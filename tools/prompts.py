@@ -8,6 +8,7 @@ The JSON structure is as follows:
 - The keys of the object are numeric strings representing the day of the week: "0" for Monday, "1" for Tuesday, and so on, up to "6" for Sunday.
 - The value for each key is a list of courses (a JSON array).
 - Each element in the list is a JSON object representing a single class, containing three keys: "start_time" (in HH:MM format), "end_time" (in HH:MM format), and "name" (a string for the course name).
+- If the image shows the classroom or the teacher of a class, also include "room" (a string for the classroom) and/or "teacher" (a string for the teacher's name). Omit these keys when the information is not shown; do not add any other keys.
 - If there are no classes on a particular day, the corresponding value should be an empty list [].
 
 Example:
@@ -18,7 +19,7 @@ Example:
   ],
   "1": [],
   "2": [
-    {"start_time": "14:00", "end_time": "15:40", "name": "线性代数"}
+    {"start_time": "14:00", "end_time": "15:40", "name": "线性代数", "room": "教301", "teacher": "王老师"}
   ],
   "3": [],
   "4": [],
@@ -0,0 +1,43 @@
+"""
+课表SQLite数据库的一次性导入/导出工具。
+
+    python -m tools.schedule_db import schedule.json schedule.db
+    python -m tools.schedule_db export schedule.db schedule.json
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import SCHEDULE_FILE, SCHEDULE_DB_FILE
+from schedule_store import import_json, export_json
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="在JSON课表文件与SQLite数据库之间转换")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="将JSON课表导入SQLite数据库（覆盖数据库中的课表）")
+    import_parser.add_argument("source", nargs="?", default=SCHEDULE_FILE, help="JSON课表文件")
+    import_parser.add_argument("target", nargs="?", default=SCHEDULE_DB_FILE, help="SQLite数据库文件")
+
+    export_parser = subparsers.add_parser("export", help="将SQLite数据库中的课表导出为JSON文件")
+    export_parser.add_argument("source", nargs="?", default=SCHEDULE_DB_FILE, help="SQLite数据库文件")
+    export_parser.add_argument("target", nargs="?", default=SCHEDULE_FILE, help="JSON课表文件")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "import":
+            import_json(args.source, args.target)
+        else:
+            export_json(args.source, args.target)
+    except FileNotFoundError as e:
+        print(f"找不到课表数据: {e}", file=sys.stderr)
+        return 1
+    print(f"已将 {args.source} 转换为 {args.target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,489 @@
+"""
+从教务系统导出的CSV/ICS课表批量导入多套课表。
+
+支持的格式：
+- 每行一门课程的CSV（表头如：课表,星期,开始时间,结束时间,课程）；
+- 每行一个节次、每个星期一列的CSV（表头如：节次,开始时间,结束时间,星期一,星期二,...）；
+- ICS日历（每个VEVENT为一门课程，按每周重复规则或上课日期确定星期）。
+Excel表格请先另存为CSV。文件逐行流式读取，所有错误按行号汇总，
+全部通过后作为一次保存提交给课表存储。
+
+    python -m tools.timetable_importer 课表.csv
+"""
+import argparse
+import codecs
+import csv
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from holiday_calendar import parse_weekday
+from schedule_model import format_minutes, parse_minutes
+
+# CSV表头别名（小写比较）
+_HEADER_ALIASES = {
+    "schedule": ("课表", "课表名称", "班级", "schedule"),
+    "weekday": ("星期", "周几", "weekday", "day"),
+    "start": ("开始时间", "开始", "上课时间", "start", "start_time"),
+    "end": ("结束时间", "结束", "下课时间", "end", "end_time"),
+    "name": ("课程", "课程名称", "科目", "name", "course"),
+}
+
+_ENGLISH_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_ICS_WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# 判断文件编码时读取的字节数
+_SNIFF_BYTES = 64 * 1024
+
+
+class RowError:
+    """导入文件中某一行的错误"""
+    __slots__ = ("line", "message")
+
+    def __init__(self, line: int, message: str):
+        self.line = line        # 行号（从1开始）
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"第{self.line}行: {self.message}"
+
+
+class ImportResult:
+    """
+    导入结果：按课表、星期汇总的课程，以及所有行级错误。
+    同一课表同一天完全相同的课程只保留一份（ICS按日期列出的每周课程会重复出现）。
+    """
+
+    def __init__(self):
+        self.schedules: Dict[str, Dict[str, List[Dict[str, str]]]] = {}
+        self.errors: List[RowError] = []
+        self.row_count = 0
+        self._seen = set()
+
+    @property
+    def course_count(self) -> int:
+        return len(self._seen)
+
+    def add(self, schedule: str, weekday: int, start: int, end: int, name: str) -> None:
+        key = (schedule, weekday, start, end, name)
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        days = self.schedules.get(schedule)
+        if days is None:
+            days = self.schedules[schedule] = {str(day): [] for day in range(7)}
+        days[str(weekday)].append({"start_time": format_minutes(start), "end_time": format_minutes(end), "name": name})
+
+    def error(self, line: int, message: str) -> None:
+        self.errors.append(RowError(line, message))
+
+    def finish(self) -> "ImportResult":
+        """按开始时间排序每一天的课程"""
+        for days in self.schedules.values():
+            for courses in days.values():
+                courses.sort(key=lambda course: (course["start_time"], course["end_time"]))
+        return self
+
+
+def normalize_time(text: str) -> Optional[int]:
+    """将 "8:00"、"08:00:00"、"08：00" 等时间文本解析为当天的分钟数，无法解析时返回None"""
+    text = text.strip().replace("：", ":")
+    if text.count(":") == 2:
+        text = text.rsplit(":", 1)[0]
+    return parse_minutes(text)
+
+
+def parse_weekday_text(text: str) -> Optional[int]:
+    """解析“星期一”、“周一”、“1”（星期一为1）或 Mon/Monday"""
+    text = text.strip()
+    weekday = parse_weekday(text)
+    if weekday is None and text[:3].lower() in _ENGLISH_WEEKDAYS:
+        weekday = _ENGLISH_WEEKDAYS.index(text[:3].lower())
+    return weekday
+
+
+def _course_times(result: ImportResult, line: int, start_text: str, end_text: str,
+                  default_duration: int) -> Optional[Tuple[int, int]]:
+    """校验并返回一门课程的起止分钟数；结束时间为空时按默认课程时长计算"""
+    start = normalize_time(start_text)
+    if start is None:
+        result.error(line, f"开始时间无效: '{start_text}'")
+        return None
+    if end_text.strip():
+        end = normalize_time(end_text)
+        if end is None:
+            result.error(line, f"结束时间无效: '{end_text}'")
+            return None
+    else:
+        end = start + default_duration
+    if not start < end < 24 * 60:
+        result.error(line, f"结束时间必须晚于开始时间且不能跨天: {start_text}-{end_text}")
+        return None
+    return start, end
+
+
+# ---------------------------------------------------------------- CSV
+
+def _detect_encoding(path: str) -> str:
+    """UTF-8（含BOM）优先，否则按中文Excel默认的GBK读取"""
+    with open(path, 'rb') as f:
+        sample = f.read(_SNIFF_BYTES)
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return "gbk"
+    return "utf-8-sig"
+
+
+def _match_header(cell: str) -> Optional[str]:
+    cell = cell.strip().lower()
+    for field, aliases in _HEADER_ALIASES.items():
+        if cell in aliases:
+            return field
+    return None
+
+
+def read_csv(path: str, default_schedule: str, default_duration: int = 40) -> ImportResult:
+    """
+    流式读取CSV课表。
+    Args:
+        path: CSV文件路径
+        default_schedule: 没有“课表”列时课程导入到的课表
+        default_duration: 没有结束时间时使用的课程时长（分钟）
+    """
+    result = ImportResult()
+    with open(path, 'r', encoding=_detect_encoding(path), newline='') as f:
+        sample = f.read(_SNIFF_BYTES)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",\t;")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        header = next(reader, None)
+        if header is None:
+            result.error(1, "文件为空")
+            return result
+
+        columns = {}
+        weekday_columns = {}
+        for index, cell in enumerate(header):
+            field = _match_header(cell)
+            if field is not None:
+                columns.setdefault(field, index)
+            else:
+                weekday = parse_weekday_text(cell) if cell.strip() else None
+                if weekday is not None and not cell.strip().isdigit():
+                    weekday_columns[index] = weekday
+
+        if "start" not in columns or ("name" not in columns and not weekday_columns):
+            result.error(1, f"无法识别表头，至少需要“开始时间”和“课程”列（或每个星期一列）: {header}")
+            return result
+        if "weekday" not in columns and not weekday_columns:
+            result.error(1, "缺少“星期”列")
+            return result
+
+        if weekday_columns:
+            _read_wide_rows(reader, columns, weekday_columns, result, default_schedule, default_duration)
+        else:
+            _read_long_rows(reader, columns, result, default_schedule, default_duration)
+    return result.finish()
+
+
+def _cell(row: List[str], index: Optional[int]) -> str:
+    if index is None or index >= len(row):
+        return ""
+    return row[index].strip()
+
+
+def _read_long_rows(reader, columns: Dict[str, int], result: ImportResult,
+                    default_schedule: str, default_duration: int) -> None:
+    """每行一门课程"""
+    for row in reader:
+        line = reader.line_num
+        if not any(cell.strip() for cell in row):
+            continue
+        result.row_count += 1
+        name = _cell(row, columns["name"])
+        if not name:
+            result.error(line, "课程名称为空")
+            continue
+        weekday_text = _cell(row, columns["weekday"])
+        weekday = parse_weekday_text(weekday_text)
+        if weekday is None:
+            result.error(line, f"星期无效: '{weekday_text}'")
+            continue
+        times = _course_times(result, line, _cell(row, columns["start"]), _cell(row, columns.get("end")),
+                              default_duration)
+        if times is None:
+            continue
+        schedule = _cell(row, columns.get("schedule")) or default_schedule
+        result.add(schedule, weekday, times[0], times[1], name)
+
+
+def _read_wide_rows(reader, columns: Dict[str, int], weekday_columns: Dict[int, int],
+                    result: ImportResult, default_schedule: str, default_duration: int) -> None:
+    """每行一个节次，每个星期一列，单元格为课程名称（空单元格表示没有课）"""
+    for row in reader:
+        line = reader.line_num
+        if not any(cell.strip() for cell in row):
+            continue
+        result.row_count += 1
+        names = [(weekday, _cell(row, index)) for index, weekday in weekday_columns.items()]
+        if not any(name for _, name in names):
+            continue
+        times = _course_times(result, line, _cell(row, columns["start"]), _cell(row, columns.get("end")),
+                              default_duration)
+        if times is None:
+            continue
+        schedule = _cell(row, columns.get("schedule")) or default_schedule
+        for weekday, name in names:
+            if name:
+                result.add(schedule, weekday, times[0], times[1], name)
+
+
+# ---------------------------------------------------------------- ICS
+
+def _unfold_lines(f) -> Iterator[Tuple[int, str]]:
+    """按RFC 5545展开折行，返回 (起始行号, 完整内容行)"""
+    current, current_line = None, 0
+    for line_no, raw in enumerate(f, start=1):
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current_line, current
+        current, current_line = line, line_no
+    if current is not None:
+        yield current_line, current
+
+
+def _parse_ics_datetime(params: str, value: str) -> Optional[datetime]:
+    """解析DTSTART/DTEND，UTC时间转换为本地时间；全天事件返回None"""
+    if "VALUE=DATE" in params.upper() and "VALUE=DATE-TIME" not in params.upper():
+        return None
+    try:
+        if value.endswith("Z"):
+            moment = datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+            return moment.astimezone().replace(tzinfo=None)
+        return datetime.strptime(value[:15], "%Y%m%dT%H%M%S")
+    except ValueError:
+        return None
+
+
+def _parse_ics_duration(value: str) -> Optional[int]:
+    """解析 PT45M、PT1H30M 形式的持续时间（分钟）"""
+    match = re.fullmatch(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:\d+S)?", value.strip())
+    if not match or not any(match.groups()):
+        return None
+    return int(match.group(1) or 0) * 60 + int(match.group(2) or 0)
+
+
+def read_ics(path: str, default_schedule: str, default_duration: int = 40) -> ImportResult:
+    """
+    流式读取ICS日历。
+    课表名称取日历的 X-WR-CALNAME，没有时使用default_schedule；
+    每周重复的事件按RRULE的BYDAY确定星期，否则按上课日期确定。
+    """
+    result = ImportResult()
+    schedule = default_schedule
+    event: Optional[Dict[str, Tuple[str, str]]] = None
+    event_line = 0
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line_no, line in _unfold_lines(f):
+            name_part, _, value = line.partition(":")
+            prop, _, params = name_part.partition(";")
+            prop = prop.upper()
+            if prop == "BEGIN" and value.upper() == "VEVENT":
+                event, event_line = {}, line_no
+            elif prop == "END" and value.upper() == "VEVENT" and event is not None:
+                result.row_count += 1
+                _add_ics_event(result, event_line, event, schedule, default_duration)
+                event = None
+            elif event is not None:
+                event.setdefault(prop, (params, value))
+            elif prop == "X-WR-CALNAME" and value.strip():
+                schedule = value.strip()
+    return result.finish()
+
+
+def _add_ics_event(result: ImportResult, line: int, event: Dict[str, Tuple[str, str]],
+                   schedule: str, default_duration: int) -> None:
+    if event.get("STATUS", ("", ""))[1].upper() == "CANCELLED":
+        return
+    name = event.get("SUMMARY", ("", ""))[1].replace("\\,", ",").replace("\\;", ";").strip()
+    if not name:
+        result.error(line, "事件缺少SUMMARY（课程名称）")
+        return
+    if "DTSTART" not in event:
+        result.error(line, f"'{name}' 缺少DTSTART")
+        return
+    start = _parse_ics_datetime(*event["DTSTART"])
+    if start is None:
+        result.error(line, f"'{name}' 是全天事件或开始时间无效: {event['DTSTART'][1]}")
+        return
+    start_minute = start.hour * 60 + start.minute
+
+    if "DTEND" in event:
+        end = _parse_ics_datetime(*event["DTEND"])
+        if end is None or end.date() != start.date():
+            result.error(line, f"'{name}' 的结束时间无效或跨天: {event['DTEND'][1]}")
+            return
+        end_minute = end.hour * 60 + end.minute
+    elif "DURATION" in event:
+        duration = _parse_ics_duration(event["DURATION"][1])
+        if duration is None:
+            result.error(line, f"'{name}' 的DURATION无效: {event['DURATION'][1]}")
+            return
+        end_minute = start_minute + duration
+    else:
+        end_minute = start_minute + default_duration
+    if not start_minute < end_minute < 24 * 60:
+        result.error(line, f"'{name}' 的结束时间必须晚于开始时间且不能跨天")
+        return
+
+    weekdays = [start.weekday()]
+    rule = event.get("RRULE", ("", ""))[1].upper()
+    by_day = re.search(r"BYDAY=([A-Z0-9,+-]+)", rule)
+    if "FREQ=WEEKLY" in rule and by_day:
+        weekdays = sorted({_ICS_WEEKDAYS.index(day[-2:]) for day in by_day.group(1).split(",")
+                           if day[-2:] in _ICS_WEEKDAYS}) or weekdays
+    for weekday in weekdays:
+        result.add(schedule, weekday, start_minute, end_minute, name)
+
+
+def read_timetable(path: str, default_schedule: str, default_duration: int = 40) -> ImportResult:
+    """按扩展名选择解析器读取课表文件"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".ics":
+        return read_ics(path, default_schedule, default_duration)
+    if extension in (".xlsx", ".xls"):
+        raise ValueError("请先在Excel中将表格另存为CSV文件后再导入")
+    return read_csv(path, default_schedule, default_duration)
+
+
+def format_errors(errors: Iterable[RowError], limit: int = 200) -> str:
+    """将错误列表格式化为多行文本，超过limit条时省略其余部分"""
+    errors = list(errors)
+    lines = [str(error) for error in errors[:limit]]
+    if len(errors) > limit:
+        lines.append(f"……另有 {len(errors) - limit} 条错误")
+    return "\n".join(lines)
+
+
+class TimetableImportWindow:
+    """批量导入课表的窗口：选择文件后先预览校验结果，确认后一次性导入"""
+
+    def __init__(self, main_app, dpi_manager):
+        import tkinter as tk
+        from tkinter import ttk
+        self.tk = tk
+        self.main_app = main_app
+        self.dpi_manager = dpi_manager
+        self.result: Optional[ImportResult] = None
+
+        self.window = tk.Toplevel(main_app.root)
+        self.window.title("批量导入课表")
+        self.window.geometry(f"{self.dpi_manager.scale(560)}x{self.dpi_manager.scale(460)}")
+        self.window.configure(bg="white")
+
+        frame = ttk.Frame(self.window)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        ttk.Label(frame, text="没有“课表”列时导入到:").grid(row=0, column=0, sticky=tk.W, pady=2)
+        self.schedule_entry = ttk.Entry(frame, width=20)
+        self.schedule_entry.insert(0, main_app.schedule.get("current_schedule", "default"))
+        self.schedule_entry.grid(row=0, column=1, sticky=tk.W, pady=2)
+
+        ttk.Button(frame, text="选择文件...", command=self._choose_file).grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.import_button = ttk.Button(frame, text="导入", command=self._commit, state="disabled")
+        self.import_button.grid(row=1, column=1, sticky=tk.W, pady=5)
+
+        self.summary_label = ttk.Label(frame, text="支持CSV（Excel另存为CSV）和ICS文件，同名课表将被覆盖")
+        self.summary_label.grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=5)
+
+        self.error_text = tk.Text(frame, height=15, width=60)
+        self.error_text.grid(row=3, column=0, columnspan=2, sticky="nsew")
+        frame.grid_rowconfigure(3, weight=1)
+        frame.grid_columnconfigure(1, weight=1)
+
+    def show(self):
+        self.window.deiconify()
+        self.window.lift()
+        self.window.focus_force()
+
+    def _choose_file(self):
+        from tkinter import filedialog, messagebox
+        path = filedialog.askopenfilename(
+            parent=self.window,
+            filetypes=[("课表文件", "*.csv *.txt *.tsv *.ics"), ("所有文件", "*.*")]
+        )
+        if not path:
+            return
+        default_schedule = self.schedule_entry.get().strip() or "default"
+        try:
+            self.result = read_timetable(path, default_schedule, self.main_app.config_handler.course_duration)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            self.result = None
+            messagebox.showerror("读取失败", str(e), parent=self.window)
+            return
+
+        result = self.result
+        self.summary_label.config(
+            text=f"共 {result.row_count} 行，{result.course_count} 门课程，"
+                 f"{len(result.schedules)} 套课表，{len(result.errors)} 个错误"
+        )
+        self.error_text.delete("1.0", self.tk.END)
+        self.error_text.insert(self.tk.END, format_errors(result.errors) or "没有错误，可以导入。")
+        can_import = bool(result.schedules) and not result.errors
+        self.import_button.config(state="normal" if can_import else "disabled")
+
+    def _commit(self):
+        from tkinter import messagebox
+        if self.result is None or self.result.errors:
+            return
+        editor = self.main_app.editor_window
+        if editor is not None and editor.window.winfo_exists():
+            messagebox.showwarning("提示", "请先关闭课表编辑器再导入。", parent=self.window)
+            return
+        names = list(self.result.schedules)
+        existing = [name for name in names if name in self.main_app.schedule["schedules"]]
+        message = f"将导入 {len(names)} 套课表。"
+        if existing:
+            message += f"\n以下课表将被覆盖: {', '.join(existing[:10])}{' 等' if len(existing) > 10 else ''}"
+        if not messagebox.askyesno("确认导入", message, parent=self.window):
+            return
+        self.main_app.import_schedules(self.result.schedules)
+        self.result = None
+        self.import_button.config(state="disabled")
+        messagebox.showinfo("成功", f"已导入 {len(names)} 套课表", parent=self.window)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="校验CSV/ICS课表文件（不写入课表）")
+    parser.add_argument("path", help="CSV或ICS文件")
+    parser.add_argument("--schedule", default="default", help="没有课表列时使用的课表名称")
+    parser.add_argument("--duration", type=int, default=40, help="没有结束时间时的课程时长（分钟）")
+    args = parser.parse_args(argv)
+
+    try:
+        result = read_timetable(args.path, args.schedule, args.duration)
+    except (OSError, ValueError) as e:
+        print(f"读取失败: {e}", file=sys.stderr)
+        return 1
+    print(f"{result.row_count} 行，{result.course_count} 门课程，{len(result.schedules)} 套课表")
+    for name, days in result.schedules.items():
+        print(f"  {name}: {sum(len(courses) for courses in days.values())} 门课程")
+    if result.errors:
+        print(format_errors(result.errors), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
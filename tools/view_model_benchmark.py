@@ -0,0 +1,132 @@
+"""
+视图模型节拍吞吐量基准测试。
+
+使用合成课表（每天10~1000门课程、多套课表）反复调用 ScheduleViewModel，
+报告每秒可计算的节拍数以及每次节拍的内存分配情况，用于发现热点路径上的性能回退。
+不依赖Tk，可在没有显示器的环境中运行：
+
+    python -m tools.view_model_benchmark
+    python -m tools.view_model_benchmark --courses 10 100 1000 --schedules 20 --ticks 2000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schedule_index import ScheduleIndex
+from schedule_view_model import ScheduleViewModel
+
+
+class BenchmarkConfig:
+    """基准测试使用的最小配置，只包含视图模型读取的配置项"""
+
+    def __init__(self, display_mode: str):
+        self.current_course_time_display_mode = display_mode
+        self.countdown_name = "高考"
+        self.countdown_date = datetime(datetime.now().year + 1, 6, 7)
+        self.preview_tomorrow_trigger_count = 0
+
+
+def build_schedule_data(courses_per_day: int, schedule_count: int) -> Dict:
+    """生成合成课表：课程从06:00开始均匀排满到23:00，每门课之间留1分钟间隔"""
+    day_minutes = 17 * 60
+    slot = max(2, day_minutes // courses_per_day)
+    schedules = {}
+    for schedule_no in range(schedule_count):
+        days = {}
+        for weekday in range(7):
+            courses = []
+            for i in range(courses_per_day):
+                start = 6 * 60 + (i * slot) % day_minutes
+                end = min(start + slot - 1, 23 * 60 + 59)
+                courses.append({
+                    "start_time": f"{start // 60:02d}:{start % 60:02d}",
+                    "end_time": f"{end // 60:02d}:{end % 60:02d}",
+                    "name": f"课程{schedule_no}-{weekday}-{i}"
+                })
+            days[str(weekday)] = courses
+        schedules[f"课表{schedule_no}"] = days
+    return {"current_schedule": "课表0", "schedules": schedules}
+
+
+def tick_times(ticks: int) -> List[datetime]:
+    """生成均匀分布在一天中的节拍时间，覆盖课前、课中和课后的各种状态"""
+    start = datetime.combine(datetime.now().date(), datetime.min.time()) + timedelta(hours=6)
+    step = timedelta(seconds=max(1, 17 * 3600 // ticks))
+    return [start + step * i for i in range(ticks)]
+
+
+def run_case(courses_per_day: int, schedule_count: int, ticks: int, display_mode: str) -> Dict[str, float]:
+    """运行一组参数，返回吞吐量与内存分配统计"""
+    schedule_data = build_schedule_data(courses_per_day, schedule_count)
+    schedule_index = ScheduleIndex()
+    schedule_index.rebuild(schedule_data)
+    view_model = ScheduleViewModel(BenchmarkConfig(display_mode), schedule_index)
+    schedule_names = list(schedule_data["schedules"].keys())
+    times = tick_times(ticks)
+
+    def tick(i: int, now: datetime):
+        name = schedule_names[i % len(schedule_names)]
+        return view_model.schedule(now, name, now.weekday())
+
+    # 预热：编译所有用到的课表索引，避免把一次性的编译开销计入节拍
+    for i, now in enumerate(times[:len(schedule_names)]):
+        tick(i, now)
+
+    started = time.perf_counter()
+    for i, now in enumerate(times):
+        tick(i, now)
+    elapsed = time.perf_counter() - started
+
+    # 内存分配：保留所有渲染描述以统计每次节拍新分配的内存块，同时记录瞬时峰值
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    views = [tick(i, now) for i, now in enumerate(times)]
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    size = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    del views
+
+    return {
+        "ticks_per_second": ticks / elapsed if elapsed > 0 else float("inf"),
+        "us_per_tick": elapsed / ticks * 1_000_000,
+        "blocks_per_tick": blocks / ticks,
+        "bytes_per_tick": size / ticks,
+        "peak_kib": peak / 1024,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="视图模型节拍吞吐量基准测试")
+    parser.add_argument("--courses", type=int, nargs="+", default=[10, 100, 1000],
+                        help="每天的课程数量（可指定多个）")
+    parser.add_argument("--schedules", type=int, default=10, help="课表套数")
+    parser.add_argument("--ticks", type=int, default=1000, help="每组参数执行的节拍数")
+    parser.add_argument("--mode", choices=["default", "end_time", "countdown"], default="countdown",
+                        help="当前课程时间显示模式")
+    args = parser.parse_args(argv)
+
+    header = f"{'课程/天':>8} {'课表':>5} {'节拍/秒':>12} {'微秒/节拍':>10} {'块/节拍':>9} {'字节/节拍':>10} {'峰值KiB':>9}"
+    print(header)
+    print("-" * len(header))
+    for courses_per_day in args.courses:
+        result = run_case(courses_per_day, args.schedules, args.ticks, args.mode)
+        print(
+            f"{courses_per_day:>8} {args.schedules:>5} "
+            f"{result['ticks_per_second']:>12.1f} {result['us_per_tick']:>10.1f} "
+            f"{result['blocks_per_tick']:>9.1f} {result['bytes_per_tick']:>10.0f} {result['peak_kib']:>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 import tkinter as tk
+from datetime import date, timedelta
 from constants import WEEKDAYS
+from font_manager import font_manager
 import sys
 
 # Conditional import for Windows-specific functionality
@@ -64,28 +66,35 @@ class WeekPreviewWindow(tk.Toplevel):
         container = tk.Frame(self, bg="white")
         container.pack(padx=10, pady=10, fill="both", expand=True)
 
-        current_schedule_name = self.app.schedule.get("current_schedule", "default")
-        schedule_data = self.app.schedule.get("schedules", {}).get(current_schedule_name, {})
-
         # 1. 估算每个每日课表块的高度
         font_size = self.config_handler.schedule_size
         line_height_estimate = font_size + 10  # 估算每行文本的高度（包括padding）
         day_blocks = []
 
+        today = date.today()
         if self.day_offset is not None:
-            from datetime import datetime, timedelta
-            target_date = datetime.now() + timedelta(days=self.day_offset)
-            day_indices = [target_date.weekday()]
+            target_dates = [today + timedelta(days=self.day_offset)]
         else:
-            day_indices = range(7)
-
-        for i in day_indices:
-            weekday_str = str(i)
-            courses_for_day = sorted(schedule_data.get(weekday_str, []), key=lambda x: x['start_time'])
+            # 本周一至周日
+            week_start = today - timedelta(days=today.weekday())
+            target_dates = [week_start + timedelta(days=i) for i in range(7)]
+
+        for target_date in target_dates:
+            i = target_date.weekday()
+            # 每一天按节假日、调休和课表轮换解析实际使用的课表（明天可能已进入下一轮换周）
+            plan = self.app.schedule_query.day_plan(target_date)
+            note = ""
+            # 复用主界面的课程索引，课程已按开始时间（分钟数）排序，无需再次解析
+            courses_for_day = plan.courses
+            if plan.no_classes:
+                note = plan.resolved.override.name or "放假"
+            elif plan.weekday != i:
+                note = f"调休，上星期{WEEKDAYS[plan.weekday]}的课"
             # 估算高度：1行标题 + max(1, 课程数)行内容
             block_height = line_height_estimate * (1 + max(1, len(courses_for_day)))
             day_blocks.append({
                 "day_index": i,
+                "note": note,
                 "height": block_height,
                 "courses": courses_for_day
             })
@@ -125,8 +134,8 @@ class WeekPreviewWindow(tk.Toplevel):
 
                 # Day label
                 day_label = tk.Label(
-                    day_frame, text=f"星期{day_name}",
-                    font=("微软雅黑", font_size + 1, "bold"),
+                    day_frame, text=f"星期{day_name}（{block['note']}）" if block['note'] else f"星期{day_name}",
+                    font=font_manager.font("preview_day"),
                     fg=self.config_handler.font_color, bg="white", anchor='w'
                 )
                 day_label.pack(fill="x")
@@ -135,7 +144,7 @@ class WeekPreviewWindow(tk.Toplevel):
                 if not courses_for_day:
                     no_course_label = tk.Label(
                         day_frame, text="  - 无课程 -",
-                        font=("微软雅黑", font_size - 1, "italic"),
+                        font=font_manager.font("preview_empty"),
                         fg="gray", bg="white", anchor='w'
                     )
                     no_course_label.pack(fill="x", padx=10)
@@ -146,15 +155,15 @@ class WeekPreviewWindow(tk.Toplevel):
                         course_frame.pack(fill="x", padx=10)
 
                         time_label = tk.Label(
-                            course_frame, text=f"{course['start_time']}",
-                            font=("微软雅黑", font_size, "bold"), # Bold time
+                            course_frame, text=course.start_time,
+                            font=font_manager.font("preview_time"), # Bold time
                             fg=self.config_handler.font_color, bg="white", anchor='w'
                         )
                         time_label.pack(side="left", padx=(2, 5)) # Add some padding
 
                         name_label = tk.Label(
-                            course_frame, text=course['name'],
-                            font=("微软雅黑", font_size), # Regular name
+                            course_frame, text=course.name,
+                            font=font_manager.font("preview_name"), # Regular name
                             fg=self.config_handler.font_color, bg="white", anchor='w'
                         )
                         name_label.pack(side="left")
@@ -34,7 +34,7 @@ class ToolsWindow:
         self.window.resizable(False, False)
 
         # 使用DPI管理器动态设置尺寸和字体
-        width = self.dpi_manager.scale(800)
+        width = self.dpi_manager.scale(1000)
         height = self.dpi_manager.scale(200)
         self.window.geometry(f"{width}x{height}")
         self.window.configure(bg="white")
@@ -80,6 +80,9 @@ class ToolsWindow:
             "天气": self._show_weather,
             "数独": self._show_sudoku,
             "AI 助手": self._show_ai_assistant,
+            "批量导入": self._show_timetable_importer,
+            "导出日历": self._export_calendar,
+            "课程搜索": self._show_course_search,
             "未完待续": self._show_todo
         }
 
@@ -123,3 +126,34 @@ class ToolsWindow:
         from tools.ai_assistant import AIAssistantWindow
         self.ai_assistant_window = AIAssistantWindow(self.main_app, self.dpi_manager)
         self.ai_assistant_window.show()
+
+    def _show_timetable_importer(self):
+        """显示课表批量导入"""
+        from tools.timetable_importer import TimetableImportWindow
+        self.timetable_import_window = TimetableImportWindow(self.main_app, self.dpi_manager)
+        self.timetable_import_window.show()
+
+    def _show_course_search(self):
+        """显示课程搜索"""
+        from tools.course_search import CourseSearchWindow
+        self.course_search_window = CourseSearchWindow(self.main_app, self.dpi_manager)
+        self.course_search_window.show()
+
+    def _export_calendar(self):
+        """将本学期的课表导出为iCalendar文件"""
+        from tkinter import filedialog, messagebox
+        from tools.ics_exporter import export_app_schedule
+        path = filedialog.asksaveasfilename(
+            parent=self.window,
+            defaultextension=".ics",
+            initialfile="课程表.ics",
+            filetypes=[("iCalendar 文件", "*.ics")]
+        )
+        if not path:
+            return
+        try:
+            count = export_app_schedule(self.main_app, path)
+        except OSError as e:
+            messagebox.showerror("导出失败", f"写入日历文件失败: {e}", parent=self.window)
+            return
+        messagebox.showinfo("导出成功", f"已导出本学期 {count} 节课到\n{path}", parent=self.window)
@@ -0,0 +1,76 @@
+import tkinter as tk
+from typing import Callable
+
+
+class VisibilityMonitor:
+    """
+    主窗口可见性监视器。
+    订阅 <Map>/<Unmap>/<Visibility> 事件代替每秒轮询 root.state()，
+    窗口被最小化（取消映射）或被全屏程序、锁屏界面完全遮挡时视为不可见，
+    仅在可见性真正变化时回调。
+
+    各平台实际能检测到的情况：
+    - 最小化/还原：所有平台。收到 <Map>/<Unmap> 时以窗口的实际状态（state()、winfo_viewable()）为准，
+      不依赖事件本身，Windows上最小化、还原时事件的顺序和次数不可靠也能得到正确结果；
+    - 被其他窗口完全遮挡：只有X11。Tk在Windows和macOS上不会为被遮挡的窗口报告
+      VisibilityFullyObscured，这两个平台上被遮挡的窗口仍按可见处理，不会降低刷新频率。
+    """
+
+    def __init__(self, root: tk.Tk, on_change: Callable[[bool, bool], None]):
+        """
+        Args:
+            root: 主窗口
+            on_change: 可见性变化回调，参数为 (是否可见, 是否从最小化恢复)
+        """
+        self.root = root
+        self.on_change = on_change
+        self._mapped = True
+        self._obscured = False
+        self._visible = True
+
+        root.bind("<Map>", self._on_map, add="+")
+        root.bind("<Unmap>", self._on_unmap, add="+")
+        root.bind("<Visibility>", self._on_visibility, add="+")
+
+    @property
+    def visible(self) -> bool:
+        return self._visible
+
+    def _window_shown(self) -> bool:
+        """窗口当前是否显示在屏幕上（未最小化、未隐藏）"""
+        try:
+            return self.root.state() not in ("iconic", "withdrawn") and bool(self.root.winfo_viewable())
+        except tk.TclError:
+            # 窗口已销毁
+            return False
+
+    def _on_map(self, event) -> None:
+        if event.widget is not self.root:
+            return
+        self._sync_mapped()
+
+    def _on_unmap(self, event) -> None:
+        if event.widget is not self.root:
+            return
+        self._sync_mapped()
+
+    def _sync_mapped(self) -> None:
+        mapped = self._window_shown()
+        restored = mapped and not self._mapped
+        if restored:
+            # 重新显示时没有新的 <Visibility> 事件之前按未遮挡处理
+            self._obscured = False
+        self._mapped = mapped
+        self._update(restored)
+
+    def _on_visibility(self, event) -> None:
+        if event.widget is not self.root:
+            return
+        self._obscured = event.state == "VisibilityFullyObscured"
+        self._update()
+
+    def _update(self, restored: bool = False) -> None:
+        visible = self._mapped and not self._obscured
+        if visible != self._visible or restored:
+            self._visible = visible
+            self.on_change(visible, restored)